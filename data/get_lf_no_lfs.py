@@ -1,7 +1,13 @@
 import requests
+from functools import partial
 from typing import Iterable
 import re
 import os
+import sys
+
+# the script is run directly (./data/get_lf_no_lfs.py), the project is one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.collector.utils import run_tasks
 
 API_ENDPOINT = "https://github.com/Smrt666/Vislice.git/info/lfs/objects/batch"
 lf_info_matcher = re.compile(
@@ -28,7 +34,16 @@ def get_all_lf_data(directory_path) -> Iterable[tuple[str, dict[str, str] | None
             yield from get_all_lf_data(entry.path)
 
 
-def download_lfs(lfs_info: list[dict[str, str]]) -> None:
+def download_file(href: str, header: dict[str, str] | None, file_name: str) -> None:
+    res = requests.get(href, stream=True, headers=header)
+    res.raise_for_status()
+    with open(file_name, "wb") as file:
+        for chunk in res.iter_content(chunk_size=1024):
+            file.write(chunk)
+    print(f"Downloaded file {file_name}.")
+
+
+def download_lfs(lfs_info: list[dict[str, str]], max_workers: int = 4) -> None:
     headers = {"Accept": "application/vnd.git-lfs+json", "Content-Type": "application/vnd.git-lfs+json; charset=utf-8"}
 
     hash_algos = {lf_info["hash_algo"] for lf_info in lfs_info}
@@ -54,18 +69,16 @@ def download_lfs(lfs_info: list[dict[str, str]]) -> None:
         headerss = [obj["actions"]["download"].get("header", None) for obj in response.json()["objects"]]
         errors = [obj["actions"]["download"].get("error", None) for obj in response.json()["objects"]]
         files = [lf_info["file"] for lf_info in lfs_info if lf_info["hash_algo"] == hash_algo]
+        downloads = []
         for href, header, file_name, error in zip(hrefs, headerss, files, errors):
-            try:
-                if error is not None:
-                    print(f"Failed to download LFS data for file {file_name}. Error: {error}")
-                    continue
-                res = requests.get(href, stream=True, headers=header)
-                with open(file_name, "wb") as file:
-                    for chunk in res.iter_content(chunk_size=1024):
-                        file.write(chunk)
-                print(f"Downloaded file {file_name}.")
-            except Exception as e:
-                print(f"Failed to download file {file_name} from {href}: {e}")
+            if error is not None:
+                print(f"Failed to download LFS data for file {file_name}. Error: {error}")
+                continue
+            downloads.append((href, file_name, partial(download_file, href, header, file_name)))
+        results = run_tasks([task for _, _, task in downloads], max_workers, retries=2, backoff=1.0, return_exceptions=True)
+        for (href, file_name, _), result in zip(downloads, results):
+            if isinstance(result, Exception):
+                print(f"Failed to download file {file_name} from {href}: {result}")
     print("Finished downloading large files.")
 
 
@@ -0,0 +1,72 @@
+from typing import Any
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+"""
+Page cache:
+    The dictionary hardly changes, so pages are stored on disk and a collection can be repeated (e.g. with another
+    extractor or sanitize settings) without the network.
+    - A page is keyed by a hash of the url and its query params (sorted, so their order does not matter). It is stored
+      as two files in a subdirectory by the first two characters of the key: the gzipped HTML and a JSON file with
+      the url, params and validators (ETag and Last-Modified) of the response.
+    - Files are written to a temporary file first and then renamed, so threads and interrupted runs never leave
+      half written pages. A page without its metadata file is not in the cache.
+"""
+
+
+def cache_key(url: str, params: dict[str, Any]) -> str:
+    data = json.dumps([url, sorted((str(k), str(v)) for k, v in params.items())], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """Pages stored in a directory (see cache_key)."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+    def get(self, url: str, params: dict[str, Any]) -> tuple[bytes, dict[str, Any]] | None:
+        """Returns the content and metadata of the page or None if it is not in the cache."""
+        key = cache_key(url, params)
+        try:
+            with open(self._path(key, ".json"), encoding="UTF-8") as file:
+                metadata = json.load(file)
+            with gzip.open(self._path(key, ".html.gz"), "rb") as content:
+                return content.read(), metadata
+        except (OSError, ValueError, EOFError):
+            return None
+
+    def put(self, url: str, params: dict[str, Any], content: bytes, etag: str | None, last_modified: str | None) -> None:
+        """Stores the page with validators of its response."""
+        key = cache_key(url, params)
+        metadata = {
+            "url": url,
+            "params": {str(k): v for k, v in params.items()},
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched": time.time(),
+        }
+        # content first, a page is in the cache once its metadata is written
+        self._write(self._path(key, ".html.gz"), gzip.compress(content))
+        self._write(self._path(key, ".json"), json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+
+    def touch(self, url: str, params: dict[str, Any], metadata: dict[str, Any]) -> None:
+        """Marks the page as checked now (after the server confirmed it did not change)."""
+        key = cache_key(url, params)
+        metadata = metadata | {"fetched": time.time()}
+        self._write(self._path(key, ".json"), json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
@@ -0,0 +1,122 @@
+from threading import Lock
+from typing import Any
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import PageCache
+
+
+"""
+Fetching pages:
+    All requests of a collection go through one PageFetcher. It has a single requests.Session, so connections are
+    reused (the pool has a connection for each thread), instead of a new connection for each page.
+    - Connection errors, timeouts and responses 429 and 5xx are retried with exponential backoff
+      (backoff, 2 * backoff, 4 * backoff, ... seconds), other HTTP errors are raised immediately.
+    - With rate, at most rate requests per second are started, over all threads (retries count too).
+    - With a cache (see cache.py), cached pages are returned without a request. With refresh, they are requested
+      again with their validators (a conditional request) and the server only sends pages that changed. Offline,
+      only the cache is used (without refresh) and missing pages raise PageNotCached.
+"""
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class PageNotCached(LookupError):
+    """A page is not in the cache of an offline PageFetcher."""
+
+
+class RateLimiter:
+    """Spaces calls of wait over all threads, so that at most rate of them return per second."""
+
+    def __init__(self, rate: float | None = None) -> None:
+        self.interval: float = 1 / rate if rate else 0.0
+        self._next: float = 0.0  # the time when the next call may return
+        self._lock = Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class PageFetcher:
+    """Gets pages from url with a shared session, retries and an optional rate limit. Can be used from many threads."""
+
+    def __init__(
+        self,
+        url: str,
+        retries: int = 3,
+        backoff: float = 0.5,
+        rate: float | None = None,
+        timeout: float = 30.0,
+        pool_size: int = 10,
+        cache: PageCache | None = None,
+        refresh: bool = False,
+        offline: bool = False,
+    ) -> None:
+        """With a cache, refresh and offline change how it is used (see the notes above)."""
+        assert cache is not None or not offline, "Offline fetching needs a cache."
+        assert not (refresh and offline), "Offline fetching cannot refresh the cache."
+        self.url: str = url
+        self.cache: PageCache | None = cache
+        self.refresh: bool = refresh
+        self.offline: bool = offline
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.timeout: float = timeout
+        self.limiter: RateLimiter = RateLimiter(rate)
+        self.session: requests.Session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, params: dict[str, Any]) -> bytes:
+        """Returns the content of the page with the query params. Raises requests.RequestException if all tries fail."""
+        cached = self.cache.get(self.url, params) if self.cache is not None else None
+        if cached is not None and not self.refresh:
+            return cached[0]
+        if self.offline:
+            raise PageNotCached(f"Page {params} is not in the cache.")
+        headers = {}
+        if cached is not None:
+            if cached[1].get("etag"):
+                headers["If-None-Match"] = cached[1]["etag"]
+            if cached[1].get("last_modified"):
+                headers["If-Modified-Since"] = cached[1]["last_modified"]
+        content = self._request(params, headers)
+        if content is None:
+            assert self.cache is not None and cached is not None
+            self.cache.touch(self.url, params, cached[1])
+            return cached[0]
+        return content
+
+    def _request(self, params: dict[str, Any], headers: dict[str, str]) -> bytes | None:
+        """Requests the page (with retries). Returns its content or None if the server responded 304 Not Modified."""
+        attempt = 0
+        while True:
+            self.limiter.wait()
+            try:
+                response = self.session.get(self.url, params=params, headers=headers, timeout=self.timeout)
+                if response.status_code == 304 and headers:
+                    return None
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    response.raise_for_status()
+                    if self.cache is not None:
+                        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+                        self.cache.put(self.url, params, response.content, etag, last_modified)
+                    return response.content
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+            time.sleep(self.backoff * 2**attempt)
+            attempt += 1
+
+    def close(self) -> None:
+        self.session.close()
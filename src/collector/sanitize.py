@@ -0,0 +1,128 @@
+from typing import Iterable, Iterator
+import heapq
+import os
+import tempfile
+
+
+"""
+Streaming sanitize:
+    sanitize used to keep several copies of the whole word list. Here it is a pipeline of generators
+    (normalize -> filter_words -> sorted_unique), so only the words being sorted are in memory.
+    - Words are sorted by the Slovenian alphabet with collation keys: the lowercase word translated to characters
+      in the order of the alphabet, so keys are compared as plain strings (no alphabet.index for each character).
+      Words with the same key (differing in case only) are sorted as strings.
+    - With more than max_in_memory words, sorted runs of max_in_memory words are written to temporary files and
+      merged (heapq.merge), duplicates are removed while merging. Memory stays flat for dumps of any size.
+"""
+
+ALPHABET = "abcčdefghijklmnoprsštuvzž"
+ACCENTS = {
+    "í": "i",
+    "ì": "i",
+    "é": "e",
+    "è": "e",
+    "ê": "e",
+    "á": "a",
+    "à": "a",
+    "ó": "o",
+    "ò": "o",
+    "ô": "o",
+    "ú": "u",
+    "ù": "u",
+    "ŕ": "r",
+    "ç": "c",
+}
+MAX_IN_MEMORY = 1_000_000  # default number of words sorted in memory
+PROBLEMS_SAMPLE = 20  # number of removed words with special characters that are reported
+
+ACCENTS_TABLE = str.maketrans(ACCENTS | {k.upper(): v.upper() for k, v in ACCENTS.items()})
+# characters, that are removed silently (words with them are removed without a report)
+OK_PROBLEMS_TABLE = str.maketrans({c: "" for c in " 0123456789-.,\"'xywqXYWQ" + ALPHABET + ALPHABET.upper()})
+# letters to characters sorted as the alphabet (printable, so keys can be stored as lines), "\0" separates the word
+COLLATION_TABLE = str.maketrans({c: chr(ord("A") + i) for i, c in enumerate(ALPHABET)})
+LETTERS = frozenset(ALPHABET + ALPHABET.upper())
+
+
+def normalize(words: Iterable[str]) -> Iterator[str]:
+    """Removes accents."""
+    for word in words:
+        yield word.translate(ACCENTS_TABLE)
+
+
+class Problems:
+    """Counts removed words with unexpected characters and keeps the first sample_size of them for the report."""
+
+    def __init__(self, sample_size: int = PROBLEMS_SAMPLE) -> None:
+        self.count: int = 0
+        self.sample: list[str] = []
+        self.sample_size: int = sample_size
+
+    def add(self, word: str) -> None:
+        self.count += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(word)
+
+    def __str__(self) -> str:
+        more = ", ..." if self.count > len(self.sample) else ""
+        return f"Removing {self.count} words with special characters: {self.sample}{more}"
+
+
+def filter_words(words: Iterable[str], problems: Problems | None = None) -> Iterator[str]:
+    """Yields words of letters of the alphabet only. Removed words with unexpected characters are added to problems."""
+    for word in words:
+        if LETTERS.issuperset(word):
+            yield word
+        elif problems is not None and word.translate(OK_PROBLEMS_TABLE).strip() != "":
+            problems.add(word)
+
+
+def collation_key(word: str) -> str:
+    """The key of the word in the order of the alphabet, with the word itself for ties (see the notes above)."""
+    return word.lower().translate(COLLATION_TABLE) + "\0" + word
+
+
+def _write_run(keys: list[str], directory: str) -> str:
+    keys.sort()
+    descriptor, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(descriptor, "w", encoding="UTF-8", newline="\n") as file:
+        file.writelines(key + "\n" for key in keys)
+    return path
+
+
+def _read_run(path: str) -> Iterator[str]:
+    with open(path, encoding="UTF-8", newline="\n") as file:
+        for line in file:
+            yield line[:-1]
+
+
+def sorted_unique(words: Iterable[str], max_in_memory: int = MAX_IN_MEMORY) -> Iterator[str]:
+    """Yields the words sorted by collation_key, without duplicates. Words must not contain "\\0" or newlines."""
+    keys: list[str] = []
+    with tempfile.TemporaryDirectory(prefix="sanitize") as directory:
+        runs: list[str] = []
+        for word in words:
+            keys.append(collation_key(word))
+            if len(keys) >= max_in_memory:
+                runs.append(_write_run(keys, directory))
+                keys = []
+        keys.sort()
+        merged = heapq.merge(keys, *map(_read_run, runs)) if runs else iter(keys)
+        previous = None
+        for key in merged:
+            if key != previous:
+                yield key[key.index("\0") + 1 :]
+                previous = key
+
+
+def sanitize_iter(words: Iterable[str], max_in_memory: int = MAX_IN_MEMORY) -> Iterator[str]:
+    """Remove accents, words with special characters, duplicates and sort by the alphabet. The removed words
+    with special characters are reported (after all words are read, before the first word is yielded), the first
+    PROBLEMS_SAMPLE of them are listed."""
+    problems = Problems()
+    ordered = sorted_unique(filter_words(normalize(words), problems), max_in_memory)
+    first = next(ordered, None)  # all words are read (and sorted) before the first one
+    if problems.count:
+        print(problems)
+    if first is not None:
+        yield first
+        yield from ordered
@@ -1,28 +1,37 @@
-import requests
 from bs4 import BeautifulSoup, Tag
-from .utils import multirun
-from typing import Callable
+from .fetch import PageFetcher
+from .parser import extract_entries
+from .sanitize import MAX_IN_MEMORY, sanitize_iter
+from .utils import TaskProgress, run_tasks
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, partial
+from typing import Callable, Iterable
 
 
 url = "https://www.fran.si/iskanje"
 
 
-def get_sskj_page(page: int, view: int = 1, query: str = "%2A") -> BeautifulSoup:
+@cache
+def get_default_fetcher() -> PageFetcher:
+    """The fetcher of pages without their own fetcher, created on the first use (importing opens no session)."""
+    return PageFetcher(url)
+
+
+def sskj_params(page: int, view: int = 1, query: str = "%2A") -> dict[str, int | str]:
     # view 1 is ok, query "%2A" means "*" (all words)
     filtered_dictionary_ids: int = 130  # idk what this is
-    params: dict[str, int | str] = {
+    return {
         "View": view,
         "FilteredDictionaryIds": filtered_dictionary_ids,
         "Query": query,
         "Page": page,
     }
-    response = requests.get(
-        url,
-        params=params,
-    )
-    response.raise_for_status()
 
-    content = BeautifulSoup(response.content, features="html.parser")
+
+def get_sskj_page(page: int, view: int = 1, query: str = "%2A", fetcher: PageFetcher | None = None) -> BeautifulSoup:
+    """Get a page of search results. The fetcher (with its session, retries and rate limit) defaults to get_default_fetcher."""
+    fetcher = fetcher or get_default_fetcher()
+    content = BeautifulSoup(fetcher.get(sskj_params(page, view, query)), features="html.parser")
     return content
 
 
@@ -50,67 +59,111 @@ def extract_nouns(content: BeautifulSoup) -> list[str]:
     return words
 
 
-def get_all_words(
-    lim: int | None = None,
-    max_threads: int = 100,
-    print_progress: bool = False,
-    word_extractor: Callable[[BeautifulSoup], list[str]] = extract_words,
-) -> list[str]:
-    page1: BeautifulSoup = get_sskj_page(1)
+def last_page_number(page1: BeautifulSoup) -> int:
     pagination = page1.find("ul", class_="pagination")
     assert isinstance(pagination, Tag), "Pagination not found on the first page."
     # the last li is "naslednja", the one before that is the last page
-    last_page = int(pagination.find_all("li")[-2].text)
+    return int(pagination.find_all("li")[-2].text)
+
+
+def collect_pages[T](
+    extract: Callable[[bytes], list[T]],
+    lim: int | None = None,
+    max_threads: int = 100,
+    print_progress: bool = False,
+    fetcher: PageFetcher | None = None,
+    failed_pages: list[int] | None = None,
+) -> list[T]:
+    """Collect results of extract from all pages (at most lim of them) with max_threads threads. A page is extracted
+    by the thread that fetched it, so fetching and extracting of different pages overlap. Without a fetcher, a new one
+    (with its own connection pool) is used.
+    Pages that could not be fetched even with retries are added to failed_pages. Without failed_pages,
+    a RuntimeError is raised instead, so results are never lost silently."""
+    if fetcher is None:
+        fetcher = PageFetcher(url, pool_size=max_threads)
+    page1 = fetcher.get(sskj_params(1))
+    last_page = last_page_number(BeautifulSoup(page1, features="html.parser"))
 
     if lim is not None:
         last_page = min(last_page, lim)
 
-    words: list[str] = []
+    def collect_page(page: int) -> list[T]:
+        return extract(fetcher.get(sskj_params(page)))
+
+    def show_progress(state: TaskProgress) -> None:
+        print(f"{state.done + 1}/{last_page} pages collected ({state.rate:.1f} pages/s)", end=" " * 10 + "\r")
+
     if print_progress:
         print(f"Collecting words from {last_page} pages...")
-    tasks = [lambda i=i: words.extend(word_extractor(get_sskj_page(i))) for i in range(1, last_page + 1)]
-    progress_printer = None
-    if print_progress:
-        progress_printer = lambda progress: print(f"{progress}/{last_page} pages collected", end=" " * 10 + "\r")  # noqa: E731
-    multirun(tasks, max_threads, print_progress=progress_printer)
+    pages = range(2, last_page + 1)
+    page_results = run_tasks(
+        [partial(collect_page, page) for page in pages],
+        max_threads,
+        progress=show_progress if print_progress else None,
+        return_exceptions=True,
+    )
+    results: list[T] = extract(page1) if last_page >= 1 else []
+    failed: list[int] = []
+    for page, page_result in zip(pages, page_results):
+        if isinstance(page_result, Exception):
+            failed.append(page)
+            print(f"Failed to collect page {page}: {page_result}")
+        else:
+            results.extend(page_result)
+
+    if failed_pages is not None:
+        failed_pages.extend(failed)
+    elif failed:
+        raise RuntimeError(f"Failed to collect {len(failed)} pages: {failed}")
+    return results
 
-    no_doubles = list(set(words))
-    no_doubles.sort()
 
-    return no_doubles
+def get_all_words(
+    lim: int | None = None,
+    max_threads: int = 100,
+    print_progress: bool = False,
+    word_extractor: Callable[[BeautifulSoup], list[str]] = extract_words,
+    fetcher: PageFetcher | None = None,
+    failed_pages: list[int] | None = None,
+) -> list[str]:
+    """Collect words from all pages with word_extractor, sorted and without duplicates (see collect_pages)."""
 
+    def extract(content: bytes) -> list[str]:
+        return word_extractor(BeautifulSoup(content, features="html.parser"))
 
-def sanitize(words: list[str]) -> list[str]:
-    """Remove accents, words with special characters, ..."""
-    alphabet = "abcčdefghijklmnoprsštuvzž"
-    accents = {
-        "í": "i",
-        "ì": "i",
-        "é": "e",
-        "è": "e",
-        "ê": "e",
-        "á": "a",
-        "à": "a",
-        "ó": "o",
-        "ò": "o",
-        "ô": "o",
-        "ú": "u",
-        "ù": "u",
-        "ŕ": "r",
-        "ç": "c",
-    }
+    words = collect_pages(extract, lim, max_threads, print_progress, fetcher, failed_pages)
+    no_doubles = list(set(words))
+    no_doubles.sort()
 
-    # remove accents and words with special characters
-    tr = str.maketrans(accents | {k.upper(): v.upper() for k, v in accents.items()})
-    words = [word.translate(tr) for word in words]
+    return no_doubles
 
-    # check problematic characters
-    problems = [word for word in words if any(c not in alphabet for c in word.lower())]
-    ok_problems = str.maketrans({c: "" for c in " 0123456789-.,\"'xywqXYWQ" + alphabet + alphabet.upper()})
-    problems = [word for word in problems if word.translate(ok_problems).strip() != ""]
-    if problems:
-        print(f"Removing {len(problems)} words with special characters: {problems}")
 
-    words = [word for word in words if all(c in alphabet for c in word.lower())]
-    key_word = {(tuple(map(alphabet.index, word.lower())), word) for word in words}
-    return [word for _, word in sorted(key_word)]
+def get_all_entries(
+    lim: int | None = None,
+    max_threads: int = 100,
+    print_progress: bool = False,
+    fetcher: PageFetcher | None = None,
+    failed_pages: list[int] | None = None,
+    parse_processes: int = 0,
+) -> dict[str, bool]:
+    """Collect all words from all pages with the fast parser (see parser.py), each with a flag if it is a noun
+    (in any of its entries). With parse_processes, pages are parsed in a pool of that many processes,
+    while the threads keep fetching (see collect_pages)."""
+    if parse_processes:
+        with ProcessPoolExecutor(parse_processes) as pool:
+
+            def extract(content: bytes) -> list[tuple[str, bool]]:
+                return pool.submit(extract_entries, content).result()
+
+            entries = collect_pages(extract, lim, max_threads, print_progress, fetcher, failed_pages)
+    else:
+        entries = collect_pages(extract_entries, lim, max_threads, print_progress, fetcher, failed_pages)
+    nouns: dict[str, bool] = {}
+    for word, is_noun in entries:
+        nouns[word] = nouns.get(word, False) or is_noun
+    return dict(sorted(nouns.items()))
+
+
+def sanitize(words: Iterable[str], max_in_memory: int = MAX_IN_MEMORY) -> list[str]:
+    """Remove accents, words with special characters, ... (see sanitize.sanitize_iter)"""
+    return list(sanitize_iter(words, max_in_memory))
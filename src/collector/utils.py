@@ -1,6 +1,97 @@
-from threading import Thread
-from queue import Queue
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from collections.abc import Sized
+from itertools import islice
 from typing import Callable, Iterable, Optional, Any
+import time
+
+
+"""
+Bounded execution:
+    run_tasks keeps at most max_workers tasks running and starts the next task as soon as any of them finishes
+    (not the oldest one, as multirun did with a FIFO queue of threads), so one slow page does not hold back the rest.
+    - Tasks are taken from the iterable only when there is a free slot, so a long generator of tasks is never
+      stored whole. Results are returned in the order of the tasks, not in the order they finished.
+    - A task that raises is retried (retries times, with exponential backoff) by the same worker.
+      If it still fails, no more tasks are started and the exception is raised after the running ones finish,
+      or, with return_exceptions, the exception is returned in place of its result.
+    - progress is called in the calling thread after each finished task.
+"""
+
+
+class TaskProgress:
+    """Progress of run_tasks: finished and failed tasks (of total, if known) and the time since the start."""
+
+    def __init__(self, total: int | None = None) -> None:
+        self.total: int | None = total
+        self.done: int = 0
+        self.failed: int = 0
+        self.start: float = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    @property
+    def rate(self) -> float:
+        """Finished tasks per second."""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed else 0.0
+
+    def __str__(self) -> str:
+        total = f"/{self.total}" if self.total is not None else ""
+        failed = f", {self.failed} failed" if self.failed else ""
+        return f"{self.done}{total} done{failed}, {self.rate:.1f}/s"
+
+
+def _with_retries[T](task: Callable[[], T], retries: int, backoff: float) -> T:
+    for attempt in range(retries):
+        try:
+            return task()
+        except Exception:
+            time.sleep(backoff * 2**attempt)
+    return task()
+
+
+def run_tasks[T](
+    tasks: Iterable[Callable[[], T]],
+    max_workers: int,
+    retries: int = 0,
+    backoff: float = 0.0,
+    progress: Optional[Callable[[TaskProgress], None]] = None,
+    return_exceptions: bool = False,
+) -> list[T | Exception]:
+    """Runs the tasks in at most max_workers threads and returns their results (see the notes above)."""
+    state = TaskProgress(len(tasks) if isinstance(tasks, Sized) else None)
+    results: dict[int, T | Exception] = {}
+    iterator = enumerate(tasks)
+    error: Exception | None = None
+    with ThreadPoolExecutor(max_workers) as executor:
+        running: dict[Future[T], int] = {}
+
+        def submit(count: int) -> None:
+            for i, task in islice(iterator, count):
+                running[executor.submit(_with_retries, task, retries, backoff)] = i
+
+        submit(max_workers)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = running.pop(future)
+                try:
+                    results[i] = future.result()
+                except Exception as exception:
+                    state.failed += 1
+                    results[i] = exception
+                    if not return_exceptions and error is None:
+                        error = exception
+                state.done += 1
+                if progress is not None:
+                    progress(state)
+            if error is None:
+                submit(len(finished))
+    if error is not None:
+        raise error
+    return [results[i] for i in range(len(results))]
 
 
 def multirun(
@@ -8,24 +99,6 @@ def multirun(
     max_threads: int,
     print_progress: Optional[Callable[[Any], None]] = None,
 ) -> None:
-    threads: Queue[Thread] = Queue()
-    progress = 0
-    for func in funcs:
-        while threads.qsize() >= max_threads:
-            thread = threads.get()
-            thread.join()
-            progress += 1
-
-            if print_progress:
-                print_progress(progress)
-
-        thread = Thread(target=func)
-        threads.put(thread)
-        thread.start()
-
-    while not threads.empty():
-        thread = threads.get()
-        thread.join()
-        progress += 1
-        if print_progress:
-            print_progress(progress)
+    """Runs the functions in at most max_threads threads, print_progress gets the number of finished ones."""
+    progress = None if print_progress is None else lambda state: print_progress(state.done)
+    run_tasks(funcs, max_threads, progress=progress)
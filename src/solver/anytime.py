@@ -0,0 +1,121 @@
+import time
+
+from .game import BaseGameStateTree
+
+
+"""
+Anytime search:
+    For big word lists the best strategy can take hours. AnytimeSearch always has a complete strategy
+    (an upper bound) and a proven lower bound of the best one, and improves both while it has time.
+    - The first strategy is the greedy one (GameStateTree.greedy). Later ones are greedy strategies with more
+      candidate letters (width), which are never worse.
+    - The lower bound is raised by solve with kill_after = lower bound + 1. Either the root is killed, which proves
+      that the best strategy has more wrong guesses, or solve finds the best strategy. The attempts are cheap while
+      the bound is low, because almost everything is killed, and the memoization tables are kept between them.
+    - The next step is the one with less time spent on it so far, until the bounds meet. Greedy strategies with
+      a bigger width quickly get expensive, while the first steps of the lower bound are almost free.
+    - When the time runs out, solve (or greedy) is interrupted by an exception. Tables only get results of finished
+      calls, so they stay valid and run can be called again to continue where it stopped.
+"""
+
+
+class BudgetExceeded(Exception):
+    """The time budget of the search ran out."""
+
+
+class AnytimeSearch:
+    """Time limited search for the best strategy of a tree."""
+
+    def __init__(self, tree: BaseGameStateTree) -> None:
+        self.tree: BaseGameStateTree = tree
+        self.lower_bound: int = 0
+        self.upper_bound: int = len(tree.alphabet) + 1
+        self.memo: dict[int, int] = {}  # the table with the decisions of the best strategy found
+        self.width: int = 0  # width of the last finished greedy strategy
+        self._greedy_width: int = 0  # width of the greedy strategy in tree.greedy_memo
+        self.seconds: dict[str, float] = {"lower": 0.0, "upper": 0.0}  # time spent on improving each bound
+        self._wrapped: dict[str, object] = {}  # instance attributes of the tree replaced by _attach
+
+    @property
+    def optimal(self) -> bool:
+        """Whether the strategy found is the best one."""
+        return self.lower_bound >= self.upper_bound
+
+    @property
+    def gap(self) -> int:
+        """How many more wrong guesses the strategy found may have compared to the best one."""
+        return self.upper_bound - self.lower_bound
+
+    def run(self, seconds: float) -> None:
+        """Improves the bounds for (at most about) the given number of seconds.
+        The first greedy strategy is always finished, even if it takes longer."""
+        deadline = time.monotonic() + seconds
+        if self.width == 0:
+            self._improve_upper_bound()
+        self._attach(deadline)
+        try:
+            while not self.optimal:
+                bound = min(self.seconds, key=self.seconds.__getitem__)
+                start = time.monotonic()
+                try:
+                    if bound == "lower":
+                        self._improve_lower_bound()
+                    else:
+                        self._improve_upper_bound()
+                finally:
+                    self.seconds[bound] += time.monotonic() - start
+        except BudgetExceeded:
+            pass
+        finally:
+            self._detach()
+
+    def _improve_lower_bound(self) -> None:
+        tree = self.tree
+        root = tree.root_word_list()
+        n, _ = tree.solve(root, "", kill_after=self.lower_bound + 1)
+        if n > self.lower_bound:
+            self.lower_bound = n  # killed, n is a lower bound
+        else:
+            # solved, so the result is the best one
+            self.lower_bound = self.upper_bound = n
+            self.memo = tree.memo
+
+    def _improve_upper_bound(self) -> None:
+        tree = self.tree
+        width = self.width + 1
+        # the table of the previous strategy is kept in self.memo, an interrupted one is continued
+        if tree.greedy_memo is self.memo or self._greedy_width != width:
+            tree.greedy_memo = {}
+            self._greedy_width = width
+        n, _ = tree.greedy(tree.root_word_list(), "", width)
+        self.width = width
+        if n < self.upper_bound or not self.memo:
+            self.upper_bound = n
+            self.memo = tree.greedy_memo
+
+    def _attach(self, deadline: float) -> None:
+        """Makes solve and greedy of the tree raise BudgetExceeded after the deadline."""
+        tree = self.tree
+        solve, greedy = tree.solve, tree.greedy
+        # the methods may already be wrapped (e.g. by SolverStats), _detach puts the wrappers back
+        self._wrapped = {name: vars(tree)[name] for name in ("solve", "greedy") if name in vars(tree)}
+
+        def timed_solve(word_list, used_letters: str, *, kill_after: int | None = None) -> tuple[int, str]:
+            if time.monotonic() > deadline:
+                raise BudgetExceeded()
+            return solve(word_list, used_letters, kill_after=kill_after)
+
+        def timed_greedy(word_list, used_letters: str, width: int = 1) -> tuple[int, str]:
+            if time.monotonic() > deadline:
+                raise BudgetExceeded()
+            return greedy(word_list, used_letters, width)
+
+        # recursive calls go through the instance attributes, so all of them are timed
+        tree.solve = timed_solve  # type: ignore[method-assign]
+        tree.greedy = timed_greedy  # type: ignore[method-assign]
+
+    def _detach(self) -> None:
+        vars(self.tree).pop("solve", None)
+        vars(self.tree).pop("greedy", None)
+        vars(self.tree).update(self._wrapped)
+        self._wrapped = {}
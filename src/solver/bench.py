@@ -0,0 +1,189 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+import io
+import platform
+import random
+import time
+
+import numpy as np
+
+from .bitset import BitsetGameStateTree
+from .export import write_json
+from .game import BaseGameStateTree, Choice, GameStateTree, Strategy
+from .hinter import HintedGame
+from .stats import SolverStats
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+"""
+Benchmarks:
+    Every optimization of the solver should be measured, so the benchmarks are fixed and run offline.
+    - Word lists are synthetic (words with Slovenian-like syllables from a seeded random generator), so they are
+      the same on every machine. If data/nouns_si.txt is downloaded (not only a git lfs pointer), cases with
+      the real nouns are added too.
+    - Every run of a case is done in its own process, so the peak RSS belongs to the case (and the tables
+      of a previous run can not help). The time is the best of the runs, the most stable of the measures.
+    - Solver cases also record node counts and table sizes (see SolverStats), and the result. Those are
+      deterministic, so a change in them means a change of the search, not noise.
+    - Results are stored as JSON and can be compared with a saved baseline (see compare).
+"""
+
+NOUNS_PATH = "data/nouns_si.txt"
+VOWELS, VOWEL_WEIGHTS = "aeiou", [8, 9, 7, 6, 3]
+CONSONANTS, CONSONANT_WEIGHTS = "bcčdfghjklmnprsštvzž", [2, 2, 1, 4, 1, 2, 2, 2, 5, 4, 4, 5, 3, 5, 1, 2, 5, 4, 2, 1]
+
+type Case = Callable[[SolverStats], dict[str, Any]]  # runs the benchmark, returns its results (besides time)
+
+
+def synthetic_words(n: int, length: int, seed: int = 0) -> list[str]:
+    """Returns n distinct words of the given length, that look a bit like Slovenian words (in random order)."""
+    rng = random.Random(seed)
+    words: dict[str, None] = {}
+    for _ in range(100 * n):
+        # a consonant cluster of at most 2 letters, then a vowel, until the word is long enough
+        word = ""
+        while len(word) < length:
+            if word and word[-1] not in VOWELS or rng.random() < 0.2:
+                word += rng.choices(VOWELS, VOWEL_WEIGHTS)[0]
+            else:
+                word += "".join(rng.choices(CONSONANTS, CONSONANT_WEIGHTS, k=rng.choice((1, 1, 2))))
+        words[word[:length]] = None
+        if len(words) == n:
+            break
+    return list(words)
+
+
+def bundled_words(path: str = NOUNS_PATH) -> list[str] | None:
+    """Returns the words of the bundled word list, None if it is not downloaded."""
+    try:
+        with open(path, encoding="UTF-8") as file:
+            text = file.read()
+    except OSError:
+        return None
+    if text.startswith("version https://git-lfs"):
+        return None
+    return text.split()
+
+
+def _strategy_case(words: list[str], tree_class: type[BaseGameStateTree]) -> Case:
+    def run(stats: SolverStats) -> dict[str, Any]:
+        strategy = Strategy(words, tree_class=tree_class, stats=stats)
+        return {"max_errors": strategy.max_errors}
+
+    return run
+
+
+def _hinted_case(words: list[str]) -> Case:
+    def run(stats: SolverStats) -> dict[str, Any]:
+        game = HintedGame(words)
+        game.strategize(print_progress=False, stats=stats)
+        return {"groups": len(game.strategies), "max_errors": max(s.max_errors for s in game.strategies.values())}
+
+    return run
+
+
+def _choice_case(words: list[str]) -> Case:
+    strategy = Strategy(words, fast=True)  # solving is not a part of this case, the greedy strategy is enough
+
+    def run(stats: SolverStats) -> dict[str, Any]:
+        strategy.start = Choice("", list(range(len(strategy.words))), strategy)
+        file = io.StringIO()
+        write_json(file, strategy.json_fields())
+        return {"json_length": len(file.getvalue())}
+
+    return run
+
+
+def bench_cases(quick: bool = False) -> dict[str, Callable[[], Case]]:
+    """Returns the benchmark cases by name. A case is created by calling its function,
+    this is the setup, that is not measured. With quick, the word lists are smaller."""
+    scale = 3 if quick else 1
+    engines: dict[str, type[BaseGameStateTree]] = {"tuple": GameStateTree, "bitset": BitsetGameStateTree}
+    cases: dict[str, Callable[[], Case]] = {}
+    for length, n in ((4, 150), (5, 150), (5, 300), (6, 400), (7, 600)):
+        n //= scale
+        for engine, tree_class in engines.items():
+            cases[f"strategy-{engine}-{length}-{n}"] = lambda n=n, length=length, tree_class=tree_class: _strategy_case(
+                synthetic_words(n, length, seed=length), tree_class
+            )
+    corpus = [word for length in range(4, 9) for word in synthetic_words(2000 // scale, length, seed=10 + length)]
+    sample = random.Random(0).sample(corpus, len(corpus) // 4)
+    cases[f"hinted-{len(sample)}"] = lambda: _hinted_case(sample)
+    cases[f"choice-5-{3000 // scale}"] = lambda: _choice_case(synthetic_words(3000 // scale, 5, seed=5))
+
+    nouns = bundled_words()
+    if nouns is not None:
+        nouns_5 = [word for word in nouns if len(word) == 5][: 150 // scale]
+        cases[f"strategy-nouns-5-{len(nouns_5)}"] = lambda: _strategy_case(nouns_5, GameStateTree)
+        nouns_sample = random.Random(0).sample(nouns, min(len(nouns), 2000 // scale))
+        cases[f"hinted-nouns-{len(nouns_sample)}"] = lambda: _hinted_case(nouns_sample)
+    return cases
+
+
+def run_case(name: str, quick: bool = False) -> dict[str, Any]:
+    """Runs the case and returns its results: wall time, peak RSS (in MB, None if unknown) and the results
+    of the case and its statistics. Runs in a worker process of run_benchmarks."""
+    case = bench_cases(quick)[name]()
+    stats = SolverStats()
+    start = time.perf_counter()
+    results = case(stats)
+    seconds = time.perf_counter() - start
+    peak_rss = None
+    if resource is not None:
+        # kilobytes on Linux, bytes on macOS
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if platform.system() == "Darwin" else 2**10)
+    if stats.calls:
+        results |= {"nodes": stats.nodes, "memo_size": stats.memo_size, "killed_size": stats.killed_size}
+    return {"seconds": seconds, "peak_rss_mb": peak_rss, **results}
+
+
+def run_benchmarks(
+    repeat: int = 3, quick: bool = False, only: str | None = None, print_progress: bool = True
+) -> dict[str, Any]:
+    """Runs the benchmark cases (only the ones with only in their name) repeat times.
+    Returns the results, that can be stored as JSON."""
+    cases: dict[str, Any] = {}
+    for name in bench_cases(quick):
+        if only is not None and only not in name:
+            continue
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                runs.append(executor.submit(run_case, name, quick).result())
+        seconds = [run["seconds"] for run in runs]
+        rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+        cases[name] = runs[0] | {"seconds": min(seconds), "seconds_all": seconds, "peak_rss_mb": max(rss, default=None)}
+        if print_progress:
+            print(f"{name}: {min(seconds):.3f} s")
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "quick": quick,
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float = 0.1) -> list[str]:
+    """Compares the results with the baseline. Returns a line for each case, that is in both of them.
+    Times differing less than tolerance (relative) are the same, a different result or node count is reported."""
+    lines = []
+    for name, case in results["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        base = baseline["cases"][name]
+        ratio = case["seconds"] / base["seconds"] if base["seconds"] > 0 else float("inf")
+        verdict = "slower" if ratio > 1 + tolerance else "faster" if ratio < 1 - tolerance else "same"
+        line = f"{name}: {case['seconds']:.3f} s vs {base['seconds']:.3f} s ({ratio:.2f}x, {verdict})"
+        if case.get("peak_rss_mb") and base.get("peak_rss_mb"):
+            line += f", peak RSS {case['peak_rss_mb']:.0f} MB vs {base['peak_rss_mb']:.0f} MB"
+        changed = [key for key in ("max_errors", "nodes", "memo_size") if key in base and case.get(key) != base[key]]
+        if changed:
+            line += ", different " + ", ".join(f"{key} ({base[key]} -> {case.get(key)})" for key in changed)
+        lines.append(line)
+    return lines
@@ -0,0 +1,352 @@
+from array import array
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator
+import contextlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from .game import Choice, GameStateTree, ShapeCode, Strategy, get_tti
+from .hinter import HintedGame, key_to_hint
+
+
+"""
+Binary strategy files:
+    A JSON strategy has to be parsed completely before the first letter can be given. A binary strategy file
+    is read through mmap, so a lookup only reads the few pages with the nodes on its path.
+    - The file starts with a header and ends with a hint index: fixed size entries sorted by the hint (UTF-8),
+      so a hint is found with binary search. A file of a single Strategy has one section with the hint "".
+    - Each section (a Strategy) has the alphabet, the words and three flat tables: nodes (letters as a bitmask of
+      the alphabet, the first edge and the number of edges), edges (child node and the index of its shape)
+      and shapes (shape codes of the guessed letters, a code for each letter). The root is the first node,
+      a node without letters is a won game.
+    - A pattern (the word with the found letters revealed, e.g. "a_a__") and the wrong letters are enough
+      to follow the strategy from the root: the shape codes of the guessed letters can be read from the pattern.
+    - All numbers are little-endian. Letters are a 32-bit mask, so alphabets can have at most 32 letters.
+"""
+
+MAGIC = b"VISLICE\0"
+VERSION = 1
+FLAG_HINTED = 1
+# magic, version, flags, number of sections, index offset, offset and length of all words (hinted files)
+HEADER = struct.Struct("<8sIIIxxxxQQQ")
+INDEX_ENTRY = struct.Struct("<QIxxxxQ")  # hint offset, hint length, section offset
+# max errors, lower bound, numbers of nodes, edges and shape codes, lengths of the alphabet and words (UTF-8)
+SECTION = struct.Struct("<iiIIIIIxxxx")
+NODE = struct.Struct("<III")  # letters mask, first edge, number of edges
+EDGE = struct.Struct("<II")  # child node, index of the first shape code
+
+type Node = Any  # a node of the strategy being written: a Choice or a JSON strategy
+type Children = Callable[[Node], list[tuple[ShapeCode, Node]]]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _choice_letters(choice: Choice) -> str:
+    return choice.choice
+
+
+def _choice_children(choice: Choice) -> list[tuple[ShapeCode, Choice]]:
+    # children are not kept, so the whole tree is never in memory (see Choice.get_children)
+    return list(choice.get_children(keep=False).items())
+
+
+def _json_letters(node: Any) -> str:
+    return "" if node == "WON!" else node[0]
+
+
+def _json_children(node: Any) -> list[tuple[ShapeCode, Any]]:
+    if node == "WON!":
+        return []
+    letters, children = node
+    shapes = []
+    for pattern, child in children.items():
+        shape = tuple(sum(1 << i for i, c in enumerate(pattern) if c == letter) for letter in letters)
+        shapes.append((shape, child))
+    return shapes
+
+
+def _section(
+    fields: dict[str, Any], root: Node, letters: Callable[[Node], str], children: Children
+) -> tuple[bytes, bytes, array, array, array]:
+    """Returns the header, the alphabet and words and the tables of a section. Nodes are numbered in BFS order,
+    so the children of a node are consecutive and the queue holds only one level of the tree."""
+    alphabet: str = fields["alphabet"]
+    if len(alphabet) > 32:
+        raise ValueError("Binary strategy files support alphabets of at most 32 letters.")
+    bits = {c: 1 << i for i, c in enumerate(alphabet)}
+    nodes, edges, shapes = array("I"), array("I"), array("I")
+    queue = deque([root])
+    n_nodes = 1
+    while queue:
+        node = queue.popleft()
+        node_children = children(node)
+        nodes.extend((sum(bits[c] for c in letters(node)), len(edges) // 2, len(node_children)))
+        for shape, child in node_children:
+            edges.extend((n_nodes, len(shapes)))
+            shapes.extend(shape)
+            queue.append(child)
+            n_nodes += 1
+    alphabet_bytes = alphabet.encode("utf-8")
+    words_bytes = "\n".join(fields["words"]).encode("utf-8")
+    lower_bound = fields.get("lower_bound", fields["max_errors"])
+    header = SECTION.pack(
+        fields["max_errors"],
+        lower_bound,
+        len(nodes) // 3,
+        len(edges) // 2,
+        len(shapes),
+        len(alphabet_bytes),
+        len(words_bytes),
+    )
+    return header, alphabet_bytes + words_bytes, nodes, edges, shapes
+
+
+def _write(
+    path: str,
+    sections: Iterable[tuple[str, dict[str, Any], Node]],
+    letters: Callable[[Node], str],
+    children: Children,
+    words: list[str] | None = None,
+) -> None:
+    """Writes the sections (hint, fields of the strategy JSON, root) to the file at path.
+    With words (all words of a HintedGame), the file is hinted."""
+    with open(path, "wb") as file:
+        file.write(bytes(HEADER.size))
+        entries = []
+        for hint, fields, root in sections:
+            offset = _align(file.tell())
+            file.write(bytes(offset - file.tell()))
+            header, text, nodes, edges, shapes = _section(fields, root, letters, children)
+            file.write(header + text)
+            file.write(bytes(_align(file.tell()) - file.tell()))
+            for table in (nodes, edges, shapes):
+                file.write(np.asarray(table, dtype="<u4").tobytes())
+            entries.append((hint.encode("utf-8"), offset))
+        words_offset = file.tell()
+        words_bytes = "\n".join(words or []).encode("utf-8")
+        file.write(words_bytes)
+        hint_offsets = []
+        for hint, _ in entries:
+            hint_offsets.append(file.tell())
+            file.write(hint)
+        file.write(bytes(_align(file.tell()) - file.tell()))
+        index_offset = file.tell()
+        order = sorted(range(len(entries)), key=lambda i: entries[i][0])
+        for i in order:
+            file.write(INDEX_ENTRY.pack(hint_offsets[i], len(entries[i][0]), entries[i][1]))
+        file.seek(0)
+        flags = FLAG_HINTED if words is not None else 0
+        file.write(HEADER.pack(MAGIC, VERSION, flags, len(entries), index_offset, words_offset, len(words_bytes)))
+
+
+def write_binary(path: str, strategy: Strategy | HintedGame) -> None:
+    """Writes the strategy (or all strategies of the hinted game) to a binary strategy file."""
+    if isinstance(strategy, HintedGame):
+        sections = (
+            (key_to_hint(key), s.json_fields() | {"lower_bound": s.lower_bound}, s.start)
+            for key, s in strategy.strategies.items()
+        )
+        _write(path, sections, _choice_letters, _choice_children, strategy.words)
+    else:
+        fields = strategy.json_fields() | {"lower_bound": strategy.lower_bound}
+        _write(path, [("", fields, strategy.start)], _choice_letters, _choice_children)
+
+
+def json_to_binary(json_path: str, path: str) -> None:
+    """Converts a JSON strategy file (of getstrategy or hintstrat) to a binary strategy file."""
+    with open(json_path, encoding="UTF-8") as file:
+        data = json.load(file)
+    if "strategies" in data:
+        sections = ((hint, fields, fields["strategy"]) for hint, fields in data["strategies"].items())
+        _write(path, sections, _json_letters, _json_children, data["words"])
+    else:
+        _write(path, [("", data, data["strategy"])], _json_letters, _json_children)
+
+
+class StrategyFile:
+    """A binary strategy file, memory mapped. Can be used as a context manager."""
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._file = open(path, "rb")
+        try:
+            self.data: mmap.mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, flags, self.n_sections, self._index_offset, words_offset, words_length = HEADER.unpack_from(
+                self.data, 0
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a binary strategy file (of version {VERSION}).")
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self.hinted: bool = bool(flags & FLAG_HINTED)
+        self._words: tuple[int, int] = (words_offset, words_length)
+        self._sections: dict[int, tuple[Any, ...]] = {}  # parsed section headers, by offset
+        self._offsets: dict[str, int] = {}  # offsets of sections, by hint
+
+    def close(self) -> None:
+        if hasattr(self, "data"):
+            self.data.close()
+        self._file.close()
+
+    def __enter__(self) -> "StrategyFile":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def _entry(self, i: int) -> tuple[str, int]:
+        hint_offset, hint_length, section_offset = INDEX_ENTRY.unpack_from(self.data, self._index_offset + i * INDEX_ENTRY.size)
+        return self.data[hint_offset : hint_offset + hint_length].decode("utf-8"), section_offset
+
+    def hints(self) -> Iterator[str]:
+        """Yields the hints of all sections, sorted by their UTF-8 encoding."""
+        for i in range(self.n_sections):
+            yield self._entry(i)[0]
+
+    def section_offset(self, hint: str = "") -> int:
+        """Returns the offset of the section with the hint (binary search in the index, the result is cached)."""
+        offset = self._offsets.get(hint)
+        if offset is not None:
+            return offset
+        target = hint.encode("utf-8")
+        low, high = 0, self.n_sections
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0].encode("utf-8") < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.n_sections:
+            entry_hint, offset = self._entry(low)
+            if entry_hint == hint:
+                self._offsets[hint] = offset
+                return offset
+        raise KeyError(f"No strategy for hint {hint!r}.")
+
+    def _section(self, offset: int) -> tuple[Any, ...]:
+        """Returns the parsed header of the section at offset:
+        (max errors, lower bound, alphabet, node table offset, edge table offset, shape table offset, words)."""
+        section = self._sections.get(offset)
+        if section is None:
+            max_errors, lower_bound, n_nodes, n_edges, _, alphabet_length, words_length = SECTION.unpack_from(self.data, offset)
+            start = offset + SECTION.size
+            alphabet = self.data[start : start + alphabet_length].decode("utf-8")
+            words = (start + alphabet_length, words_length)
+            nodes = _align(start + alphabet_length + words_length)
+            edges = nodes + n_nodes * NODE.size
+            shapes = edges + n_edges * EDGE.size
+            section = self._sections[offset] = (max_errors, lower_bound, alphabet, nodes, edges, shapes, words)
+        return section
+
+    def _section_words(self, section: tuple[Any, ...]) -> list[str]:
+        start, length = section[6]
+        return self.data[start : start + length].decode("utf-8").split("\n") if length else []
+
+    def tables(self, hint: str = "") -> tuple[str, list[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the alphabet, the words and the tables of the section with the hint as arrays (views of the file):
+        nodes (a row of letters mask, first edge and number of edges for each node), edges (child and shape index)
+        and shape codes."""
+        offset = self.section_offset(hint)
+        section = self._section(offset)
+        _, _, n_nodes, n_edges, n_shapes, _, _ = SECTION.unpack_from(self.data, offset)
+        _, _, alphabet, nodes, edges, shapes, _ = section
+        node_table = np.frombuffer(self.data, dtype="<u4", count=n_nodes * 3, offset=nodes).reshape(n_nodes, 3)
+        edge_table = np.frombuffer(self.data, dtype="<u4", count=n_edges * 2, offset=edges).reshape(n_edges, 2)
+        shape_table = np.frombuffer(self.data, dtype="<u4", count=n_shapes, offset=shapes)
+        return alphabet, self._section_words(section), node_table, edge_table, shape_table
+
+    @staticmethod
+    def hint_of(pattern: str) -> str:
+        """Returns the hint of the word with the pattern: only the first letter and its positions."""
+        return "".join(c if c == pattern[0] else "_" for c in pattern)
+
+    def next_letters(self, pattern: str, wrong: str = "", hint: str | None = None) -> str:
+        """Returns the letters to guess next, for the revealed pattern (e.g. "a_a__") and the wrong letters so far.
+        In hinted files the hint is taken from the pattern. Returns "" if the word is guessed.
+        Raises KeyError if the pattern and wrong letters are not possible with the words of the strategy."""
+        if hint is None:
+            hint = self.hint_of(pattern) if self.hinted else ""
+        _, _, alphabet, nodes, edges, shapes, _ = self._section(self.section_offset(hint))
+        guessed = set(pattern) | set(wrong)
+        data = self.data
+        node = 0
+        while True:
+            mask, first_edge, n_edges = NODE.unpack_from(data, nodes + node * NODE.size)
+            letters = "".join(sorted(c for i, c in enumerate(alphabet) if mask >> i & 1))
+            missing = "".join(c for c in letters if c not in guessed)
+            if missing or not letters:
+                return missing
+            shape = [sum(1 << i for i, c in enumerate(pattern) if c == letter) for letter in letters]
+            for edge in range(first_edge, first_edge + n_edges):
+                child, shape_index = EDGE.unpack_from(data, edges + edge * EDGE.size)
+                if list(struct.unpack_from(f"<{len(letters)}I", data, shapes + shape_index * 4)) == shape:
+                    node = child
+                    break
+            else:
+                raise KeyError(f"Pattern {pattern!r} with wrong letters {wrong!r} is not possible.")
+
+    def strategy(self, hint: str = "") -> Strategy:
+        """Loads the strategy of the section with the hint (the only one in a file of a single Strategy)."""
+        section = self._section(self.section_offset(hint))
+        max_errors, lower_bound, alphabet, nodes, edges, shapes, _ = section
+        words = self._section_words(section)
+        tree = GameStateTree(words, alphabet)
+        decisions: dict[tuple[str, int], str] = {}
+        stack = [(0, list(tree.pks), "")]
+        while stack:
+            node, word_list, used_letters = stack.pop()
+            mask, first_edge, n_edges = NODE.unpack_from(self.data, nodes + node * NODE.size)
+            letters = "".join(sorted(c for i, c in enumerate(alphabet) if mask >> i & 1))
+            decisions["".join(sorted(used_letters)), min(word_list)] = letters
+            if not letters:
+                continue
+            letter_ids = [alphabet.index(c) for c in letters]
+            codes = tree.shape_matrix[np.asarray(word_list)[:, np.newaxis], letter_ids].tolist()
+            children = {}
+            for edge in range(first_edge, first_edge + n_edges):
+                child, shape_index = EDGE.unpack_from(self.data, edges + edge * EDGE.size)
+                children[struct.unpack_from(f"<{len(letters)}I", self.data, shapes + shape_index * 4)] = child
+            groups: dict[int, list[int]] = {}
+            for pk, code in zip(word_list, codes):
+                groups.setdefault(children[tuple(code)], []).append(pk)
+            for child, group in groups.items():
+                stack.append((child, group, used_letters + letters))
+        return Strategy.from_decisions(words, alphabet, decisions, max_errors, lower_bound)
+
+    def hinted_game(self) -> HintedGame:
+        """Loads the hinted game with all of its strategies."""
+        if not self.hinted:
+            raise ValueError(f"{self.path} is not a hinted strategy file.")
+        start, length = self._words
+        game = HintedGame(self.data[start : start + length].decode("utf-8").split("\n") if length else [])
+        strategies = {}
+        for hint in self.hints():
+            hint_key = (len(hint), hint[0], get_tti(hint, hint[0]))
+            strategies[hint_key] = self.strategy(hint)
+        game.strategies = {key: strategies[key] for key in game.groups}
+        return game
+
+
+def open_strategy(path: str) -> StrategyFile:
+    """Opens a binary strategy file. A JSON strategy is converted to a temporary binary file first."""
+    with open(path, "rb") as file:
+        is_json = file.read(1) in (b"{", b" ", b"\n")
+    if not is_json:
+        return StrategyFile(path)
+    descriptor, binary_path = tempfile.mkstemp(suffix=".bin")
+    os.close(descriptor)
+    try:
+        json_to_binary(path, binary_path)
+        return StrategyFile(binary_path)
+    finally:
+        # the mapping stays valid without the file (Windows does not allow removing it, it is left in the temp folder)
+        with contextlib.suppress(OSError):
+            os.remove(binary_path)
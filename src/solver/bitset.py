@@ -0,0 +1,103 @@
+from typing import Iterator
+
+from .game import BaseGameStateTree
+
+
+"""
+Bitset engine:
+    The same search as GameStateTree.solve (it only implements the methods that look into word lists),
+    but every word list is a single integer (bitset).
+    Word with id pk is in the list if bit pk is set.
+    - For every letter and every position pattern of that letter, the words with that pattern are precomputed as a mask.
+      Splitting a word list by a letter is then just a few bitwise ands.
+    - For every letter, the words containing it are precomputed as a mask, so shared letters are found with one and.
+    - Memoization keys are the same as in GameStateTree (used letters mask, smallest word id), so extract_strategy,
+      Strategy and Choice work with both engines and give the same results.
+"""
+
+
+def lowest_bit(word_set: int) -> int:
+    """Returns the smallest word id in the set."""
+    return (word_set & -word_set).bit_length() - 1
+
+
+def iter_bits(word_set: int) -> Iterator[int]:
+    """Yields word ids in the set in increasing order."""
+    while word_set:
+        low = word_set & -word_set
+        yield low.bit_length() - 1
+        word_set ^= low
+
+
+class BitsetGameStateTree(BaseGameStateTree[int]):
+    """Word lists are bitsets of word ids."""
+
+    def __init__(self, words: list[str], alphabet: str) -> None:
+        super().__init__(words, alphabet)
+        self.all_words: int = (1 << len(self.words)) - 1
+
+        # for each letter: list of (number of occurrences, mask of words with the same positions of the letter)
+        self.shape_masks: list[list[tuple[int, int]]] = []
+        # for each letter: mask of words containing the letter
+        self.letter_masks: list[int] = []
+        for column in self.shape_matrix.T.tolist():
+            masks: dict[int, int] = {}
+            for pk, shape in enumerate(column):
+                masks[shape] = masks.get(shape, 0) | (1 << pk)
+            self.shape_masks.append([(shape.bit_count(), mask) for shape, mask in masks.items()])
+            self.letter_masks.append(self.all_words & ~masks.get(0, 0))
+
+    def memo_key(self, word_list: int, used_letters: str) -> int:
+        return lowest_bit(word_list) << self.n_letters | self.letters_mask(used_letters)
+
+    def shared_letters(self, word_list: int, used_letters: str) -> tuple[str, bool]:
+        unused_i = [i for i, c in enumerate(self.alphabet) if c not in used_letters]
+        shared_i = [i for i in unused_i if word_list & self.letter_masks[i] == word_list]
+        finished = all(not word_list & self.letter_masks[i] for i in unused_i if i not in shared_i)
+        return "".join(sorted(self.alphabet[i] for i in shared_i)), finished
+
+    def letter_options(self, word_list: int) -> list[tuple[str, list[tuple[int, int]]]]:
+        options: list[tuple[str, list[tuple[int, int]]]] = []
+        letter_frequency: dict[str, int] = {}
+        for letter_i, letter in enumerate(self.alphabet):
+            # split the words by the letter: (occurrences, part of the word set)
+            parts = [(n, part) for n, mask in self.shape_masks[letter_i] if (part := word_list & mask)]
+            if len(parts) < 2:
+                continue
+            letter_frequency[letter] = sum(n * part.bit_count() for n, part in parts)
+            # the same ordering as in GameStateTree.letter_options, so the same branches are killed
+            parts.sort(key=lambda n_part: (-n_part[1].bit_count(), lowest_bit(n_part[1])))
+            options.append((letter, [(int(n == 0), part) for n, part in parts]))
+        options.sort(key=lambda option: letter_frequency[option[0]], reverse=True)
+        return options
+
+    def letter_dominates(self, groups: list[tuple[int, int]], other_groups: list[tuple[int, int]]) -> bool:
+        absent = next((group for errors, group in groups if errors), 0)
+        other_absent = next((group for errors, group in other_groups if errors), 0)
+        if absent & other_absent != absent:
+            return False
+        return all(any(group & other == group for _, other in other_groups) for _, group in groups)
+
+    def group_words(self, word_list: int, letters_i: list[int]) -> list[int]:
+        """Groups the words by their tti. Groups are ordered by their smallest word id."""
+        groups = [word_list]
+        for letter_i in letters_i:
+            groups = [part for group in groups for _, mask in self.shape_masks[letter_i] if (part := group & mask)]
+        return sorted(groups, key=lowest_bit)
+
+    def group_size(self, word_list: int) -> int:
+        return word_list.bit_count()
+
+    def root_word_list(self) -> int:
+        return self.all_words
+
+    def to_word_list(self, word_set: int) -> tuple[int, ...]:
+        """Converts the bitset to a word list as used by GameStateTree."""
+        return tuple(iter_bits(word_set))
+
+    def to_word_set(self, word_list: tuple[int, ...] | list[int]) -> int:
+        """Converts a word list as used by GameStateTree to a bitset."""
+        word_set = 0
+        for pk in word_list:
+            word_set |= 1 << pk
+        return word_set
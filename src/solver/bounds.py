@@ -0,0 +1,57 @@
+from typing import Any, Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .game import BaseGameStateTree
+
+
+"""
+Lower bounds:
+    A lower bound is a function (tree, word list, used letters) -> int, that never returns more than the minimal
+    number of wrong guesses in the worst case for the group. GameStateTree.solve calls the bounds in tree.lower_bounds
+    before it expands a group without shared letters and kills the group if one of them reaches the kill bound.
+    The group already has at least 1 wrong guess then, so bounds are only useful if they can return more.
+    - Bounds only use the hooks of BaseGameStateTree (shared_letters, letter_options, memo_key), so they work with all
+      engines.
+    - The value of a group can only decrease when words are removed or letters are revealed, so the value of a group
+      is at least the (bound on the) value of any group contained in it.
+"""
+
+type LowerBound = Callable[["BaseGameStateTree[Any]", Any, str], int]
+
+
+def cached_bound[W](tree: "BaseGameStateTree[W]", word_list: W, used_letters: str) -> int:
+    """The value of the group, if it was already solved, or its lower bound, if it was killed. 0 otherwise."""
+    key = tree.memo_key(word_list, used_letters)
+    value = tree.memo.get(key)
+    return tree.killed.get(key, 0) if value is None else value >> tree.n_letters
+
+
+def unshared_bound[W](tree: "BaseGameStateTree[W]", word_list: W, used_letters: str) -> int:
+    """1 if there is something left to guess and no letter is in all words (any guess can be wrong), 0 otherwise."""
+    shared, finished = tree.shared_letters(word_list, used_letters)
+    return int(not shared and not finished)
+
+
+def lookahead_bound[W](tree: "BaseGameStateTree[W]", word_list: W, used_letters: str) -> int:
+    """Looks one guess ahead: whichever letter is guessed, its worst group has to be solved after it.
+    Groups are bounded by cached_bound and unshared_bound, so the bound can reach 2, if it is not cached."""
+    if not unshared_bound(tree, word_list, used_letters):
+        return 0  # guessing shared letters is free and the letters are not in letter_options, if they do not split
+    bound: int | None = None
+    for letter, groups in tree.letter_options(word_list):
+        used_child = used_letters + letter
+        letter_bound = 0
+        for errors, group in groups:
+            value = cached_bound(tree, group, used_child) or unshared_bound(tree, group, used_child)
+            letter_bound = max(letter_bound, value + errors)
+        if bound is None or letter_bound < bound:
+            bound = letter_bound
+            if bound <= 1:
+                break  # solve knows that much without bounds
+    return bound or 0
+
+
+# No bounds by default: cached_bound and unshared_bound never kill a group on their own (memoize checks the tables
+# and solve the bound of 1 before them), and lookahead_bound expands about 3 times fewer groups, but its checks make
+# solve several times slower.
+DEFAULT_BOUNDS: list[LowerBound] = []
@@ -0,0 +1,201 @@
+from typing import Any, Iterable
+import mmap
+import struct
+
+import numpy as np
+
+from .game import WordShape, get_shape_matrix, mask_dtype, mask_to_positions
+
+
+"""
+Binary corpus:
+    Reading a word list means splitting the whole text and filtering it by length, and HintedGame computes the hint
+    of every word again. A corpus file (vislice.py buildcorpus) has all of it precomputed and is read through mmap,
+    so only the words of the needed partition are decoded.
+    - Words are stored in the order of the word list: as text (UTF-8, separated by newlines, with byte offsets of
+      each word, so all words are read by a single decode and split),
+      as alphabet indices of the lowercase word (uint8, with offsets), with the mask of their letters
+      and with their row of the shape matrix (see get_shape_matrix, for the alphabet of the corpus).
+    - Partitions are lists of word ids (in the order of the word list): one for each length and one for each hint group
+      (length, first letter and its positions, as in HintedGame). The partition table is sorted by
+      (length, first letter, positions), partitions of lengths have the first letter NO_LETTER.
+    - All numbers are little-endian, sections are aligned to 8 bytes. The alphabet has at most 64 letters.
+"""
+
+MAGIC = b"VISCORP\0"
+VERSION = 1
+NO_LETTER = 0xFFFFFFFF
+# magic, version, number of words, number of partitions, shape matrix item size, length of the alphabet (UTF-8),
+# offsets of: text, text offsets, letters, letter offsets, letter masks, shape matrix, partitions, word ids
+HEADER = struct.Struct("<8sIIIII4x8Q")
+PARTITION = np.dtype([("length", "<u4"), ("letter", "<u4"), ("shape", "<u8"), ("offset", "<u8"), ("count", "<u8")])
+
+type HintKey = tuple[int, str, WordShape]
+
+
+def _align(data: bytearray) -> None:
+    data.extend(bytes(-len(data) % 8))
+
+
+def build_corpus(words: Iterable[str], path: str) -> int:
+    """Writes the words (e.g. of nouns_si.txt, without whitespace) to a corpus file at path. Returns the number of words."""
+    words = list(words)
+    lower = [word.lower() for word in words]
+    alphabet = "".join(sorted(set().union(*map(set, lower))))
+    if len(alphabet) > 64:
+        raise ValueError("Corpus files support alphabets of at most 64 letters.")
+    letter_ids = {c: i for i, c in enumerate(alphabet)}
+    shape_matrix = get_shape_matrix(lower, alphabet).astype(mask_dtype(max(map(len, words), default=0)))
+    letter_masks = np.array([sum(1 << letter_ids[c] for c in set(word)) for word in lower], dtype="<u8")
+
+    partitions: dict[tuple[int, int, int], list[int]] = {}
+    for pk, word in enumerate(lower):
+        partitions.setdefault((len(word), NO_LETTER, 0), []).append(pk)
+        if word:
+            first = letter_ids[word[0]]
+            partitions.setdefault((len(word), first, int(shape_matrix[pk, first])), []).append(pk)
+    table = np.zeros(len(partitions), dtype=PARTITION)
+    ids: list[int] = []
+    for row, key in enumerate(sorted(partitions)):
+        table[row] = (*key, len(ids), len(partitions[key]))
+        ids.extend(partitions[key])
+
+    encoded = [word.encode("utf-8") + b"\n" for word in words]
+    text_offsets = np.cumsum([0] + [len(word) for word in encoded], dtype="<u8")
+    letter_offsets = np.cumsum([0] + [len(word) for word in lower], dtype="<u8")
+    letters = np.array([letter_ids[c] for word in lower for c in word], dtype=np.uint8)
+
+    data = bytearray(HEADER.size)
+    alphabet_bytes = alphabet.encode("utf-8")
+    data.extend(alphabet_bytes)
+    offsets = []
+    for section in (
+        b"".join(encoded),
+        text_offsets.tobytes(),
+        letters.tobytes(),
+        letter_offsets.tobytes(),
+        letter_masks.tobytes(),
+        shape_matrix.astype(shape_matrix.dtype.newbyteorder("<")).tobytes(),
+        table.tobytes(),
+        np.array(ids, dtype="<u4").tobytes(),
+    ):
+        _align(data)
+        offsets.append(len(data))
+        data.extend(section)
+    itemsize = shape_matrix.dtype.itemsize
+    data[: HEADER.size] = HEADER.pack(MAGIC, VERSION, len(words), len(table), itemsize, len(alphabet_bytes), *offsets)
+    with open(path, "wb") as file:
+        file.write(data)
+    return len(words)
+
+
+def is_corpus(path: str) -> bool:
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+class Corpus:
+    """A corpus file, memory mapped. Can be used as a context manager.
+    Arrays (letters, letter_masks, shape_matrix, ...) are views of the file, they must not be used after closing it."""
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._file = open(path, "rb")
+        try:
+            self.data: mmap.mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self.data) < HEADER.size:
+                raise ValueError(f"{path} is not a corpus file (of version {VERSION}).")
+            magic, version, self.n_words, n_partitions, itemsize, alphabet_length, *offsets = HEADER.unpack_from(self.data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a corpus file (of version {VERSION}).")
+        except ValueError:
+            self.close()
+            raise
+        self.alphabet: str = self.data[HEADER.size : HEADER.size + alphabet_length].decode("utf-8")
+        text, text_offsets, letters, letter_offsets, masks, shapes, partitions, ids = offsets
+        n = self.n_words
+        self._text: int = text
+        self._text_offsets: np.ndarray = self._array("<u8", n + 1, text_offsets)
+        self.letter_offsets: np.ndarray = self._array("<u8", n + 1, letter_offsets)
+        self.letters: np.ndarray = self._array(np.uint8, int(self.letter_offsets[-1]), letters)
+        self.letter_masks: np.ndarray = self._array("<u8", n, masks)
+        dtype = np.dtype(mask_dtype(itemsize * 8)).newbyteorder("<")
+        self.shape_matrix: np.ndarray = self._array(dtype, n * len(self.alphabet), shapes).reshape(n, len(self.alphabet))
+        self.partitions: np.ndarray = self._array(PARTITION, n_partitions, partitions)
+        self._ids: np.ndarray = self._array("<u4", int(self.partitions["count"].sum()), ids)
+
+    def _array(self, dtype: Any, count: int, offset: int) -> np.ndarray:
+        return np.frombuffer(self.data, dtype=dtype, count=count, offset=offset)
+
+    def close(self) -> None:
+        if hasattr(self, "data"):
+            # arrays are views of the mapping, it can only be closed when they are gone
+            for name in ("_text_offsets", "letters", "letter_offsets", "letter_masks", "shape_matrix", "partitions", "_ids"):
+                self.__dict__.pop(name, None)
+            try:
+                self.data.close()
+            except BufferError:
+                pass  # views are still used elsewhere, the mapping is released with the last of them
+        self._file.close()
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def words(self, ids: Iterable[int] | None = None) -> list[str]:
+        """Returns the words with the ids (all words without ids)."""
+        if ids is not None:
+            return [self.word(pk) for pk in ids]
+        if not self.n_words:
+            return []
+        return self.data[self._text : self._text + int(self._text_offsets[-1]) - 1].decode("utf-8").split("\n")
+
+    def word(self, pk: int) -> str:
+        start, end = self._text_offsets[pk : pk + 2].tolist()
+        return self.data[self._text + start : self._text + end - 1].decode("utf-8")
+
+    def _find(self, length: int, letter: int, shape: int) -> np.ndarray:
+        """Returns the word ids of the partition with the key (empty if there is none), as a copy, so the file
+        can be closed while they are used."""
+        keys = self.partitions[["length", "letter", "shape"]]
+        target = (length, letter, shape)
+        low, high = 0, len(keys)
+        while low < high:
+            middle = (low + high) // 2
+            if keys[middle].tolist() < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(keys) and keys[low].tolist() == target:
+            offset, count = self.partitions[["offset", "count"]][low].tolist()
+            return self._ids[offset : offset + count].copy()
+        return np.zeros(0, dtype=self._ids.dtype)
+
+    def length_ids(self, length: int) -> np.ndarray:
+        """Ids of the words of the length, in the order of the word list."""
+        return self._find(length, NO_LETTER, 0)
+
+    def hint_ids(self, hint: str) -> np.ndarray:
+        """Ids of the words with the hint (e.g. "a__a_", see make_hint)."""
+        hint = hint.lower()
+        if hint[0] not in self.alphabet:
+            return np.zeros(0, dtype=self._ids.dtype)
+        shape = sum(1 << i for i, c in enumerate(hint) if c == hint[0])
+        return self._find(len(hint), self.alphabet.index(hint[0]), shape)
+
+    def hint_groups(self, limit: int | None = None) -> dict[HintKey, list[str]]:
+        """Words of all hint groups (as HintedGame.groups), of the first limit words only with limit."""
+        groups: list[tuple[int, HintKey, np.ndarray]] = []
+        for length, letter, shape, offset, count in self.partitions.tolist():
+            if letter == NO_LETTER:
+                continue
+            ids = self._ids[offset : offset + count]
+            if limit is not None:
+                ids = ids[ids < limit]
+            if len(ids):
+                groups.append((int(ids[0]), (length, self.alphabet[letter], (mask_to_positions(shape),)), ids))
+        groups.sort(key=lambda group: group[0])  # by the first word, as in HintedGame
+        words = self.words()
+        return {key: [words[pk] for pk in ids.tolist()] for _, key, ids in groups}
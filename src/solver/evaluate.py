@@ -0,0 +1,190 @@
+from collections import Counter
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+from .binary import StrategyFile, open_strategy
+from .game import Choice, ShapeCode, Strategy, get_shape_matrix, group_indices
+from .hinter import HintedGame
+
+
+"""
+Strategy evaluation:
+    max_errors only tells the worst case, but the README compares strategies by the whole distribution of wrong
+    guesses. The evaluator plays all words at once: each node of the strategy gets an array of ids of the words,
+    that reach it, and splits it between its children by the shape codes of the guessed letters.
+    - Errors and turns (number of choices) of all words of a node are updated with one array operation.
+    - Groups of shape codes without a child are uncovered words, a won node with a word that is not guessed yet
+      (some of its letters were not guessed, or more words reach it) is a wrong win. Both are reported, so
+      evaluation is also a consistency check of a strategy (e.g. of a converted or edited strategy file).
+    - Strategies are walked as Choice trees (children are not kept) or as tables of a binary strategy file.
+"""
+
+SMALL_GROUP = 32  # groups of fewer words are split with a dict, np.unique has a large overhead for small arrays
+
+type Children = Callable[[Any], tuple[str, dict[ShapeCode, Any]]]
+
+
+class Evaluation:
+    """Results of playing all words of one or more strategies."""
+
+    def __init__(self) -> None:
+        self.words: list[str] = []
+        self._errors: list[np.ndarray] = []  # parts of errors and turns, added by add
+        self._turns: list[np.ndarray] = []
+        self.uncovered: list[str] = []  # words without a child for their shape
+        self.wrong_wins: list[str] = []  # words in won nodes, that were not guessed
+
+    @property
+    def consistent(self) -> bool:
+        return not self.uncovered and not self.wrong_wins
+
+    @property
+    def errors(self) -> np.ndarray:
+        """Wrong guesses of each word (in the order of words)."""
+        if len(self._errors) != 1:
+            self._errors = [np.concatenate(self._errors or [np.zeros(0, dtype=np.int32)])]
+        return self._errors[0]
+
+    @property
+    def turns(self) -> np.ndarray:
+        """Choices made for each word."""
+        if len(self._turns) != 1:
+            self._turns = [np.concatenate(self._turns or [np.zeros(0, dtype=np.int32)])]
+        return self._turns[0]
+
+    def add(self, words: list[str], errors: np.ndarray, turns: np.ndarray) -> None:
+        self.words += words
+        self._errors.append(errors)
+        self._turns.append(turns)
+
+    def histogram(self) -> dict[int, int]:
+        """Numbers of words by the number of wrong guesses."""
+        return dict(sorted(Counter(self.errors.tolist()).items()))
+
+    def depth_histogram(self) -> dict[int, int]:
+        """Numbers of words by the number of choices made."""
+        return dict(sorted(Counter(self.turns.tolist()).items()))
+
+    def sort_key(self) -> tuple[int, ...]:
+        """The most wrong guesses and then the numbers of words from the most wrong guesses down.
+        The better strategy (as defined in the README) has the smaller key."""
+        histogram = self.histogram()
+        worst = max(histogram, default=0)
+        return (worst, *(histogram.get(errors, 0) for errors in range(worst, -1, -1)))
+
+    def stats(self) -> dict[str, Any]:
+        """The results as a dict (for JSON)."""
+        return {
+            "words": len(self.words),
+            "max_errors": int(self.errors.max(initial=0)),
+            "mean_errors": float(self.errors.mean()) if len(self.errors) else 0.0,
+            "max_turns": int(self.turns.max(initial=0)),
+            "mean_turns": float(self.turns.mean()) if len(self.turns) else 0.0,
+            "histogram": self.histogram(),
+            "depth_histogram": self.depth_histogram(),
+            "uncovered": self.uncovered,
+            "wrong_wins": self.wrong_wins,
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        lines = [
+            f"{stats['words']} words, wrong guesses: max {stats['max_errors']}, mean {stats['mean_errors']:.3f};"
+            + f" choices: max {stats['max_turns']}, mean {stats['mean_turns']:.3f}",
+            "wrong guesses: " + ", ".join(f"{errors}: {count}" for errors, count in stats["histogram"].items()),
+            "choices: " + ", ".join(f"{turns}: {count}" for turns, count in stats["depth_histogram"].items()),
+        ]
+        if self.uncovered:
+            lines.append(f"{len(self.uncovered)} words are not covered: {self.uncovered[:10]}")
+        if self.wrong_wins:
+            lines.append(f"{len(self.wrong_wins)} words are won without being guessed: {self.wrong_wins[:10]}")
+        return "\n".join(lines)
+
+
+def _split(codes: np.ndarray) -> Iterable[tuple[ShapeCode, np.ndarray]]:
+    """Groups equal rows of codes, yields the row and the indices of its rows."""
+    if len(codes) < SMALL_GROUP:
+        groups: dict[ShapeCode, list[int]] = {}
+        for i, row in enumerate(codes.tolist()):
+            groups.setdefault(tuple(row), []).append(i)
+        for row, indices in groups.items():
+            yield row, np.asarray(indices)
+    else:
+        for indices in group_indices(codes):
+            yield tuple(codes[indices[0]].tolist()), indices
+
+
+def _evaluate(
+    evaluation: Evaluation, words: list[str], alphabet: str, root: Any, children: Children, shape_matrix: np.ndarray
+) -> None:
+    """Plays all words of a strategy, children returns the letters and the children of a node."""
+    letter_ids = {c: i for i, c in enumerate(alphabet)}
+    errors = np.zeros(len(words), dtype=np.int32)
+    turns = np.zeros(len(words), dtype=np.int32)
+    all_letters = np.ones(len(alphabet), dtype=bool)
+    stack = [(root, np.arange(len(words)), all_letters)]
+    while stack:
+        node, pks, unguessed = stack.pop()
+        letters, node_children = children(node)
+        if not letters:
+            # won: the rest of each word is empty and all words are the same
+            rows = shape_matrix[pks]
+            if rows[:, unguessed].any() or (rows != rows[0]).any():
+                evaluation.wrong_wins += [words[pk] for pk in pks.tolist()]
+            continue
+        ids = [letter_ids[c] for c in letters]
+        codes = shape_matrix[pks[:, np.newaxis], ids]
+        errors[pks] += (codes == 0).sum(axis=1, dtype=np.int32)
+        turns[pks] += 1
+        unguessed = unguessed.copy()
+        unguessed[ids] = False
+        for shape, indices in _split(codes):
+            child = node_children.get(shape)
+            if child is None:
+                evaluation.uncovered += [words[pk] for pk in pks[indices].tolist()]
+            else:
+                stack.append((child, pks[indices], unguessed))
+    evaluation.add(words, errors, turns)
+
+
+def _choice_children(choice: Choice) -> tuple[str, dict[ShapeCode, Choice]]:
+    return choice.choice, choice.get_children(keep=False) if choice.choice else {}
+
+
+def _evaluate_strategy(evaluation: Evaluation, strategy: Strategy) -> None:
+    root = strategy.start
+    _evaluate(evaluation, strategy.words, strategy.alphabet, root, _choice_children, strategy.shape_matrix)
+
+
+def _evaluate_file(evaluation: Evaluation, file: StrategyFile, hint: str) -> None:
+    alphabet, words, nodes, edges, shapes = file.tables(hint)
+
+    def children(node: int) -> tuple[str, dict[ShapeCode, int]]:
+        mask, first_edge, n_edges = nodes[node].tolist()
+        letters = "".join(sorted(c for i, c in enumerate(alphabet) if mask >> i & 1))
+        node_children = {}
+        for child, shape_index in edges[first_edge : first_edge + n_edges].tolist():
+            node_children[tuple(shapes[shape_index : shape_index + len(letters)].tolist())] = child
+        return letters, node_children
+
+    words = [word.lower() for word in words]
+    _evaluate(evaluation, words, alphabet, 0, children, get_shape_matrix(words, alphabet))
+
+
+def evaluate(strategy: Strategy | HintedGame | StrategyFile | str) -> Evaluation:
+    """Plays all words of the strategy (all strategies of a hinted game or a strategy file, or a path to
+    a binary or JSON strategy file) and returns the results."""
+    evaluation = Evaluation()
+    if isinstance(strategy, str):
+        with open_strategy(strategy) as file:
+            return evaluate(file)
+    if isinstance(strategy, StrategyFile):
+        for hint in strategy.hints():
+            _evaluate_file(evaluation, strategy, hint)
+    elif isinstance(strategy, HintedGame):
+        for group_strategy in strategy.strategies.values():
+            _evaluate_strategy(evaluation, group_strategy)
+    else:
+        _evaluate_strategy(evaluation, strategy)
+    return evaluation
@@ -0,0 +1,60 @@
+from typing import Any, Iterator, TextIO
+import json
+
+from .game import Choice
+
+
+"""
+Streaming JSON export:
+    json.dumps of Strategy.json builds the whole strategy as nested dicts and then one string with all of it.
+    For the hinted strategy of all nouns both are huge, so the strategy is written while walking the Choice tree.
+    - Only the path from the root to the current choice is in memory (one level of shapes for each choice),
+      the text is written to the file in small chunks. Children of choices, that were not created before the export,
+      are not kept (see Choice.children).
+    - The output is the same as the output of json.dumps(..., ensure_ascii=False) with the same indent, so files
+      written by older versions can still be compared with new ones.
+"""
+
+CHUNK_SIZE = 1 << 16  # number of characters collected before they are written to the file
+
+
+def iter_json(value: Any, indent: int | None = 1, level: int = 0) -> Iterator[str]:
+    """Yields the JSON of value in parts. Choice objects in value are encoded as Choice.json_or_won.
+    Without indent, the JSON is compact (no whitespace at all)."""
+    if isinstance(value, Choice):
+        if value.choice == "":
+            yield '"WON!"'
+            return
+        value = [value.choice, dict(value.json_shapes(keep=False))]
+    if isinstance(value, (dict, list, tuple)) and value:
+        if indent is None:
+            newline, separator, item_separator = "", ":", ","
+        else:
+            newline = "\n" + " " * (indent * (level + 1))
+            separator, item_separator = ": ", ","
+        is_dict = isinstance(value, dict)
+        yield "{" if is_dict else "["
+        for i, item in enumerate(value.items() if is_dict else value):
+            yield item_separator + newline if i else newline
+            if is_dict:
+                key, item = item
+                yield json.dumps(key, ensure_ascii=False) + separator
+            yield from iter_json(item, indent, level + 1)
+        if indent is not None:
+            yield "\n" + " " * (indent * level)
+        yield "}" if is_dict else "]"
+    else:
+        yield json.dumps(value, ensure_ascii=False)
+
+
+def write_json(file: TextIO, value: Any, indent: int | None = 1) -> None:
+    """Writes the JSON of value (see iter_json) to the file, without building it in memory."""
+    chunk: list[str] = []
+    size = 0
+    for part in iter_json(value, indent):
+        chunk.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            file.write("".join(chunk))
+            chunk, size = [], 0
+    file.write("".join(chunk))
@@ -1,12 +1,25 @@
-from typing import Optional, Protocol
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Iterable, Iterator, Optional, Protocol, TYPE_CHECKING
 import json
 
+import numpy as np
+
+from .bounds import DEFAULT_BOUNDS, LowerBound, cached_bound
+
+if TYPE_CHECKING:
+    from .anytime import AnytimeSearch
+    from .stats import SolverStats
+
 
 """
 Every word gets triple representation:
  - id as a number
  - string  # lower/upper case is not important for hangman, so every word is converted to lower case
  - tti (WordShape): tuple of tuples of integers: for each letter a tuple tells the positions of the letter in the word
+ - shape code: one row of the shape matrix, for each letter a bitmask of its positions in the word (bit i <=> position i)
+   All shape codes of a tree are stored in a single NumPy matrix (one row per word, one column per letter), so grouping
+   and finding usable letters can be done with vectorized operations instead of loops over words.
 """
 
 """The best strategy
@@ -26,7 +39,10 @@ Solve strategy:
 Optimizations on solve
  - memoization: we store the results of the solve function in a table
     * When trying letters order is important, but the order for the same group is not. So we can memoize the results.
-    * We can uniquely represent the group using only used letters (sorted) and the smallest word in the list.
+    * We can uniquely represent the group using only used letters and the smallest word in the list.
+    * Keys and values of the tables are packed into single integers (see GameStateTree.memo_key and encode_result),
+      tuples of strings took several times more memory. The tables grow to millions of entries on big word lists.
+    * Only results are stored, the strategy is extracted by splitting the words again with the stored letters.
  - killing branches: if we know that a branch will not be the best, we can kill it before calculating everything
     * if already found a solution with n wrong guesses, we can kill the branch if it has n or more wrong guesses
     * the killing can be done when recursively solving the groups. The cost (number of wrong guesses) for the letter
@@ -37,9 +53,22 @@ Optimizations on solve
     * when trying letters, we start with the most frequent ones, because they are likely to give better results
       The sooner we get better results for letters, the more branches can we kill.
       Sorting letters by size of the largest group and the size of the group without the letter did not seem to work that well.
+ - lower bounds: a branch can also be killed before it is expanded, if a lower bound on its value already reaches
+   the kill bound
+    * a group without shared letters has at least 1 wrong guess, more specific bounds are in bounds.py
+    * a letter is at least as bad as its already solved or killed groups (letter_bound), so it can be skipped
+      without solving any of its groups
+    * a letter is dominated by an earlier letter, if the earlier one splits every group of the letter and is missing
+      only from words without the letter (letters with the same groups are a special case). Guessing the earlier
+      letter first and then following the strategy of the letter costs no more wrong guesses, so the letter is never
+      strictly better and can be skipped (the earlier letter wins ties). It is off by default (skip_dominated):
+      such letters were almost always skipped by letter_bound or killed after their first group anyway,
+      so the checks cost more than they saved (and skipping equal letters even lost some useful memoized results).
+    * tree.prunes counts how many groups and letters were killed by the bounds and how many groups were expanded
 """
 
 type WordShape = tuple[tuple[int, ...], ...]
+type ShapeCode = tuple[int, ...]
 type ChoiceJSON = list[str | dict[str, "ChoiceJSON"]] | str
 
 
@@ -54,19 +83,45 @@ def get_tti(word: str, alphabet: str) -> WordShape:
     return tuple(tuple(i for i, c in enumerate(word) if c == letter) for letter in alphabet)
 
 
+def mask_dtype(length: int) -> type[np.unsignedinteger]:
+    """Returns the smallest unsigned integer type with at least length bits."""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if length <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"Words longer than 64 letters are not supported, got length {length}.")
+
+
+def get_shape_matrix(words: list[str], alphabet: str) -> np.ndarray:
+    """Returns the shape codes of the words: a matrix with a row for each word and a column for each letter.
+    Bit i of an element is set if the letter is at position i in the word."""
+    letter_ids = {letter: i for i, letter in enumerate(alphabet)}
+    rows = [[0] * len(alphabet) for _ in words]
+    for row, word in zip(rows, words):
+        for i, c in enumerate(word):
+            if c in letter_ids:
+                row[letter_ids[c]] |= 1 << i
+    dtype = mask_dtype(max(map(len, words), default=0))
+    return np.array(rows, dtype=dtype).reshape(len(words), len(alphabet))
+
+
+def mask_to_positions(mask: int) -> tuple[int, ...]:
+    """Returns the positions of set bits in the mask."""
+    return tuple(i for i in range(mask.bit_length()) if mask >> i & 1)
+
+
 def memoize(func):
     """Memoization decorator specifically for GameStateTree.solve."""
 
-    def wrapper(
-        self: "GameStateTree", word_list: tuple[int, ...], used_letters: str, *, kill_after: int | None = None
+    def wrapper[W](
+        self: "BaseGameStateTree[W]", word_list: W, used_letters: str, *, kill_after: int | None = None
     ) -> tuple[int, str]:
-        key = "".join(sorted(used_letters)), min(word_list)
-        if key in self.memo:
-            return self.memo[key]
+        key = self.memo_key(word_list, used_letters)
+        value = self.memo.get(key)
+        if value is not None:
+            return self.decode_result(value)
 
         if kill_after is not None and kill_after <= 0:
-            self.killed[key] = 0
-            return 0, ""
+            return 0, ""  # a lower bound of 0 is not worth storing, most of the killed groups would have it
         if kill_after is not None and key in self.killed and self.killed[key] >= kill_after:
             return self.killed[key], ""
 
@@ -74,87 +129,153 @@ def memoize(func):
         if kill_after is not None and result[0] >= kill_after:
             self.killed[key] = result[0]
         else:
-            self.memo[key] = result
+            self.memo[key] = self.encode_result(result)
         return result
 
     return wrapper
 
 
-def get_word_shape(pk: int, words_tti: list[WordShape], letters_i: list[int]) -> WordShape:
-    """For a given word returns positions of the letters in that word."""
-    return tuple(words_tti[pk][letter_i] for letter_i in letters_i)
+def group_indices(codes: np.ndarray) -> list[np.ndarray]:
+    """Groups equal rows of codes (or equal elements if codes is 1-dimensional).
+    Returns the indices of rows in each group, groups are ordered by their first row."""
+    if codes.ndim == 1:
+        _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+    # renumber the groups by the first appearance
+    rank = np.empty_like(first)
+    rank[np.argsort(first)] = np.arange(len(first))
+    group_of_row = rank[inverse.reshape(-1)]
+    order = np.argsort(group_of_row, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(group_of_row))[:-1])
 
 
-class GameStateTree:
-    """An object containing the words in all representations and memoization table."""
+class BaseGameStateTree[W](ABC):
+    """An object containing the words in all representations and memoization table.
+    The search does not depend on how word lists are represented, W is the type of word lists. Engines implement
+    the methods that look into word lists (GameStateTree with tuples of word ids, BitsetGameStateTree with bitsets)."""
 
     def __init__(self, words: list[str], alphabet: str) -> None:
         self.original_words: list[str] = list(words)
         self.alphabet: str = str(alphabet).lower()
         self.words: list[str] = list(map(lambda w: str(w).lower(), words))  # ids (pk in code) are the indices in this list
-        self.words_tti: list[WordShape] = list(map(lambda w: get_tti(w, alphabet), self.words))
+        self.shape_matrix: np.ndarray = get_shape_matrix(self.words, self.alphabet)  # rows are shape codes of the words
         self.pks = tuple(range(len(self.words)))
 
-        # memoization table: word list (of ids)) -> tuple(minimal number of wrong guesses in worst case, letter to guess)
-        # word list can be uniqely represented using only used letters (ordered) and smallest word in the list (lowest id)
-        self.memo: dict[tuple[str, int], tuple[int, str]] = dict()
-        self.killed: dict[tuple[str, int], int] = dict()  # word -> lower bound of wrong guesses
-        self.dependency: dict[tuple[str, int], list[tuple[str, int]]] = dict()  # memoization dependency graph
-        # dependency: (used_letters, min_word_id) -> [(used_letters, min_word_id), ...]
-        # used_letters must be sorted
+        # letter sets are bitmasks: bit i <=> i-th letter of the alphabet
+        self.letter_bits: dict[str, int] = {c: 1 << i for i, c in enumerate(self.alphabet)}
+        self.n_letters: int = len(self.alphabet)
+        self._mask_letters: dict[int, str] = {0: ""}  # cache for decoding letter masks
+        self.all_letters: int = (1 << self.n_letters) - 1
+        # per word letter statistics, so groups are not scanned letter by letter:
+        # the mask of letters in the word and the number of occurrences of each letter (a row for each word)
+        self.letter_presence: list[int] = [sum(self.letter_bits.get(c, 0) for c in set(word)) for word in self.words]
+        self.letter_counts: np.ndarray = np.bitwise_count(self.shape_matrix)
+
+        # memoization table: word list (of ids)) -> minimal number of wrong guesses in worst case and letter(s) to guess
+        # word list can be uniqely represented using only used letters and smallest word in the list (lowest id)
+        # both are packed in the key, the value is packed by encode_result
+        self.memo: dict[int, int] = dict()
+        self.killed: dict[int, int] = dict()  # key -> lower bound of wrong guesses
+
+        # additional lower bounds for groups, that are checked before expanding them (see bounds.py)
+        self.lower_bounds: list[LowerBound] = list(DEFAULT_BOUNDS)
+        # skip letters dominated by an earlier letter (see letter_dominates), off by default
+        self.skip_dominated: bool = False
+        # number of groups killed by each lower bound ("unshared" is the bound of 1 in solve),
+        # letters killed by letter_bound ("letter"), dominated letters ("dominated") and expanded groups ("expanded")
+        self.prunes: Counter[str] = Counter()
+        # results of the greedy strategy (see greedy), packed as in memo
+        self.greedy_memo: dict[int, int] = dict()
+
+    @property
+    def words_tti(self) -> list[WordShape]:
+        """tti of all words. It is computed from the shape matrix, so it is not memory efficient."""
+        return [tuple(map(mask_to_positions, row)) for row in self.shape_matrix.tolist()]
+
+    def letters_mask(self, letters: str) -> int:
+        """Returns the bitmask of the (distinct) letters."""
+        return sum(map(self.letter_bits.__getitem__, letters))
+
+    def mask_letters(self, mask: int) -> str:
+        """Returns the letters of the bitmask, in the alphabet order."""
+        letters = self._mask_letters.get(mask)
+        if letters is None:
+            letters = self._mask_letters[mask] = "".join(c for c, bit in self.letter_bits.items() if mask & bit)
+        return letters
+
+    @abstractmethod
+    def memo_key(self, word_list: W, used_letters: str) -> int:
+        """Returns the key of the group in the memoization table: the smallest word id and the used letters mask."""
+
+    def decode_key(self, key: int) -> tuple[str, int]:
+        """Returns the used letters and the smallest word id of the memoization key."""
+        return self.mask_letters(key & ((1 << self.n_letters) - 1)), key >> self.n_letters
+
+    def encode_result(self, result: tuple[int, str]) -> int:
+        """Packs the result of solve (number of wrong guesses, letters to guess) into an integer."""
+        return result[0] << self.n_letters | self.letters_mask(result[1])
+
+    def decode_result(self, value: int) -> tuple[int, str]:
+        """Unpacks the result of solve. Letters are in the alphabet order."""
+        return value >> self.n_letters, self.mask_letters(value & ((1 << self.n_letters) - 1))
 
     @memoize
-    def solve(self, word_list: tuple[int, ...], used_letters: str, *, kill_after: Optional[int] = None) -> tuple[int, str]:
+    def solve(self, word_list: W, used_letters: str, *, kill_after: Optional[int] = None) -> tuple[int, str]:
         """Solves the game for the given word list.
         Returns the tuple (minimal number of wrong guesses in worst case, letter(s) to guess)."""
-        used_letters = "".join(sorted(used_letters))
-        key = used_letters, min(word_list)
         if not word_list:
             return 0, ""
 
         # trivial cases
-        unused_letters = set(self.alphabet) - set(used_letters)
+        n_unused = len(set(self.alphabet) - set(used_letters))
         if kill_after is None:
-            kill_after = len(unused_letters) + 1  # infinity
-        shared_letters: set[str] = unused_letters.intersection(*(set(self.words[pk]) for pk in word_list))
-        shared_joined = "".join(sorted(shared_letters))
+            kill_after = n_unused + 1  # infinity
+        shared_joined, finished = self.shared_letters(word_list, used_letters)
         # if all missing letters are in every word, we can guess all of them  - edge case
-        if all((set(self.words[pk]) & unused_letters).issubset(shared_letters) for pk in word_list):
+        if finished:
             return 0, shared_joined
         # if an unused letter is in all words, it is an obvious choice - nothing can be lost, can only be gained
-        if shared_letters:
+        if shared_joined:
             max_n = 0
-            self.dependency[key] = []
-            for group in self.group_words(word_list, [self.alphabet.index(c) for c in shared_letters]):
-                used_shared = "".join(sorted(used_letters + shared_joined))
+            used_shared = used_letters + shared_joined
+            for group in self.group_words(word_list, [self.alphabet.index(c) for c in shared_joined]):
                 n, _ = self.solve(group, used_shared, kill_after=kill_after)
-                self.dependency[key].append((used_shared, min(group)))
                 if n > max_n:
                     max_n = n
+                    if max_n >= kill_after:
+                        break
             return max_n, shared_joined
 
-        # general case - try all usable letters and choose the best one
-        # find letters in which the words differ (positions matter) - usable letters
-        list_ttis = [{self.words_tti[pk][i] for pk in word_list} for i in range(len(self.alphabet))]
-        usable_letters = [c for i, c in enumerate(self.alphabet) if len(list_ttis[i]) >= 2]
-        if not usable_letters:  # all letters were found
+        # general case - no letter is in all words, so any guess can be wrong: at least 1 wrong guess
+        if kill_after <= 1:
+            self.prunes["unshared"] += 1
+            return 1, ""
+        for lower_bound in self.lower_bounds:
+            bound = lower_bound(self, word_list, used_letters)
+            if bound >= kill_after:
+                self.prunes[lower_bound.__name__] += 1
+                return bound, ""
+
+        # try all usable letters and choose the best one
+        self.prunes["expanded"] += 1
+        options = self.letter_options(word_list)
+        if not options:  # all letters were found
             return 0, ""
-        min_max_n = min(len(unused_letters) + 1, kill_after)  # some big number
+        min_max_n = min(n_unused + 1, kill_after)  # some big number
         best_letter = ""
         kill_child = kill_after
-        # start with the most frequent letters, that is a good strategy
-        # the sooner we get better results, the better - more branches can be killed sooner
-        letter_frequency = {letter: sum(self.words[i].count(letter) for i in word_list) for letter in usable_letters}
-        for letter in sorted(usable_letters, key=lambda c: letter_frequency[c], reverse=True):
-            # group the words by the letter's position in the word
-            groups = self.group_words(word_list, [self.alphabet.index(letter)])
+        for i, (letter, groups) in enumerate(options):
+            used_child = used_letters + letter
+            if self.letter_bound(groups, used_child) >= kill_child:
+                self.prunes["letter"] += 1
+                continue
+            if self.skip_dominated and any(self.letter_dominates(earlier, groups) for _, earlier in options[:i]):
+                self.prunes["dominated"] += 1
+                continue
             max_n = 0
-            group_enumeration = enumerate(groups)
-            group_enumeration = sorted(group_enumeration, key=lambda i_group: len(i_group[1]), reverse=True)
-            for i, group in group_enumeration:
-                # if the letter is not in all of the words of the group, we guessed incorrectly
-                errors = int(all(letter not in self.words[pk] for pk in groups[i]))
-                result = self.solve(group, used_letters + letter, kill_after=kill_child - errors)
+            for errors, group in groups:
+                result = self.solve(group, used_child, kill_after=kill_child - errors)
                 value = result[0] + errors
                 # get the worst case scenario, i.e. the maximum number of wrong guesses
                 if max_n < value:
@@ -167,72 +288,374 @@ class GameStateTree:
             if max_n < min_max_n:
                 min_max_n = max_n
                 best_letter = letter
-                self.dependency[key] = [("".join(sorted(used_letters + letter)), min(group)) for group in groups]
         return min_max_n, best_letter
 
-    def group_words(self, word_list: tuple[int, ...], letters_i: list[int]) -> list[tuple[int, ...]]:
+    def greedy(self, word_list: W, used_letters: str, width: int = 1) -> tuple[int, str]:
+        """Heuristic version of solve: instead of all usable letters only a few candidates are tried, the first width
+        letters in the order of letter_options (the most frequent ones) and the width letters with the fewest words
+        without them. The results are stored in greedy_memo.
+        Returns the tuple (number of wrong guesses in worst case of the greedy strategy, letter(s) to guess).
+        The number is an upper bound for the result of solve."""
+        key = self.memo_key(word_list, used_letters)
+        value = self.greedy_memo.get(key)
+        if value is not None:
+            return self.decode_result(value)
+        if not word_list:
+            return 0, ""
+
+        shared_joined, finished = self.shared_letters(word_list, used_letters)
+        if finished:
+            result = 0, shared_joined
+        elif shared_joined:
+            used_shared = used_letters + shared_joined
+            groups = self.group_words(word_list, [self.alphabet.index(c) for c in shared_joined])
+            result = max(self.greedy(group, used_shared, width)[0] for group in groups), shared_joined
+        else:
+            options = self.letter_options(word_list)
+            by_absent = sorted(options, key=lambda option: sum(self.group_size(g) for errors, g in option[1] if errors))
+            result = len(self.alphabet) + 1, ""
+            tried: set[str] = set()
+            for letter, groups in options[:width] + by_absent[:width]:
+                if letter in tried:
+                    continue
+                tried.add(letter)
+                n = max(errors + self.greedy(group, used_letters + letter, width)[0] for errors, group in groups)
+                if n < result[0]:
+                    result = n, letter
+        self.greedy_memo[key] = self.encode_result(result)
+        return result
+
+    def greedy_all(self, width: int = 1) -> tuple[int, str]:
+        """Computes the greedy strategy for all words (greedy_memo is cleared first)."""
+        self.greedy_memo.clear()
+        return self.greedy(self.root_word_list(), "", width)
+
+    def letter_bound(self, groups: list[tuple[int, W]], used_letters: str) -> int:
+        """Lower bound on the wrong guesses after guessing a letter, that splits the words into groups.
+        Groups, that were already solved or killed, have a known (bound on) value, the others have at least 0."""
+        bound = 0
+        for errors, group in groups:
+            value = cached_bound(self, group, used_letters) + errors
+            if bound < value:
+                bound = value
+        return bound
+
+    @abstractmethod
+    def letter_dominates(self, groups: list[tuple[int, W]], other_groups: list[tuple[int, W]]) -> bool:
+        """Whether a letter with groups is never worse than a letter with other_groups (of the same words):
+        every group is a part of some other group and the words without the letter are without the other letter too."""
+
+    @abstractmethod
+    def shared_letters(self, word_list: W, used_letters: str) -> tuple[str, bool]:
+        """Returns unused letters (sorted), that are in all of the words,
+        and whether all unused letters of all words are among them."""
+
+    @abstractmethod
+    def letter_options(self, word_list: W) -> list[tuple[str, list[tuple[int, W]]]]:
+        """Returns usable letters in the order they should be tried. Each letter comes with the groups
+        it splits the words into, largest first, and the number of wrong guesses (0 or 1) for each group."""
+
+    @abstractmethod
+    def group_words(self, word_list: W, letters_i: list[int]) -> list[W]:
         """Groups the words by their tti."""
-        groups: dict[WordShape, list[int]] = {}
-        for key, element in zip(map(lambda pk: get_word_shape(pk, self.words_tti, letters_i), word_list), word_list):
-            if key not in groups:
-                groups[key] = []
-            groups[key].append(element)
-        return [tuple(group) for group in groups.values()]
 
-    def solve_all(self) -> tuple[int, str]:
-        """Solves the game for all words. The same as calling solve for all words with no starting used letters."""
-        return self.solve(self.pks, "")
+    @abstractmethod
+    def group_size(self, word_list: W) -> int:
+        """Returns the number of words in the list."""
 
-    def _extract_strategies(self, root: tuple[str, int], result_list: list[dict[tuple[str, int], str]]) -> None:
-        _, letters = self.memo[root]
-        result_list.append({root: letters})
-        if root not in self.dependency:
-            return
-        for dependency in self.dependency[root]:
-            self._extract_strategies(dependency, result_list)
+    @abstractmethod
+    def root_word_list(self) -> W:
+        """Returns the word list with all the words."""
 
-    def extract_strategy(self, root: tuple[str, int] = ("", 0)) -> dict[tuple[str, int], str]:
-        """Extracts the strategy from the memoization table. root's used_letters should sorted.
-        All it does is recursively extract the minimal sufficient number of decisions from the memoization table."""
-        if not self.memo:
+    def solve_all(self) -> tuple[int, str]:
+        """Solves the game for all words. The same as calling solve for all words with no starting used letters.
+        The search is warm started: the greedy strategy is computed first and its value is the initial kill bound."""
+        root = self.root_word_list()
+        value = self.memo.get(self.memo_key(root, ""))
+        if value is not None:
+            return self.decode_result(value)
+        bound, _ = self.greedy_all()
+        return self.solve(root, "", kill_after=bound + 1)
+
+    def strategy_keys(
+        self, word_list: W | None = None, used_letters: str = "", memo: dict[int, int] | None = None
+    ) -> Iterator[int]:
+        """Yields memoization keys of all decisions of the strategy for word_list (all words by default).
+        The words are split by the stored letters again, the groups are the states after the decision.
+        memo is the table with the decisions, self.memo by default."""
+        memo = self.memo if memo is None else memo
+        stack = [(self.root_word_list() if word_list is None else word_list, used_letters)]
+        while stack:
+            word_list, used_letters = stack.pop()
+            key = self.memo_key(word_list, used_letters)
+            yield key
+            _, letters = self.decode_result(memo[key])
+            if not letters or self.shared_letters(word_list, used_letters)[1]:
+                continue  # no letters left to guess after this decision
+            used_child = used_letters + letters
+            for group in reversed(self.group_words(word_list, [self.alphabet.index(c) for c in letters])):
+                stack.append((group, used_child))
+
+    def extract_strategy(
+        self, word_list: W | None = None, used_letters: str = "", memo: dict[int, int] | None = None
+    ) -> dict[tuple[str, int], str]:
+        """Extracts the strategy from the memoization table (or memo, e.g. greedy_memo), for word_list (all words by default).
+        All it does is recursively extract the minimal sufficient number of decisions from the memoization table.
+        Keys of the strategy are (used letters, smallest word id), used letters are sorted."""
+        memo = self.memo if memo is None else memo
+        if not memo:
             # solve_all has not been run. It can be computationally expensive, so it is not executed implicitly.
             raise LookupError("No strategy found. Please run solve_all first.")
-        _, letters = self.memo[root]
-        result = {root: letters}
-        results: list[dict[tuple[str, int], str]] = []
-        if root not in self.dependency:
-            return result
-        for dependency in self.dependency[root]:
-            self._extract_strategies(dependency, result_list=results)
-        for d in results:
-            result.update(d)
+        result = {}
+        for key in self.strategy_keys(word_list, used_letters, memo):
+            used, word = self.decode_key(key)
+            result["".join(sorted(used)), word] = "".join(sorted(self.decode_result(memo[key])[1]))
         return result
 
 
+class GameStateTree(BaseGameStateTree[tuple[int, ...]]):
+    """Word lists are tuples of word ids (sorted)."""
+
+    def memo_key(self, word_list: tuple[int, ...], used_letters: str) -> int:
+        return min(word_list) << self.n_letters | self.letters_mask(used_letters)
+
+    def letter_dominates(
+        self, groups: list[tuple[int, tuple[int, ...]]], other_groups: list[tuple[int, tuple[int, ...]]]
+    ) -> bool:
+        absent = next((group for errors, group in groups if errors), ())
+        other_absent = next((group for errors, group in other_groups if errors), ())
+        if not set(absent).issubset(other_absent):
+            return False
+        other_group_of = {pk: i for i, (_, group) in enumerate(other_groups) for pk in group}
+        return all(len({other_group_of[pk] for pk in group}) == 1 for _, group in groups)
+
+    def shared_letters(self, word_list: tuple[int, ...], used_letters: str) -> tuple[str, bool]:
+        unused = self.all_letters & ~self.letters_mask(used_letters)
+        shared, present = unused, 0
+        for pk in word_list:
+            letters = self.letter_presence[pk]
+            shared &= letters
+            present |= letters
+        # all unused letters of all words are shared
+        finished = present & unused == shared
+        return "".join(sorted(self.mask_letters(shared))), finished
+
+    def letter_options(self, word_list: tuple[int, ...]) -> list[tuple[str, list[tuple[int, tuple[int, ...]]]]]:
+        # find letters in which the words differ (positions matter) - usable letters
+        codes = self.shape_matrix[np.asarray(word_list)]
+        usable_mask = (codes != codes[0]).any(axis=0).tolist()
+        usable_letters = [c for c, usable in zip(self.alphabet, usable_mask) if usable]
+        if not usable_letters:
+            return []
+        letters_i = [self.alphabet.index(c) for c in usable_letters]
+        options: list[tuple[str, list[tuple[int, tuple[int, ...]]]]] = []
+        # group the words by the letter's position in the word, for all usable letters at once
+        for letter, letter_i, groups in zip(usable_letters, letters_i, self.split_words(word_list, letters_i)):
+            # we start solving the largest groups, they are likely to give the worst results, so they are killed sooner
+            groups.sort(key=len, reverse=True)
+            # if the letter is not in the words of the group, we guessed incorrectly
+            options.append((letter, [(int(self.shape_matrix[group[0], letter_i] == 0), group) for group in groups]))
+        # start with the most frequent letters, that is a good strategy
+        # the sooner we get better results, the better - more branches can be killed sooner
+        counts = self.letter_counts[np.asarray(word_list)[:, np.newaxis], letters_i].sum(axis=0)
+        letter_frequency = dict(zip(usable_letters, counts.tolist()))
+        options.sort(key=lambda option: letter_frequency[option[0]], reverse=True)
+        return options
+
+    def group_words(self, word_list: tuple[int, ...], letters_i: list[int]) -> list[tuple[int, ...]]:
+        """Groups the words by their tti. Groups are ordered by their first word in word_list."""
+        if len(letters_i) == 1:
+            return self.split_words(word_list, letters_i)[0]
+        pks = np.asarray(word_list)
+        codes = self.shape_matrix[pks[:, np.newaxis], letters_i]
+        return [tuple(pks[indices].tolist()) for indices in group_indices(codes)]
+
+    def split_words(self, word_list: tuple[int, ...], letters_i: list[int]) -> list[list[tuple[int, ...]]]:
+        """For each of the letters groups the words by positions of that letter.
+        word_list should be sorted, groups are then sorted by their smallest word."""
+        pks = np.asarray(word_list)
+        codes = self.shape_matrix[pks[np.newaxis, :], np.asarray(letters_i)[:, np.newaxis]]  # a row for each letter
+        order = np.argsort(codes, axis=1, kind="stable")
+        sorted_codes = np.take_along_axis(codes, order, axis=1)
+        # a group starts where the shape code changes
+        cut_rows, cut_columns = np.nonzero(sorted_codes[:, 1:] != sorted_codes[:, :-1])
+        cuts: list[list[int]] = [[0] for _ in letters_i]
+        for row, column in zip(cut_rows.tolist(), cut_columns.tolist()):
+            cuts[row].append(column + 1)
+        splits = []
+        for sorted_pks, bounds in zip(pks[order].tolist(), cuts):
+            bounds.append(len(sorted_pks))
+            groups = [tuple(sorted_pks[start:end]) for start, end in zip(bounds, bounds[1:])]
+            groups.sort()
+            splits.append(groups)
+        return splits
+
+    def group_size(self, word_list: tuple[int, ...]) -> int:
+        return len(word_list)
+
+    def root_word_list(self) -> tuple[int, ...]:
+        return self.pks
+
+
 class Strategy:
     """A class for managing strategies."""
 
-    def __init__(self, tree: GameStateTree | list[str]) -> None:
+    def __init__(
+        self,
+        tree: BaseGameStateTree | list[str],
+        tree_class: type[BaseGameStateTree] = GameStateTree,
+        workers: int = 1,
+        checkpoint: str | None = None,
+        resume: bool = False,
+        fast: bool = False,
+        time_budget: float | None = None,
+        stats: "SolverStats | None" = None,
+        choice_cache: int | None = None,
+    ) -> None:
         """Initializes the strategy from a tree or a list of words.
-        If a list of words is provided, it is converted to a tree and solve_all is called.
-        Attribute start can be used to access the root of the decision tree, which is of type Choice."""
-
+        If a list of words is provided, it is converted to a tree of type tree_class and solve_all is called.
+        With fast, the greedy strategy is used instead of the best one (see GameStateTree.greedy).
+        With time_budget (in seconds), the best strategy found in that time is used (see AnytimeSearch),
+        if it is not the best one, the search can be continued with improve.
+        Attribute lower_bound is a proven lower bound of max_errors of the best strategy.
+        With more than one worker, letters at the root are evaluated in parallel (see solve_parallel).
+        If checkpoint (path to a database) is given, memoization tables are stored there while solving
+        and with resume the stored tables are used (see solve_checkpointed).
+        With stats, statistics of solving the tree are collected there (see SolverStats).
+        Attribute start can be used to access the root of the decision tree, which is of type Choice.
+        Choices create their children when they are first needed. With choice_cache, at most that many choices
+        keep their children, the least recently used ones forget them (and create them again if needed)."""
+
+        if (fast or time_budget is not None) and (workers > 1 or checkpoint is not None or resume):
+            raise ValueError("fast and time_budget can not be combined with workers, checkpoint or resume.")
         if isinstance(tree, list):
             wordlen = len(tree[0])
             assert (len(word) == wordlen for word in tree), "All words should have the same length."
             alphabet = set.union(*(set(word.lower()) for word in tree))
             alphabet = "".join(sorted(alphabet))
-            tree = GameStateTree(tree, alphabet)
-            tree.solve_all()
+            tree = tree_class(tree, alphabet)
+            if stats is not None:
+                stats.attach(tree)
+            # parallel, persist and anytime import this module
+            if fast or time_budget is not None:
+                pass  # solved below
+            elif checkpoint is not None:
+                from .persist import solve_checkpointed
+
+                solve_checkpointed(tree, checkpoint, resume=resume, workers=workers)
+            elif workers > 1:
+                from .parallel import solve_parallel
+
+                solve_parallel(tree, workers)
+            else:
+                tree.solve_all()
         self.original_words: list[str] = tree.original_words.copy()
         self.alphabet: str = tree.alphabet
         self.words: list[str] = tree.words.copy()
-        self.words_tti: list[WordShape] = tree.words_tti.copy()
-
-        self.strategy: dict[tuple[str, int], str] = tree.extract_strategy()
-        self.max_errors, _ = tree.solve_all()
+        self.word_ids: dict[str, int] = {}  # ids of words, the first one of duplicates
+        for pk, word in enumerate(self.words):
+            self.word_ids.setdefault(word, pk)
+        self.shape_matrix: np.ndarray = tree.shape_matrix
+        self.letter_bits: dict[str, int] = tree.letter_bits
+        self.letter_presence: list[int] = tree.letter_presence
+
+        self.lower_bound: int
+        self.search: "AnytimeSearch | None" = None  # search of the time limited strategy, until it is the best one
+        if time_budget is not None:
+            from .anytime import AnytimeSearch
+
+            search = AnytimeSearch(tree)
+            search.run(time_budget)
+            self.max_errors, self.lower_bound = search.upper_bound, search.lower_bound
+            self.strategy: dict[tuple[str, int], str] = tree.extract_strategy(memo=search.memo)
+            if not search.optimal:
+                self.search = search
+        elif fast:
+            self.max_errors, _ = tree.greedy_all()
+            self.lower_bound = 0
+            self.strategy = tree.extract_strategy(memo=tree.greedy_memo)
+        else:
+            self.strategy = tree.extract_strategy()
+            self.max_errors, _ = tree.solve_all()
+            self.lower_bound = self.max_errors
+        if stats is not None:
+            stats.detach(tree)
+        self.choice_cache: int | None = choice_cache
+        self._expanded: OrderedDict[int, Choice] = OrderedDict()  # choices with children, by id, the last used last
         self.start = Choice("", list(tree.pks), self)
 
+    @classmethod
+    def from_decisions(
+        cls,
+        words: list[str],
+        alphabet: str,
+        decisions: dict[tuple[str, int], str],
+        max_errors: int,
+        lower_bound: int | None = None,
+    ) -> "Strategy":
+        """Creates the strategy from its decisions (as attribute strategy, with "" for won states) without solving.
+        It is used to load stored strategies (see binary.py)."""
+        tree = GameStateTree(words, alphabet)
+        for (used_letters, pk), letters in decisions.items():
+            tree.memo[tree.memo_key((pk,), used_letters)] = tree.encode_result((0, letters))
+        tree.memo[tree.memo_key(tree.pks, "")] = tree.encode_result((max_errors, decisions["", 0]))
+        strategy = cls(tree)
+        strategy.lower_bound = max_errors if lower_bound is None else lower_bound
+        return strategy
+
+    def improve(self, seconds: float, stats: "SolverStats | None" = None) -> None:
+        """Continues the search of a strategy created with time_budget for (about) seconds more (see AnytimeSearch.run).
+        If a better strategy is found, it replaces this one. With stats, statistics of the search are collected there."""
+        search = self.search
+        if search is None:
+            return
+        if stats is not None:
+            stats.attach(search.tree)
+        search.run(seconds)
+        if stats is not None:
+            stats.detach(search.tree)
+        better = search.upper_bound < self.max_errors
+        self.update(search.lower_bound, search.upper_bound, search.tree.extract_strategy(memo=search.memo) if better else None)
+        if search.optimal:
+            self.search = None
+
+    def update(self, lower_bound: int, max_errors: int, decisions: dict[tuple[str, int], str] | None = None) -> None:
+        """Sets the bounds found by a continued search (see improve). With decisions (as attribute strategy),
+        the better strategy with max_errors wrong guesses replaces this one."""
+        self.lower_bound = lower_bound
+        if decisions is not None:
+            self.max_errors = max_errors
+            self.strategy = decisions
+            self._expanded.clear()
+            self.start = Choice("", list(range(len(self.words))), self)
+
+    def use_children(self, choice: "Choice") -> None:
+        """Marks the children of the choice as used, with choice_cache the least recently used children are forgotten."""
+        if self.choice_cache is None:
+            return
+        self._expanded[id(choice)] = choice
+        self._expanded.move_to_end(id(choice))
+        while len(self._expanded) > self.choice_cache:
+            _, old = self._expanded.popitem(last=False)
+            old._children = None
+
+    def play(self, word: str) -> tuple[int, int]:
+        """Plays the game with the word, returns the number of wrong guesses and the number of choices made."""
+        pk = self.word_ids[word.lower()]
+        shape_row = self.shape_matrix[pk].tolist()
+        presence = self.letter_presence[pk]
+        errors = turns = 0
+        choice = self.start
+        while choice.choice:
+            errors += sum(not presence & self.letter_bits[c] for c in choice.choice)
+            turns += 1
+            choice = choice.children[tuple(shape_row[i] for i in choice.letterids)]
+        return errors, turns
+
+    def play_many(self, words: Iterable[str]) -> list[tuple[int, int]]:
+        """Plays the game with each word (see play)."""
+        return [self.play(word) for word in words]
+
     def get_strategy(self, word_list: list[int], used_letters: str) -> str:
         """Returns the best letter to guess.
         Assumes that word_list makes sense in the context of the used_letters.
@@ -241,56 +664,88 @@ class Strategy:
         return self.strategy[used_letters, min(word_list)]
 
     def json(self) -> dict[str, ChoiceJSON | list[str] | int | str]:
+        return {key: value.json_or_won() if isinstance(value, Choice) else value for key, value in self.json_fields().items()}
+
+    def json_fields(self) -> dict[str, "Choice | list[str] | int | str"]:
+        """The same as json, but the strategy is not converted, it is the root Choice (see export.write_json)."""
         return {
             "max_errors": self.max_errors,
             "alphabet": self.alphabet,
             "words": self.words,
-            "strategy": self.start.json_or_won(),
+            "strategy": self.start,
         }
 
 
 class Choice:
-    """A tree strategy representation."""
+    """A tree strategy representation. Children are created on the first access (see children)."""
+
+    # there can be millions of choices, without __dict__ they are much smaller
+    __slots__ = ("strategy", "used_letters", "word_list", "choice", "letterids", "_children")
 
     def __init__(self, used_letters: str, word_list: list[int], strategy: Strategy) -> None:
-        """Initializes the choice. With the help of the strategy, it initializes
-        all later choices that may be needed when following the optimal strategy."""
+        """Initializes the choice, the letters to guess are looked up in the strategy."""
         assert word_list, "Choice should have at least one word"
 
         self.strategy: Strategy = strategy
         self.used_letters: str = "".join(sorted(used_letters))
         self.word_list: list[int] = word_list
+        self._children: dict[ShapeCode, Choice] | None = None
 
         self.choice: str
-        self.shapes: list[WordShape]
         self.letterids: list[int]
-        self.children: dict[WordShape, Choice]
-
-        if set.union(*(set(strategy.words[pk]) for pk in word_list)).issubset(set(used_letters)):
+        present = 0
+        for pk in word_list:
+            present |= strategy.letter_presence[pk]
+        if not present & ~sum(map(strategy.letter_bits.__getitem__, self.used_letters)):
             # all letters were found
             self.choice = ""
             self.letterids = []
-            self.shapes = []
-            self.children = {}
+            self._children = {}
             return
-
-        # recursive initialization of the children - all poosible future choices
         self.choice = self.strategy.get_strategy(
             word_list=word_list,
             used_letters=used_letters,
         )
         self.letterids = [self.strategy.alphabet.index(letter) for letter in self.choice]
-        shapes = [get_word_shape(pk, self.strategy.words_tti, self.letterids) for pk in word_list]
-        self.shapes = list(set(shapes))
-        shape_words: dict[WordShape, list[int]] = {shape: [] for shape in self.shapes}
-        for shape, pk in zip(shapes, word_list):
-            shape_words[shape].append(pk)
-        self.children = {shape: Choice(used_letters + self.choice, shape_words[shape], strategy) for shape in self.shapes}
-
-    def word_shape(self, word: str) -> WordShape:
-        """Slow for calling multiple times."""
-        pk = self.strategy.words.index(word)
-        return get_word_shape(pk, self.strategy.words_tti, self.letterids)
+
+    @property
+    def children(self) -> dict[ShapeCode, "Choice"]:
+        """Choices after this one, by shape codes of the guessed letters. They are created on the first access."""
+        return self.get_children()
+
+    def get_children(self, keep: bool = True) -> dict[ShapeCode, "Choice"]:
+        """Returns the children. Without keep, children that were not created yet are not stored in the choice
+        (e.g. for export, where each choice is needed only once)."""
+        children = self._children
+        if children is None:
+            children = self._create_children()
+            if not keep:
+                return children
+            self._children = children
+        if self.choice:
+            self.strategy.use_children(self)
+        return children
+
+    @property
+    def shapes(self) -> list[ShapeCode]:
+        return list(self.children)
+
+    def _create_children(self) -> dict[ShapeCode, "Choice"]:
+        strategy = self.strategy
+        codes = strategy.shape_matrix[np.asarray(self.word_list)[:, np.newaxis], self.letterids]
+        # groups are small, grouping with a dict is faster than group_indices
+        groups: dict[ShapeCode, list[int]] = {}
+        for pk, shape in zip(self.word_list, codes.tolist()):
+            groups.setdefault(tuple(shape), []).append(pk)
+        # children are ordered as a set of their tti, so the exported JSON is the same as before shape codes were used
+        ttis = {tuple(map(mask_to_positions, shape)): shape for shape in groups}
+        used_letters = self.used_letters + self.choice
+        return {ttis[tti]: Choice(used_letters, groups[ttis[tti]], strategy) for tti in set(list(ttis))}
+
+    def word_shape(self, word: str) -> ShapeCode:
+        """Returns the shape code of the word after this choice, i.e. the key of the next choice in children."""
+        pk = self.strategy.word_ids[word.lower()]
+        return tuple(self.strategy.shape_matrix[pk, self.letterids].tolist())
 
     def move(self, word: str) -> "Choice":
         return self.children[self.word_shape(word)]
@@ -301,20 +756,24 @@ class Choice:
     def json_or_won(self) -> ChoiceJSON:
         if self.choice == "":
             return "WON!"
+        return [self.choice, {shape: child.json_or_won() for shape, child in self.json_shapes()}]
 
+    def json_shapes(self, keep: bool = True) -> list[tuple[str, "Choice"]]:
+        """Returns the children with the shapes of the word after the choice (e.g. "a_a__"), in the JSON order.
+        keep is passed to get_children."""
         word = ["_"] * len(self.strategy.words[self.word_list[0]])
         used_ids = [self.strategy.alphabet.index(c) for c in self.used_letters]
-        common_shape = get_word_shape(self.word_list[0], self.strategy.words_tti, used_ids)
-        for i, c in zip(common_shape, self.used_letters):
-            for j in i:
+        common_shape = self.strategy.shape_matrix[self.word_list[0], used_ids].tolist()
+        for mask, c in zip(common_shape, self.used_letters):
+            for j in mask_to_positions(mask):
                 word[j] = c
-        all_shapes = [word.copy() for _ in self.shapes]
-        for pos, shape in enumerate(self.shapes):
-            for i, c in zip(shape, self.choice):
-                for j in i:
+        children = self.get_children(keep)
+        all_shapes = [word.copy() for _ in children]
+        for pos, shape in enumerate(children):
+            for mask, c in zip(shape, self.choice):
+                for j in mask_to_positions(mask):
                     all_shapes[pos][j] = c
-        all_shapes = ["".join(shape) for shape in all_shapes]
-        return [self.choice, {all_shapes[i]: self.children[shape].json_or_won() for i, shape in enumerate(self.shapes)}]
+        return [("".join(shape), child) for shape, child in zip(all_shapes, children.values())]
 
     def __str__(self) -> str:
         return json.dumps(self.json_or_won())
@@ -1,5 +1,9 @@
-from .game import WordShape, get_tti, Strategy
-from typing import Any
+from .anytime import AnytimeSearch
+from .game import BaseGameStateTree, GameStateTree, WordShape, get_tti, Strategy
+from .stats import SolverStats
+from typing import Any, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+import time
 
 
 def make_hint(word: str) -> str:
@@ -16,6 +20,57 @@ def key_to_hint(key: tuple[int, str, WordShape]) -> str:
     return "".join(chars)
 
 
+def strategize_group(
+    key: tuple[int, str, WordShape],
+    words: list[str],
+    tree_class: type[BaseGameStateTree],
+    checkpoint: str | None = None,
+    resume: bool = False,
+    time_budget: float | None = None,
+    stats: SolverStats | None = None,
+) -> tuple[tuple[int, str, WordShape], Strategy, SolverStats | None]:
+    """Create a strategy for a single group. Used by worker processes of HintedGame.strategize.
+    Statistics are returned too, a worker process collects them in its own copy of stats."""
+    strategy = Strategy(
+        words, tree_class=tree_class, checkpoint=checkpoint, resume=resume, time_budget=time_budget, stats=stats
+    )
+    return key, strategy, stats
+
+
+# searches of the groups without the best strategy, kept by the worker process that solved them (see _strategize_parallel)
+_searches: dict[tuple[int, str, WordShape], AnytimeSearch] = {}
+
+
+def strategize_pinned(
+    key: tuple[int, str, WordShape], words: list[str], **options: Any
+) -> tuple[tuple[int, str, WordShape], Strategy, SolverStats | None]:
+    """The same as strategize_group, but the search of a strategy, that may not be the best one, stays in the worker
+    process (it is continued by improve_group), the strategy is returned without it."""
+    key, strategy, stats = strategize_group(key, words, **options)
+    if strategy.search is not None:
+        _searches[key] = strategy.search
+        strategy.search = None
+    return key, strategy, stats
+
+
+def improve_group(
+    key: tuple[int, str, WordShape], seconds: float, stats: SolverStats | None = None
+) -> tuple[tuple[int, str, WordShape], tuple[int, int, dict[tuple[str, int], str] | None], SolverStats | None]:
+    """Continue the search of a group solved by strategize_pinned in this worker process (see Strategy.improve).
+    Only the bounds and the decisions of a better strategy are returned (arguments of Strategy.update)."""
+    search = _searches[key]
+    max_errors = search.upper_bound
+    if stats is not None:
+        stats.attach(search.tree)
+    search.run(seconds)
+    if stats is not None:
+        stats.detach(search.tree)
+    if search.optimal:
+        del _searches[key]
+    decisions = search.tree.extract_strategy(memo=search.memo) if search.upper_bound < max_errors else None
+    return key, (search.lower_bound, search.upper_bound, decisions), stats
+
+
 class HintedGame:
     """A game with hinted first letter of each word. It also allows different lengths of words."""
 
@@ -29,21 +84,187 @@ class HintedGame:
             self.groups[self.word_keys[word.lower()]].append(word)
         self.strategies: dict[tuple[int, str, WordShape], Strategy] = {}
 
-    def strategize(self, print_progress: bool = True) -> None:
-        """Create strategies for each group of words."""
+    @classmethod
+    def from_groups(cls, words: list[str], groups: dict[tuple[int, str, WordShape], list[str]]) -> "HintedGame":
+        """A game with groups computed before (e.g. by Corpus.hint_groups), in the order of their first words."""
+        game = cls.__new__(cls)
+        game.words = list(words)
+        game.word_keys = {word.lower(): key for key, group in groups.items() for word in group}
+        game.groups = groups
+        game.strategies = {}
+        return game
+
+    def strategize(
+        self,
+        print_progress: bool = True,
+        tree_class: type[BaseGameStateTree] = GameStateTree,
+        workers: int = 1,
+        checkpoint: str | None = None,
+        resume: bool = False,
+        time_budget: float | None = None,
+        stats: SolverStats | None = None,
+    ) -> None:
+        """Create strategies for each group of words. tree_class is the solver engine used for each group.
+        With more than one worker, groups are solved in parallel in worker processes.
+        With checkpoint (path to a database), progress is stored there and with resume finished groups are
+        loaded instead of solved again (see Strategy).
+        With time_budget (in seconds, for all groups together), the best strategies found in that time are used.
+        Time left by the groups, that are solved sooner, is given to the remaining ones. If there is time left after
+        all groups, it is spent on the groups without the best strategy (see _improve).
+        With stats, statistics of solving all groups are collected there (see SolverStats)."""
+        if time_budget is not None and (checkpoint is not None or resume):
+            raise ValueError("time_budget can not be combined with checkpoint or resume.")
         if self.strategies:
             return
         self.strategies: dict[tuple[int, str, WordShape], Strategy] = {}
-        for i, key in enumerate(self.groups):
-            self.strategies[key] = Strategy(self.groups[key])
-            if print_progress:
-                print(f"Strategized {i + 1}/{len(self.groups)} groups." + " " * 10, end="\r")
+        options: dict[str, Any] = {"tree_class": tree_class, "checkpoint": checkpoint, "resume": resume}
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+        if workers > 1:
+            if stats is not None:
+                options["stats"] = SolverStats()  # each task gets a copy, they are merged into stats
+            self._strategize_parallel(print_progress, workers, options, stats, deadline)
+        else:
+            options["stats"] = stats
+            for i, key in enumerate(self.groups):
+                if deadline is not None:
+                    options["time_budget"] = max(0.0, deadline - time.monotonic()) / (len(self.groups) - i)
+                _, self.strategies[key], _ = strategize_group(key, self.groups[key], **options)
+                if print_progress:
+                    print(f"Strategized {i + 1}/{len(self.groups)} groups." + " " * 10, end="\r")
+            if deadline is not None:
+                self._improve(deadline, stats)
+        for strategy in self.strategies.values():
+            strategy.search = None  # the searches (and their trees) are not needed after the deadline
+
+    def _unproven(self, strategies: dict[tuple[int, str, WordShape], Strategy]) -> list[tuple[int, str, WordShape]]:
+        """Keys of the groups, whose strategy may not be the best one, the groups with more wrong guesses first."""
+        keys = [key for key, strategy in strategies.items() if strategy.lower_bound < strategy.max_errors]
+        return sorted(keys, key=lambda key: strategies[key].max_errors, reverse=True)
+
+    def _improve(self, deadline: float, stats: SolverStats | None) -> None:
+        """Spend the time left until the deadline on the groups without the best strategy, their searches are
+        continued (see Strategy.improve). Each round splits the time left equally among them, so time left by
+        the groups, that are solved sooner, goes to the rest."""
+        while keys := self._unproven(self.strategies):
+            for i, key in enumerate(keys):
+                seconds = deadline - time.monotonic()
+                if seconds <= 0:
+                    return
+                self.strategies[key].improve(seconds / (len(keys) - i), stats)
+
+    def _strategize_parallel(
+        self,
+        print_progress: bool,
+        workers: int,
+        options: dict[str, Any],
+        stats: SolverStats | None,
+        deadline: float | None = None,
+    ) -> None:
+        """Solve the groups in worker processes. Groups are independent, so each worker builds its own tree.
+        With deadline, the time left after all groups is spent on the groups without the best strategy, in rounds
+        as in _improve. Their searches stay in the workers that solved them (see strategize_pinned), so continuing
+        them sends only the time budget and returns only the bounds and a better strategy (see improve_group).
+        Each worker is a pool with a single process, so that a group can be sent to its worker."""
+        # the largest groups are the hardest, they are started first, so that a big group does not
+        # start at the end, when other workers have nothing left to do
+        keys = sorted(self.groups, key=lambda key: len(self.groups[key]), reverse=True)
+        strategies: dict[tuple[int, str, WordShape], Strategy] = {}
+        homes: dict[tuple[int, str, WordShape], int] = {}  # workers that keep the searches of the groups
+        executors = [ProcessPoolExecutor(max_workers=1) for _ in range(min(workers, len(keys)))]
+        try:
+            while keys:
+                self._parallel_round(executors, keys, strategies, homes, print_progress, options, stats, deadline)
+                if deadline is None or time.monotonic() >= deadline:
+                    break
+                keys = self._unproven(strategies)
+        finally:
+            for executor in executors:
+                executor.shutdown(cancel_futures=True)
+        # keep the same order of groups as the sequential version
+        self.strategies = {key: strategies[key] for key in self.groups}
+
+    def _parallel_round(
+        self,
+        executors: list[ProcessPoolExecutor],
+        keys: list[tuple[int, str, WordShape]],
+        strategies: dict[tuple[int, str, WordShape], Strategy],
+        homes: dict[tuple[int, str, WordShape], int],
+        print_progress: bool,
+        options: dict[str, Any],
+        stats: SolverStats | None,
+        deadline: float | None,
+    ) -> None:
+        """Solve the groups of keys in the workers, or continue their searches if they are in strategies already.
+        A new group is submitted to the first free worker. With deadline, it gets an equal share of the worker time
+        left (not promised to the running groups), so time left by groups, that are solved sooner, goes to the rest.
+        A search is continued by the worker that keeps it (see homes), with an equal share of the time left among
+        the groups of the worker."""
+        pending = list(keys)
+        running: dict[Future, tuple[int, float]] = {}  # tasks, their workers and the ends of their time budgets
+
+        def submit(worker: int) -> None:
+            key = next((key for key in pending if homes.get(key, worker) == worker), None)
+            if key is None:
+                return  # the other groups are kept by other workers
+            pending.remove(key)
+            end = 0.0
+            time_budget = None
+            if deadline is not None:
+                now = time.monotonic()
+                if key in strategies:
+                    left = 1 + sum(homes[other] == worker for other in pending)
+                    time_budget = max(0.0, deadline - now) / left
+                else:
+                    promised = sum(max(0.0, end - now) for _, end in running.values())
+                    left = len(pending) + 1
+                    time_budget = max(0.0, min(deadline - now, (len(executors) * (deadline - now) - promised) / left))
+                end = now + time_budget
+            executor = executors[worker]
+            if key in strategies:  # rounds after the first one are run only with deadline
+                future = executor.submit(improve_group, key, time_budget or 0.0, options.get("stats"))
+            else:
+                future = executor.submit(strategize_pinned, key, self.groups[key], **options, time_budget=time_budget)
+            running[future] = worker, end
+
+        for worker in range(len(executors)):
+            submit(worker)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                worker, _ = running.pop(future)
+                key, result, group_stats = future.result()
+                solved = key not in strategies
+                if solved:
+                    strategies[key] = result
+                    homes[key] = worker
+                else:
+                    strategies[key].update(*result)
+                if stats is not None and group_stats is not None:
+                    stats.merge(group_stats)
+                    if stats.progress:
+                        stats.print_progress()
+                if print_progress and solved:
+                    print(f"Strategized {len(strategies)}/{len(self.groups)} groups." + " " * 10, end="\r")
+                submit(worker)
 
     def get_strat_by_hint(self, hint: str) -> Strategy:
         """Return the strategy for a given hint. (Hint looks like 'a__a_')"""
         hint = hint.lower()
         return self.strategies[(len(hint), hint[0], get_tti(hint, hint[0]))]
 
+    def play(self, word: str) -> tuple[int, int]:
+        """Plays the game with the word and its hint, returns the number of wrong guesses and choices (see Strategy.play)."""
+        return self.strategies[self.word_keys[word.lower()]].play(word)
+
+    def play_many(self, words: Iterable[str]) -> list[tuple[int, int]]:
+        """Plays the game with each word (see play)."""
+        return [self.play(word) for word in words]
+
     def json(self) -> dict[str, Any]:
         """Return a JSON-serializable dictionary of the object."""
         return {"words": self.words, "strategies": {key_to_hint(key): strat.json() for key, strat in self.strategies.items()}}
+
+    def json_fields(self) -> dict[str, Any]:
+        """The same as json, but strategies are not converted (see Strategy.json_fields and export.write_json)."""
+        strategies = {key_to_hint(key): strat.json_fields() for key, strat in self.strategies.items()}
+        return {"words": self.words, "strategies": strategies}
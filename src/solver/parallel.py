@@ -0,0 +1,108 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import Array
+from typing import Any
+
+from .game import BaseGameStateTree
+
+
+"""
+Parallel root search:
+    At the root, every usable letter is evaluated in its own task. Tasks run in a process pool,
+    each worker process has its own GameStateTree (and memoization table), that is reused for all of its tasks.
+    - Workers share the worst case values of finished letters. Before solving each group, a worker recomputes
+      its kill bound from them, so it prunes with a tighter bound as soon as another worker finds a better letter.
+    - A letter is killed only if it can not be the letter that GameStateTree.solve would choose, i.e. it is not better
+      than some earlier letter (in the order of GameStateTree.letter_options) or it is worse than some later letter.
+      So the chosen letter (and the whole strategy) is the same as in the sequential version.
+    - Workers return the memoization entries needed for the strategy of their letter, which are merged into the tree,
+      so extract_strategy and Strategy work as if solve_all was called.
+    - With checkpoint, every worker loads the stored tables of the word list and checkpoints its own tables
+      (while solving and after each root letter), so work of finished letters survives a crash of the whole run.
+"""
+
+_tree: BaseGameStateTree | None = None  # tree of the worker process
+_values: Any = None  # shared array: worst case value for each finished root letter, infinity for the others
+_store: Any = None  # MemoStore of the worker process, with checkpoint
+
+
+def _init_worker(
+    tree_class: type[BaseGameStateTree], words: list[str], alphabet: str, values: Any, checkpoint: str | None = None
+) -> None:
+    global _tree, _values, _store
+    _tree = tree_class(words, alphabet)
+    _values = values
+    if checkpoint is not None:
+        from .persist import MemoStore, tree_namespace  # persist imports this module
+
+        _store = MemoStore(checkpoint, tree_namespace(_tree))
+        _store.load(_tree)
+        _store.attach(_tree)
+
+
+def letter_bound(position: int, values: list[int], infinity: int) -> int:
+    """Returns the kill bound for the letter at position, given the values of the other letters.
+    Earlier letters win ties, so the letter has to be strictly better than them and at least as good as later ones."""
+    return min(infinity, *values[:position], *(value + 1 for value in values[position + 1 :]))
+
+
+def strategy_memo(tree: BaseGameStateTree, roots: list[tuple[Any, str]]) -> dict[int, int]:
+    """Returns the memoization entries, that are needed to extract the strategy from the roots (word list, used letters)."""
+    return {key: tree.memo[key] for word_list, used_letters in roots for key in tree.strategy_keys(word_list, used_letters)}
+
+
+def _solve_root_letter(position: int, infinity: int) -> tuple[int, int | None, dict[int, int]]:
+    """Solves the root letter at position, infinity is the initial kill bound.
+    Returns None as the value if the letter was killed."""
+    assert _tree is not None, "Worker was not initialized."
+    tree = _tree
+    letter, groups = tree.letter_options(tree.root_word_list())[position]
+    max_n = 0
+    for errors, group in groups:
+        bound = letter_bound(position, _values[:], infinity)
+        result = tree.solve(group, letter, kill_after=bound - errors)
+        max_n = max(max_n, result[0] + errors)
+        if max_n >= bound:
+            if _store is not None:
+                _store.checkpoint(tree)
+            return position, None, {}
+    if _store is not None:
+        _store.checkpoint(tree)
+    with _values.get_lock():
+        _values[position] = max_n
+    return position, max_n, strategy_memo(tree, [(group, letter) for _, group in groups])
+
+
+def solve_parallel(tree: BaseGameStateTree, workers: int, checkpoint: str | None = None) -> tuple[int, str]:
+    """Solves the game for all words, with usable letters at the root evaluated in parallel.
+    The result and the memoization table (as far as extract_strategy is concerned) are the same as with solve_all.
+    If the root is trivial or has a shared letter, it is solved sequentially.
+    With checkpoint (path to a database), workers store their tables there (see solve_checkpointed)."""
+    root = tree.root_word_list()
+    key = tree.memo_key(root, "")
+    if key in tree.memo:
+        return tree.decode_result(tree.memo[key])
+    shared_letters, finished = tree.shared_letters(root, "")
+    options = [] if shared_letters or finished else tree.letter_options(root)
+    if workers <= 1 or len(options) < 2:
+        return tree.solve_all()
+
+    infinity = tree.greedy_all()[0] + 1  # warm start, as in solve_all
+    values = Array("i", [infinity] * len(options))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(type(tree), tree.original_words, tree.alphabet, values, checkpoint),
+    ) as executor:
+        results = list(executor.map(_solve_root_letter, range(len(options)), repeat(infinity)))
+
+    best_position, best_value = -1, infinity
+    for position, value, memo in results:
+        if value is None:
+            continue
+        tree.memo.update(memo)
+        if value < best_value:
+            best_position, best_value = position, value
+    letter, _ = options[best_position]
+    tree.memo[key] = tree.encode_result((best_value, letter))
+    return best_value, letter
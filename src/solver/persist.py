@@ -0,0 +1,151 @@
+from itertools import islice
+import hashlib
+import sqlite3
+import time
+
+from .game import BaseGameStateTree
+from .parallel import solve_parallel, strategy_memo
+
+
+"""
+Persistent memoization tables:
+    Long runs keep memo and killed tables of GameStateTree in a SQLite database, so they can be resumed
+    after a crash. Every word list has its own namespace (a hash of the alphabet and the words), so one database can
+    hold all groups of a HintedGame.
+    - Entries are only added to the tables during solve (and a memo entry never changes), so a checkpoint only writes
+      entries added since the previous one. Killed values can increase later, such updates are not written, the stored
+      value is still a valid lower bound.
+    - When a word list is solved, its namespace is compacted to the entries needed for the strategy and marked as
+      finished. Finished word lists are never solved again, the strategy is loaded from the database.
+    - Keys and values are stored packed, the same as in the tables of the tree (see GameStateTree.memo_key).
+      The packing depends on the alphabet, which is a part of the namespace.
+"""
+
+
+def tree_namespace(tree: BaseGameStateTree) -> str:
+    """Returns the namespace of the tree: a hash of its alphabet and words."""
+    content = "\n".join([tree.alphabet, *tree.words])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+class MemoStore:
+    """Memoization tables of a single word list (namespace) in a SQLite database."""
+
+    def __init__(self, path: str, namespace: str, interval: float = 60.0) -> None:
+        """interval is the minimal number of seconds between two automatic checkpoints."""
+        self.path: str = path
+        self.namespace: str = namespace
+        self.interval: float = interval
+        # timeout is long, because worker processes of HintedGame.strategize share the database
+        self.connection = sqlite3.connect(path, timeout=600)
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS memo (
+                    namespace TEXT, key INTEGER, value INTEGER, PRIMARY KEY (namespace, key));
+                CREATE TABLE IF NOT EXISTS killed (
+                    namespace TEXT, key INTEGER, errors INTEGER, PRIMARY KEY (namespace, key));
+                CREATE TABLE IF NOT EXISTS finished (namespace TEXT PRIMARY KEY);
+            """)
+        # number of entries of tree tables, that are already in the database
+        self._saved_memo = 0
+        self._saved_killed = 0
+        self._last_checkpoint = time.monotonic()
+        self._wrapped_solve = None  # solve of the tree, that was replaced by attach
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def is_finished(self) -> bool:
+        cursor = self.connection.execute("SELECT 1 FROM finished WHERE namespace = ?", (self.namespace,))
+        return cursor.fetchone() is not None
+
+    def clear(self) -> None:
+        """Removes all entries of the namespace."""
+        with self.connection:
+            self._delete()
+        self._saved_memo = 0
+        self._saved_killed = 0
+
+    def load(self, tree: BaseGameStateTree) -> None:
+        """Loads the stored entries into the tree tables."""
+        namespace = (self.namespace,)
+        tree.memo.update(self.connection.execute("SELECT key, value FROM memo WHERE namespace = ?", namespace))
+        for key, errors in self.connection.execute("SELECT key, errors FROM killed WHERE namespace = ?", namespace):
+            tree.killed[key] = max(errors, tree.killed.get(key, 0))
+        self._saved_memo = len(tree.memo)
+        self._saved_killed = len(tree.killed)
+
+    def checkpoint(self, tree: BaseGameStateTree) -> None:
+        """Writes the entries added to the tree tables since the last checkpoint."""
+        memo = list(islice(tree.memo.items(), self._saved_memo, None))
+        killed = list(islice(tree.killed.items(), self._saved_killed, None))
+        with self.connection:
+            self._write(memo, killed)
+        self._saved_memo += len(memo)
+        self._saved_killed += len(killed)
+        self._last_checkpoint = time.monotonic()
+
+    def finish(self, tree: BaseGameStateTree) -> None:
+        """Replaces the entries of the namespace with the ones needed for the strategy and marks it as finished."""
+        memo = strategy_memo(tree, [(tree.root_word_list(), "")])
+        # a single transaction, a crash never leaves the namespace without the entries
+        with self.connection:
+            self._delete()
+            self._write(list(memo.items()), [])
+            self.connection.execute("INSERT OR REPLACE INTO finished VALUES (?)", (self.namespace,))
+        self._saved_memo = 0
+        self._saved_killed = 0
+
+    def _delete(self) -> None:
+        """Deletes all entries of the namespace, in the current transaction."""
+        for table in ("memo", "killed", "finished"):
+            self.connection.execute(f"DELETE FROM {table} WHERE namespace = ?", (self.namespace,))
+
+    def _write(self, memo: list[tuple[int, int]], killed: list[tuple[int, int]]) -> None:
+        """Writes the entries, in the current transaction."""
+        namespace = self.namespace
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO memo VALUES (?, ?, ?)", ((namespace, key, value) for key, value in memo)
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO killed VALUES (?, ?, ?)", ((namespace, key, errors) for key, errors in killed)
+        )
+
+    def attach(self, tree: BaseGameStateTree) -> None:
+        """Makes the tree checkpoint its tables automatically while solving (at most once per interval)."""
+        solve = tree.solve
+        self._wrapped_solve = vars(tree).get("solve")  # e.g. SolverStats, it is put back by detach
+
+        def checkpointing_solve(word_list, used_letters: str, *, kill_after: int | None = None) -> tuple[int, str]:
+            result = solve(word_list, used_letters, kill_after=kill_after)
+            if time.monotonic() - self._last_checkpoint >= self.interval:
+                self.checkpoint(tree)
+            return result
+
+        # recursive calls go through the instance attribute, so all of them are checkpointed
+        tree.solve = checkpointing_solve  # type: ignore[method-assign]
+
+    def detach(self, tree: BaseGameStateTree) -> None:
+        """Stops automatic checkpoints of the tree."""
+        vars(tree).pop("solve", None)
+        if self._wrapped_solve is not None:
+            tree.solve = self._wrapped_solve  # type: ignore[method-assign]
+
+
+def solve_checkpointed(tree: BaseGameStateTree, path: str, resume: bool = False, workers: int = 1) -> tuple[int, str]:
+    """Solves the game for all words, with tables stored in the database at path.
+    If resume is True, the stored tables are loaded first and a finished word list is not solved again.
+    Otherwise stored tables of the word list are discarded. With more workers, each of them checkpoints its own tables."""
+    store = MemoStore(path, tree_namespace(tree))
+    try:
+        if not resume:
+            store.clear()
+        store.load(tree)
+        if not store.is_finished():
+            store.attach(tree)
+            solve_parallel(tree, workers, checkpoint=path)
+            store.finish(tree)
+    finally:
+        store.detach(tree)
+        store.close()
+    return tree.solve_all()
@@ -0,0 +1,148 @@
+from collections import deque
+from typing import Any
+import asyncio
+import json
+import sys
+import time
+
+from .binary import StrategyFile, open_strategy
+
+
+"""
+Strategy server:
+    Players ask for the next letters over TCP, one request per line. The strategy is a binary strategy file
+    (see binary.py), loaded once and shared by all connections, a query only reads the nodes on its path.
+    - A request is a JSON object {"pattern": "a_a__", "wrong": "xy"} (wrong letters are optional, "hint" can be given
+      for files of a single Strategy, hinted files take it from the pattern). The response is {"letters": "bc"},
+      letters are "" when the word is guessed. Impossible or malformed queries get {"error": "..."}.
+    - A batch is a JSON list of such objects, the response is a list of responses in the same order.
+    - The request {"metrics": true} returns the latency metrics (see LatencyStats.metrics).
+    Queries are answered synchronously in the event loop: a lookup takes microseconds, so handing it to
+    a thread would cost more than it saves.
+"""
+
+LINE_LIMIT = 1 << 22  # the longest request line (a batch) in bytes
+
+
+class LatencyStats:
+    """Latencies of answered requests. Percentiles are computed from the last window requests."""
+
+    def __init__(self, window: int = 10000) -> None:
+        self.requests: int = 0
+        self.queries: int = 0
+        self.errors: int = 0
+        self.seconds: float = 0.0  # time spent answering requests
+        self.max_seconds: float = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+        self.started: float = time.perf_counter()
+
+    def add(self, seconds: float, queries: int = 1, errors: int = 0) -> None:
+        self.requests += 1
+        self.queries += queries
+        self.errors += errors
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.recent.append(seconds)
+
+    def metrics(self) -> dict[str, float | int]:
+        """Counts of requests, queries (a batch has several) and errors, requests per second since the start
+        and latencies in milliseconds."""
+        recent = sorted(self.recent)
+
+        def percentile(p: float) -> float:
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000 if recent else 0.0
+
+        elapsed = time.perf_counter() - self.started
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "errors": self.errors,
+            "requests_per_second": self.requests / elapsed if elapsed else 0.0,
+            "mean_ms": self.seconds / self.requests * 1000 if self.requests else 0.0,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+            "max_ms": self.max_seconds * 1000,
+        }
+
+    def summary(self) -> str:
+        metrics = self.metrics()
+        return (
+            f"{metrics['requests']} requests ({metrics['queries']} queries, {metrics['errors']} errors), "
+            + f"{metrics['requests_per_second']:.0f} requests/s, latency mean {metrics['mean_ms']:.3f} ms, "
+            + f"p50 {metrics['p50_ms']:.3f} ms, p99 {metrics['p99_ms']:.3f} ms, max {metrics['max_ms']:.3f} ms"
+        )
+
+
+class StrategyServer:
+    """Answers queries for the next letters from a binary strategy file."""
+
+    def __init__(self, strategy_file: StrategyFile, window: int = 10000) -> None:
+        self.strategy_file: StrategyFile = strategy_file
+        self.latency: LatencyStats = LatencyStats(window)
+
+    def answer(self, query: Any) -> dict[str, Any]:
+        """Answers a single query (a JSON object of a request)."""
+        if not isinstance(query, dict) or not isinstance(query.get("pattern"), str) or not query["pattern"]:
+            return {"error": "A query needs a non-empty pattern."}
+        wrong, hint = query.get("wrong", ""), query.get("hint")
+        if not isinstance(wrong, str) or not isinstance(hint, str | None):
+            return {"error": "Fields wrong and hint have to be strings."}
+        try:
+            letters = self.strategy_file.next_letters(query["pattern"].lower(), wrong.lower(), hint)
+        except KeyError as error:
+            return {"error": error.args[0]}
+        return {"letters": letters}
+
+    def handle_line(self, line: bytes) -> bytes:
+        """Returns the response line to a request line and records its latency."""
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+        except (ValueError, UnicodeDecodeError):
+            request = None
+        if isinstance(request, dict) and request.get("metrics"):
+            return json.dumps(self.latency.metrics()).encode("utf-8") + b"\n"
+        if isinstance(request, list):
+            response: Any = [self.answer(query) for query in request]
+            queries, errors = len(response), sum("error" in answer for answer in response)
+        else:
+            response = self.answer(request)
+            queries, errors = 1, int("error" in response)
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.latency.add(time.perf_counter() - start, queries, errors)
+        return data
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves a single connection until the client closes it."""
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    writer.write(self.handle_line(line))
+                    await writer.drain()
+        except (ConnectionError, ValueError):  # ValueError: a line over LINE_LIMIT
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.Server:
+        return await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+
+
+async def serve(path: str, host: str = "127.0.0.1", port: int = 8765, interval: float | None = None) -> None:
+    """Serves the strategy at path until cancelled. With interval, latency metrics are printed every interval seconds
+    (to stderr), they are printed at the end too."""
+    server = StrategyServer(open_strategy(path))
+    tcp_server = await server.start(host, port)
+    addresses = ", ".join(str(socket.getsockname()) for socket in tcp_server.sockets)
+    print(f"Serving {path} on {addresses}.")
+    try:
+        async with tcp_server:
+            if interval is None:
+                await tcp_server.serve_forever()
+            else:
+                while True:
+                    await asyncio.sleep(interval)
+                    print(server.latency.summary(), file=sys.stderr)
+    finally:
+        print(server.latency.summary(), file=sys.stderr)
+        server.strategy_file.close()
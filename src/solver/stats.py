@@ -0,0 +1,161 @@
+from collections import Counter, defaultdict
+from typing import Any
+import sys
+import time
+
+from .game import BaseGameStateTree
+
+
+"""
+Solver statistics:
+    Long runs give no feedback on whether pruning works, so SolverStats can collect counters of solve.
+    - It wraps solve of a tree with an instance attribute (as MemoStore.attach and AnytimeSearch do), so recursive
+      calls are counted too. Trees without attached statistics run the original solve, there is no overhead at all.
+    - A call of solve is a memo hit, a killed hit (a stored lower bound, or kill_after of 0, is enough to kill it)
+      or a node, which is computed. A node is cut, if it was killed by its kill_after.
+    - Time of nodes is measured without the time of their child nodes (per depth, the root has depth 0) and with it
+      for the nodes below each root letter (letters guessed at the root of the tree).
+    - Prunes (see GameStateTree.prunes) and growth of the tables are added when the statistics are detached, so one
+      SolverStats can collect statistics of several trees (e.g. all groups of a HintedGame), or of the same tree
+      attached again (e.g. when a time limited search is continued, see Strategy.improve).
+    - With progress, a progress line with the number of nodes and the throughput is printed to stderr.
+    Greedy strategies are not counted, with parallel root search only the main process is counted.
+"""
+
+
+class SolverStats:
+    """Counters of solve calls of the attached trees."""
+
+    def __init__(self, progress: bool = False, interval: float = 1.0) -> None:
+        """With progress, a progress line is printed (at most once per interval seconds) while solving."""
+        self.progress: bool = progress
+        self.interval: float = interval
+        self.calls: int = 0
+        self.memo_hits: int = 0
+        self.killed_hits: int = 0
+        self.nodes: int = 0
+        self.cuts: int = 0
+        self.seconds: float = 0.0  # time spent with attached trees
+        self.depth_seconds: defaultdict[int, float] = defaultdict(float)
+        self.root_letter_seconds: defaultdict[str, float] = defaultdict(float)
+        self.prunes: Counter[str] = Counter()
+        self.memo_size: int = 0
+        self.killed_size: int = 0
+        self._prunes: Counter[str] = Counter()  # prunes of the attached tree when it was attached
+        self._sizes: tuple[int, int] = (0, 0)  # sizes of memo and killed tables of the attached tree when it was attached
+        self._start: float = 0.0
+        self._last_progress: float = 0.0
+
+    def attach(self, tree: BaseGameStateTree) -> None:
+        """Starts counting solve calls of the tree."""
+        solve = tree.solve
+        # time of child nodes of each running node, the root of the tree is the first one
+        children_seconds: list[float] = []
+        root_used: list[str] = [""]
+
+        def counting_solve(word_list, used_letters: str, *, kill_after: int | None = None) -> tuple[int, str]:
+            self.calls += 1
+            key = tree.memo_key(word_list, used_letters)
+            if key in tree.memo:
+                self.memo_hits += 1
+                return solve(word_list, used_letters, kill_after=kill_after)
+            if kill_after is not None and (kill_after <= 0 or tree.killed.get(key, 0) >= kill_after):
+                self.killed_hits += 1
+                return solve(word_list, used_letters, kill_after=kill_after)
+
+            self.nodes += 1
+            depth = len(children_seconds)
+            if depth == 0:
+                root_used[0] = used_letters
+            children_seconds.append(0.0)
+            start = time.perf_counter()
+            try:
+                result = solve(word_list, used_letters, kill_after=kill_after)
+            finally:
+                seconds = time.perf_counter() - start
+                self.depth_seconds[depth] += seconds - children_seconds.pop()
+                if children_seconds:
+                    children_seconds[-1] += seconds
+                if depth == 1:
+                    self.root_letter_seconds[used_letters[len(root_used[0]) :]] += seconds
+            if kill_after is not None and result[0] >= kill_after:
+                self.cuts += 1
+            if self.progress and self.nodes % 1024 == 0:
+                self.print_progress()
+            return result
+
+        self._prunes = tree.prunes.copy()
+        self._sizes = len(tree.memo), len(tree.killed)
+        self._start = time.monotonic()
+        # recursive calls go through the instance attribute, so all of them are counted
+        tree.solve = counting_solve  # type: ignore[method-assign]
+
+    def detach(self, tree: BaseGameStateTree) -> None:
+        """Stops counting solve calls of the tree and adds its prunes and the growth of its tables."""
+        if "solve" not in vars(tree):
+            return
+        vars(tree).pop("solve")
+        self.seconds += time.monotonic() - self._start
+        self.prunes.update(tree.prunes - self._prunes)
+        self.memo_size += len(tree.memo) - self._sizes[0]
+        self.killed_size += len(tree.killed) - self._sizes[1]
+        if self.progress:
+            self.print_progress(force=True)
+
+    def merge(self, other: "SolverStats") -> None:
+        """Adds the counters of other (e.g. statistics collected in a worker process)."""
+        for name in ("calls", "memo_hits", "killed_hits", "nodes", "cuts", "seconds", "memo_size", "killed_size"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for depth, seconds in other.depth_seconds.items():
+            self.depth_seconds[depth] += seconds
+        for letter, seconds in other.root_letter_seconds.items():
+            self.root_letter_seconds[letter] += seconds
+        self.prunes.update(other.prunes)
+
+    def print_progress(self, force: bool = False) -> None:
+        """Prints the progress line, if the last one was printed at least interval seconds ago (or with force)."""
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.interval:
+            return
+        self._last_progress = now
+        seconds = self.seconds if force else self.seconds + now - self._start
+        rate = self.nodes / seconds if seconds > 0 else 0.0
+        line = f"Solved {self.nodes} nodes ({rate:.0f} nodes/s), {self.memo_hits} memo hits."
+        print(line + " " * 10, end="\r", file=sys.stderr)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns all statistics as a JSON-serializable dictionary."""
+        return {
+            "calls": self.calls,
+            "nodes": self.nodes,
+            "expanded": self.prunes["expanded"],
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.calls - self.memo_hits,
+            "memo_hit_rate": self.memo_hits / self.calls if self.calls else 0.0,
+            "killed_hits": self.killed_hits,
+            "cuts": self.cuts,
+            "prunes": dict(self.prunes),
+            "memo_size": self.memo_size,
+            "killed_size": self.killed_size,
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes / self.seconds if self.seconds > 0 else 0.0,
+            "depth_seconds": {str(depth): seconds for depth, seconds in sorted(self.depth_seconds.items())},
+            "root_letter_seconds": dict(sorted(self.root_letter_seconds.items(), key=lambda item: -item[1])),
+        }
+
+    def summary(self) -> str:
+        """Returns the statistics as a few lines of text."""
+        stats = self.stats()
+        lines = [
+            f"Solved {stats['nodes']} nodes in {stats['seconds']:.2f} seconds ({stats['nodes_per_second']:.0f} nodes/s),"
+            + f" {stats['expanded']} expanded.",
+            f"Calls: {stats['calls']}, memo hits: {stats['memo_hits']} ({stats['memo_hit_rate']:.1%}),"
+            + f" killed hits: {stats['killed_hits']}, cut by kill bound: {stats['cuts']}.",
+            "Prunes: " + ", ".join(f"{name}: {count}" for name, count in sorted(stats["prunes"].items())) + ".",
+            f"Table sizes: memo {stats['memo_size']}, killed {stats['killed_size']}.",
+            "Seconds per depth: " + ", ".join(f"{depth}: {s:.2f}" for depth, s in stats["depth_seconds"].items()) + ".",
+            "Seconds per root letter: "
+            + ", ".join(f"{letter}: {s:.2f}" for letter, s in stats["root_letter_seconds"].items())
+            + ".",
+        ]
+        return "\n".join(lines)
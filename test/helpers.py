@@ -0,0 +1,32 @@
+import random
+
+from src.solver.game import Choice
+
+
+"""
+Shared test data. Test modules import it as test.helpers, which works both under pytest and under
+unittest discover -s test (where test modules themselves are top-level modules, so relative imports fail).
+"""
+
+WORD_LISTS = [
+    ["abc"],
+    ["abc", "bac", "cab"],
+    ["aa", "bb", "cc", "dd"],
+    ["baa", "bbb", "ccb", "ddb"],
+    ["abd", "abe", "acf", "acg", "hbd", "hbe", "hcf", "hcg"],
+    ["ababa", "babab", "bacba", "dacdc"],
+    ["ababa", "babab", "bacba", "dacdc", "cbdcb", "bdddd", "bbbbb", "ccccc", "ddddd"],
+    ["efgaa", "efgbb", "efgcc", "efgdd"],
+]
+
+
+def random_words(n: int, length: int, alphabet: str, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return sorted({"".join(rng.choice(alphabet) for _ in range(length)) for _ in range(n)})
+
+
+def worst_errors(choice: Choice) -> int:
+    """Number of wrong guesses in the worst case when following the choice."""
+    if not choice.choice:
+        return 0
+    return max(int(not any(shape)) + worst_errors(child) for shape, child in choice.children.items())
@@ -0,0 +1,118 @@
+import unittest
+
+from src.solver.game import GameStateTree, Strategy
+from src.solver.bitset import BitsetGameStateTree
+from src.solver.anytime import AnytimeSearch
+from src.solver.hinter import HintedGame, improve_group, strategize_pinned
+
+from test.helpers import WORD_LISTS, random_words, worst_errors
+
+
+class TestAnytimeSearch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.word_lists = WORD_LISTS + [random_words(60, 4, "abcdefg", seed) for seed in range(3)]
+
+    def test_optimal(self) -> None:
+        for tree_class in (GameStateTree, BitsetGameStateTree):
+            for words in self.word_lists:
+                alphabet = "".join(sorted(set("".join(words))))
+                expected, _ = tree_class(words, alphabet).solve_all()
+                search = AnytimeSearch(tree_class(words, alphabet))
+                search.run(60)
+                self.assertTrue(search.optimal)
+                self.assertEqual((search.lower_bound, search.upper_bound, search.gap), (expected, expected, 0))
+                self.assertNotIn("solve", search.tree.__dict__)
+                self.assertNotIn("greedy", search.tree.__dict__)
+
+    def test_no_time(self) -> None:
+        for words in self.word_lists:
+            alphabet = "".join(sorted(set("".join(words))))
+            expected, _ = GameStateTree(words, alphabet).solve_all()
+            search = AnytimeSearch(GameStateTree(words, alphabet))
+            search.run(0)
+            self.assertLessEqual(search.lower_bound, expected)
+            self.assertGreaterEqual(search.upper_bound, expected)
+            self.assertEqual(search.width, 1)  # the first greedy strategy is always finished
+            strategy = Strategy(words, time_budget=0)
+            self.assertEqual(worst_errors(strategy.start), strategy.max_errors)
+            self.assertLessEqual(strategy.lower_bound, expected)
+
+    def test_continue(self) -> None:
+        words = random_words(60, 4, "abcdefg", 0)
+        alphabet = "".join(sorted(set("".join(words))))
+        expected, _ = GameStateTree(words, alphabet).solve_all()
+        search = AnytimeSearch(GameStateTree(words, alphabet))
+        lower_bound, upper_bound = 0, len(alphabet) + 1
+        while not search.optimal:
+            search.run(0.001)
+            self.assertGreaterEqual(search.lower_bound, lower_bound)
+            self.assertLessEqual(search.upper_bound, upper_bound)
+            lower_bound, upper_bound = search.lower_bound, search.upper_bound
+        self.assertEqual(search.upper_bound, expected)
+        self.assertIn(("", 0), search.tree.extract_strategy(memo=search.memo))
+
+    def test_strategy(self) -> None:
+        words = random_words(60, 4, "abcdefg", 1)
+        strategy = Strategy(words, time_budget=60)
+        self.assertEqual((strategy.lower_bound, strategy.max_errors), (Strategy(words).max_errors,) * 2)
+        self.assertEqual(worst_errors(strategy.start), strategy.max_errors)
+
+    def test_improve(self) -> None:
+        words = random_words(60, 4, "abcdefg", 0)
+        expected = Strategy(words).max_errors
+        strategy = Strategy(words, time_budget=0)
+        lower_bound, max_errors = strategy.lower_bound, strategy.max_errors
+        while strategy.search is not None:
+            strategy.improve(0.001)
+            self.assertGreaterEqual(strategy.lower_bound, lower_bound)
+            self.assertLessEqual(strategy.max_errors, max_errors)
+            self.assertEqual(worst_errors(strategy.start), strategy.max_errors)
+            lower_bound, max_errors = strategy.lower_bound, strategy.max_errors
+        self.assertEqual((strategy.lower_bound, strategy.max_errors), (expected, expected))
+        strategy.improve(60)  # nothing left to search
+        self.assertEqual((strategy.lower_bound, strategy.max_errors), (expected, expected))
+
+    def test_improve_pinned(self) -> None:
+        words = random_words(60, 4, "abcdefg", 0)
+        expected = Strategy(words).max_errors
+        key = (4, "a", ((0,),))
+        _, strategy, _ = strategize_pinned(key, words, tree_class=GameStateTree, time_budget=0)
+        self.assertIsNone(strategy.search)  # the search stays in the worker process
+        while strategy.lower_bound < strategy.max_errors:
+            _, result, _ = improve_group(key, 0.001)
+            strategy.update(*result)
+            self.assertEqual(worst_errors(strategy.start), strategy.max_errors)
+        self.assertEqual((strategy.lower_bound, strategy.max_errors), (expected, expected))
+
+    def test_incompatible_options(self) -> None:
+        words = random_words(20, 4, "abcdefg", 1)
+        for time_budget, fast in ((1, False), (None, True)):
+            with self.assertRaises(ValueError):
+                Strategy(words, time_budget=time_budget, fast=fast, workers=2)
+            with self.assertRaises(ValueError):
+                Strategy(words, time_budget=time_budget, fast=fast, checkpoint="checkpoint.sqlite")
+            with self.assertRaises(ValueError):
+                Strategy(words, time_budget=time_budget, fast=fast, resume=True)
+        with self.assertRaises(ValueError):
+            HintedGame(words).strategize(print_progress=False, checkpoint="checkpoint.sqlite", time_budget=1)
+
+    def test_hinted_game(self) -> None:
+        words = ["xabc", "xbac", "xcab", "abc", "abd", "acd", "bcd", "bce", "bde"]
+        game = HintedGame(words)
+        game.strategize(print_progress=False)
+        timed = HintedGame(words)
+        timed.strategize(print_progress=False, time_budget=60)
+        for key, strategy in game.strategies.items():
+            self.assertEqual(timed.strategies[key].max_errors, strategy.max_errors)
+            self.assertEqual(timed.strategies[key].lower_bound, strategy.max_errors)
+
+    def test_hinted_game_parallel(self) -> None:
+        words = random_words(80, 4, "abcdefg", 5) + random_words(40, 5, "abcdefg", 6)
+        game = HintedGame(words)
+        game.strategize(print_progress=False)
+        timed = HintedGame(words)
+        timed.strategize(print_progress=False, workers=2, time_budget=60)
+        self.assertEqual(list(timed.strategies), list(game.strategies))
+        for key, strategy in game.strategies.items():
+            self.assertEqual(timed.strategies[key].max_errors, strategy.max_errors)
+            self.assertEqual(timed.strategies[key].lower_bound, strategy.max_errors)
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from src.solver.bench import bench_cases, bundled_words, compare, run_benchmarks, run_case, synthetic_words
+
+
+class TestBench(unittest.TestCase):
+    def test_synthetic_words(self) -> None:
+        words = synthetic_words(100, 5, seed=1)
+        self.assertEqual(words, synthetic_words(100, 5, seed=1))
+        self.assertNotEqual(words, synthetic_words(100, 5, seed=2))
+        self.assertEqual(len(set(words)), 100)
+        self.assertTrue(all(len(word) == 5 for word in words))
+
+    def test_bundled_words(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nouns.txt")
+            self.assertIsNone(bundled_words(path))
+            with open(path, "w", encoding="UTF-8") as file:
+                file.write("version https://git-lfs.github.com/spec/v1\noid sha256:0\nsize 1\n")
+            self.assertIsNone(bundled_words(path))
+            with open(path, "w", encoding="UTF-8") as file:
+                file.write("miza\nstol\n")
+            self.assertEqual(bundled_words(path), ["miza", "stol"])
+
+    def test_run_case(self) -> None:
+        cases = bench_cases(quick=True)
+        self.assertTrue(any(name.startswith("hinted") for name in cases))
+        self.assertTrue(any(name.startswith("choice") for name in cases))
+        tuple_results = run_case("strategy-tuple-5-50", quick=True)
+        bitset_results = run_case("strategy-bitset-5-50", quick=True)
+        self.assertGreater(tuple_results["nodes"], 0)
+        for key in ("max_errors", "nodes", "memo_size", "killed_size"):
+            self.assertEqual(tuple_results[key], bitset_results[key])
+
+    def test_run_benchmarks(self) -> None:
+        results = run_benchmarks(repeat=2, quick=True, only="strategy-bitset-5-50", print_progress=False)
+        self.assertEqual(list(results["cases"]), ["strategy-bitset-5-50"])
+        self.assertEqual(len(results["cases"]["strategy-bitset-5-50"]["seconds_all"]), 2)
+
+    def test_compare(self) -> None:
+        baseline = {"cases": {"a": {"seconds": 1.0, "nodes": 10}, "b": {"seconds": 1.0, "nodes": 10}}}
+        results = {"cases": {"a": {"seconds": 2.0, "nodes": 10}, "b": {"seconds": 1.05, "nodes": 5}, "c": {"seconds": 1}}}
+        lines = compare(results, baseline)
+        self.assertEqual(len(lines), 2)
+        self.assertIn("slower", lines[0])
+        self.assertIn("same", lines[1])
+        self.assertIn("nodes (10 -> 5)", lines[1])
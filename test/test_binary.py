@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.solver.binary import StrategyFile, json_to_binary, open_strategy, write_binary
+from src.solver.game import Strategy, get_tti
+from src.solver.hinter import HintedGame, make_hint
+
+from test.helpers import WORD_LISTS, random_words
+
+
+def play(file: StrategyFile, word: str, hint: str | None = None) -> int:
+    """Plays the word by the letters from the file, returns the number of errors."""
+    guessed: set[str] = set()
+    wrong = ""
+    while True:
+        pattern = "".join(c if c in guessed or c == word[0] and file.hinted else "_" for c in word)
+        letters = file.next_letters(pattern, wrong, hint)
+        if not letters:
+            return len(wrong)
+        guessed.update(letters)
+        wrong += "".join(c for c in letters if c not in word)
+
+
+class TestBinary(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "strategy.bin")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_strategy(self) -> None:
+        for words in WORD_LISTS + [random_words(200, 5, "abcčdefgh", 0)]:
+            strategy = Strategy(words)
+            write_binary(self.path, strategy)
+            with StrategyFile(self.path) as file:
+                self.assertFalse(file.hinted)
+                self.assertEqual(list(file.hints()), [""])
+                loaded = file.strategy()
+                self.assertEqual(loaded.json(), strategy.json())
+                self.assertEqual(loaded.lower_bound, strategy.lower_bound)
+                errors = [play(file, word) for word in strategy.words]
+                self.assertEqual(max(errors), strategy.max_errors)
+
+    def test_next_letters(self) -> None:
+        strategy = Strategy(["abc", "abd", "xyz"])
+        write_binary(self.path, strategy)
+        with StrategyFile(self.path) as file:
+            first = file.next_letters("___")
+            self.assertEqual(first, strategy.start.choice)
+            self.assertEqual(file.next_letters("abc", "xyz"), "")
+            with self.assertRaises(KeyError):
+                file.next_letters("___", "abcdxyz")
+            with self.assertRaises(KeyError):
+                file.next_letters("___", hint="a__")
+
+    def test_hinted_game(self) -> None:
+        game = HintedGame(random_words(200, 4, "abcdefg", 2) + random_words(100, 5, "abcdefg", 3))
+        game.strategize(print_progress=False)
+        write_binary(self.path, game)
+        with StrategyFile(self.path) as file:
+            self.assertTrue(file.hinted)
+            self.assertEqual(sorted(file.hints()), sorted(json.loads(json.dumps(game.json()))["strategies"]))
+            self.assertEqual(file.hinted_game().json(), game.json())
+            for word in game.words:
+                strategy = game.get_strat_by_hint(make_hint(word))
+                self.assertLessEqual(play(file, word), strategy.max_errors)
+                self.assertEqual(get_tti(StrategyFile.hint_of(word), word[0]), get_tti(make_hint(word), word[0]))
+
+    def test_json_to_binary(self) -> None:
+        game = HintedGame(random_words(100, 4, "abcdef", 4))
+        game.strategize(print_progress=False)
+        for value in (game, game.strategies[next(iter(game.strategies))]):
+            json_path = os.path.join(self.directory.name, "strategy.json")
+            with open(json_path, "w", encoding="UTF-8") as file:
+                json.dump(value.json(), file, ensure_ascii=False)
+            direct_path = os.path.join(self.directory.name, "direct.bin")
+            write_binary(direct_path, value)
+            json_to_binary(json_path, self.path)
+            with open(direct_path, "rb") as direct, open(self.path, "rb") as converted:
+                self.assertEqual(direct.read(), converted.read())
+
+    def test_open_strategy(self) -> None:
+        strategy = Strategy(random_words(100, 5, "abcdefgh", 5))
+        json_path = os.path.join(self.directory.name, "strategy.json")
+        with open(json_path, "w", encoding="UTF-8") as file:
+            json.dump(strategy.json(), file, indent=1)
+        with open_strategy(json_path) as converted:
+            self.assertEqual(converted.next_letters("_____"), strategy.start.choice)
+        write_binary(self.path, strategy)
+        with open_strategy(self.path) as file:
+            self.assertEqual(file.path, self.path)
+
+    def test_not_binary(self) -> None:
+        with open(self.path, "wb") as file:
+            file.write(bytes(64))
+        with self.assertRaises(ValueError):
+            StrategyFile(self.path)
@@ -0,0 +1,50 @@
+import unittest
+
+from src.solver.game import BaseGameStateTree, GameStateTree, Strategy
+from src.solver.bitset import BitsetGameStateTree, lowest_bit, iter_bits
+
+from test.helpers import WORD_LISTS, random_words
+
+
+class TestBitsetGameStateTree(unittest.TestCase):
+    def test_bits(self) -> None:
+        self.assertEqual(lowest_bit(0b10100), 2)
+        self.assertEqual(lowest_bit(1), 0)
+        self.assertEqual(list(iter_bits(0b10110)), [1, 2, 4])
+        self.assertEqual(list(iter_bits(0)), [])
+
+    def test_group_words(self) -> None:
+        tree = BitsetGameStateTree(["aba", "Aaa", "ACa"], "abcd")
+        self.assertEqual(tree.group_words(0b111, [0, 1]), [0b001, 0b010, 0b100])
+        self.assertEqual(tree.group_words(0b111, [0]), [0b101, 0b010])
+        self.assertEqual(tree.group_words(0b111, [3]), [0b111])
+        self.assertEqual(tree.group_words(0b001, [3]), [0b001])
+
+    def test_solve(self) -> None:
+        tree = BitsetGameStateTree(["aa", "bb", "cc", "dd"], "abcd")
+        self.assertEqual(tree.solve(0b1111, ""), (3, "a"))
+        tree = BitsetGameStateTree(["efgaa", "efgbb", "efgcc", "efgdd"], "abcdefg")
+        self.assertEqual(tree.solve(0b1111, ""), (3, "efg"))
+
+    def test_same_as_tuple_engine(self) -> None:
+        word_lists = WORD_LISTS + [random_words(40, 5, "abcdefgh", seed) for seed in range(5)]
+        for words in word_lists:
+            alphabet = "".join(sorted(set("".join(words))))
+            tuple_tree = GameStateTree(words, alphabet)
+            bitset_tree = BitsetGameStateTree(words, alphabet)
+            self.assertEqual(tuple_tree.solve_all(), bitset_tree.solve_all())
+            self.assertEqual(tuple_tree.extract_strategy(), bitset_tree.extract_strategy())
+
+    def test_missing_hook(self) -> None:
+        class IncompleteTree(BaseGameStateTree[int]):
+            root_word_list = BitsetGameStateTree.root_word_list  # the other hooks are missing
+
+        with self.assertRaises(TypeError):
+            IncompleteTree(["aa", "bb"], "ab")  # type: ignore[abstract]
+
+    def test_strategy(self) -> None:
+        for words in WORD_LISTS:
+            self.assertEqual(
+                Strategy(words, tree_class=BitsetGameStateTree).json(),
+                Strategy(words).json(),
+            )
@@ -0,0 +1,87 @@
+import unittest
+
+from src.solver.game import BaseGameStateTree, GameStateTree
+from src.solver.bitset import BitsetGameStateTree
+from src.solver.bounds import LowerBound, cached_bound, lookahead_bound, unshared_bound
+
+from test.helpers import WORD_LISTS, random_words
+
+TREE_CLASSES: list[type[BaseGameStateTree]] = [GameStateTree, BitsetGameStateTree]
+
+
+class TestLowerBounds(unittest.TestCase):
+    def test_unshared_bound(self) -> None:
+        tree = GameStateTree(["abc", "abd", "aef"], "abcdef")
+        self.assertEqual(unshared_bound(tree, (0, 1, 2), ""), 0)  # "a" is shared
+        self.assertEqual(unshared_bound(tree, (0, 1, 2), "a"), 1)
+        self.assertEqual(unshared_bound(tree, (0,), "a"), 0)
+
+    def test_cached_bound(self) -> None:
+        tree = GameStateTree(["aa", "bb", "cc", "dd"], "abcd")
+        self.assertEqual(cached_bound(tree, tree.pks, ""), 0)
+        tree.solve(tree.pks, "", kill_after=1)
+        self.assertEqual(cached_bound(tree, tree.pks, ""), 1)
+        tree.solve_all()
+        self.assertEqual(cached_bound(tree, tree.pks, ""), 3)
+
+    def test_bounds_are_admissible(self) -> None:
+        word_lists = WORD_LISTS + [random_words(40, 4, "abcdefg", seed) for seed in range(3)]
+        bounds: list[LowerBound] = [unshared_bound, lookahead_bound]
+        for tree_class in TREE_CLASSES:
+            for words in word_lists:
+                alphabet = "".join(sorted(set("".join(words))))
+                tree = tree_class(words, alphabet)
+                for letter, groups in tree.letter_options(tree.root_word_list()):
+                    for _, group in groups:
+                        value, _ = tree_class(words, alphabet).solve(group, letter)
+                        for bound in bounds:
+                            self.assertLessEqual(bound(tree, group, letter), value)
+
+    def test_same_results(self) -> None:
+        word_lists = WORD_LISTS + [random_words(40, 4, "abcdefg", seed) for seed in range(3)]
+        for tree_class in TREE_CLASSES:
+            for words in word_lists:
+                alphabet = "".join(sorted(set("".join(words))))
+                tree = tree_class(words, alphabet)
+                bounded_tree = tree_class(words, alphabet)
+                bounded_tree.lower_bounds = [lookahead_bound]
+                self.assertEqual(bounded_tree.solve_all(), tree.solve_all())
+                self.assertEqual(bounded_tree.extract_strategy(), tree.extract_strategy())
+                self.assertLessEqual(bounded_tree.prunes["expanded"], tree.prunes["expanded"])
+
+    def test_prunes(self) -> None:
+        tree = BitsetGameStateTree(random_words(40, 4, "abcdefg", 0), "abcdefg")
+        tree.solve_all()
+        self.assertGreater(tree.prunes["expanded"], 0)
+        self.assertGreater(tree.prunes["unshared"], 0)
+        self.assertGreater(tree.prunes["letter"], 0)
+
+    def test_letter_dominates(self) -> None:
+        for tree_class in TREE_CLASSES:
+            # "a" and "b" split the words in the same way
+            tree = tree_class(["abc", "abd", "ef"], "abcdef")
+            options = dict(tree.letter_options(tree.root_word_list()))
+            self.assertTrue(tree.letter_dominates(options["a"], options["b"]))
+            self.assertTrue(tree.letter_dominates(options["b"], options["a"]))
+            self.assertFalse(tree.letter_dominates(options["a"], options["c"]))  # "c" splits "abc" and "abd"
+            self.assertFalse(tree.letter_dominates(options["c"], options["a"]))  # "c" is missing from "abd"
+            # "b" is in all words and splits them more than "a"
+            tree = tree_class(["aab", "aba", "bbb"], "ab")
+            options = dict(tree.letter_options(tree.root_word_list()))
+            self.assertTrue(tree.letter_dominates(options["b"], options["a"]))
+            self.assertFalse(tree.letter_dominates(options["a"], options["b"]))
+
+    def test_skip_dominated(self) -> None:
+        word_lists = WORD_LISTS + [random_words(60, 4, "abcdefg", seed) for seed in range(3)]
+        word_lists += [random_words(80, 5, "abcdefgh", seed) for seed in range(2)]
+        for tree_class in TREE_CLASSES:
+            prunes = 0
+            for words in word_lists:
+                alphabet = "".join(sorted(set("".join(words))))
+                tree = tree_class(words, alphabet)
+                reduced_tree = tree_class(words, alphabet)
+                reduced_tree.skip_dominated = True
+                self.assertEqual(reduced_tree.solve_all(), tree.solve_all())
+                self.assertEqual(reduced_tree.extract_strategy(), tree.extract_strategy())
+                prunes += reduced_tree.prunes["dominated"]
+            self.assertGreater(prunes, 0)
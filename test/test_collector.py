@@ -0,0 +1,248 @@
+import contextlib
+import io
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+from functools import partial
+from typing import Any
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from src.collector.cache import PageCache
+from src.collector.fetch import PageFetcher, PageNotCached, RateLimiter
+from src.collector.parser import extract_entries, parse_entries
+from src.collector.sskj_collector import (
+    extract_nouns,
+    extract_words,
+    get_all_entries,
+    get_all_words,
+    get_sskj_page,
+    sskj_params,
+)
+from src.collector.utils import TaskProgress, multirun, run_tasks
+
+PAGES = 5
+FLAKY_PAGE = 3  # fails once with 503
+MISSING_PAGE = 4  # always 404
+
+
+def sskj_page(page: int) -> bytes:
+    """A page of results like the ones of fran.si: two entries, the first one is a noun."""
+    pagination = "".join(f"<li><a href='?page={i}'>{i}</a></li>" for i in range(1, PAGES + 1))
+    entries = (
+        f"<div class='entry-content'><a href='#'>beseda{page}</a> <span title='samostalnik ženskega spola'>ž</span></div>"
+        + f"<div class='entry-content'><a href='#'>glagol{page}</a> <span title='glagol'>gl.</span></div>"
+    )
+    html = f"<html><body>{entries}<ul class='pagination'>{pagination}<li>naslednja</li></ul></body></html>"
+    return html.encode("utf-8")
+
+
+class SSKJStandIn(BaseHTTPRequestHandler):
+    requests: Counter[int] = Counter()
+    lock: threading.Lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        page = int(parse_qs(urlparse(self.path).query)["Page"][0])
+        with self.lock:
+            self.requests[page] += 1
+            count = self.requests[page]
+        if page == MISSING_PAGE:
+            self.send_error(404)
+        elif page == FLAKY_PAGE and count == 1:
+            self.send_error(503)
+        else:
+            content = sskj_page(page)
+            etag = f'"page{page}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class TestRunTasks(unittest.TestCase):
+    def test_free_slot(self) -> None:
+        finished: list[int] = []
+        slow = threading.Event()
+
+        def task(i: int) -> int:
+            if i == 0:
+                slow.wait(5)
+            finished.append(i)
+            if len(finished) == 5:
+                slow.set()
+            return i * i
+
+        states: list[str] = []
+        results = run_tasks([partial(task, i) for i in range(6)], 2, progress=lambda state: states.append(str(state)))
+        self.assertEqual(results, [i * i for i in range(6)])
+        # the slow task did not hold back the rest
+        self.assertEqual(finished[-1], 0)
+        self.assertEqual(len(states), 6)
+        self.assertTrue(states[-1].startswith("6/6 done"))
+
+    def test_lazy_tasks(self) -> None:
+        taken = []
+
+        def tasks():
+            for i in range(20):
+                taken.append(i)
+                yield partial(len, "x" * i)
+
+        def progress(state: TaskProgress) -> None:
+            self.assertIsNone(state.total)
+            self.assertLessEqual(len(taken), state.done + 3)
+
+        self.assertEqual(run_tasks(tasks(), 3, progress=progress), list(range(20)))
+
+    def test_retries_and_errors(self) -> None:
+        calls: Counter[int] = Counter()
+
+        def flaky(i: int, failures: int) -> int:
+            calls[i] += 1
+            if calls[i] <= failures:
+                raise ValueError(f"task {i} failed")
+            return i
+
+        self.assertEqual(run_tasks([partial(flaky, 0, 2), partial(flaky, 1, 0)], 2, retries=2), [0, 1])
+        self.assertEqual(calls[0], 3)
+        results = run_tasks([partial(flaky, 2, 5), partial(flaky, 3, 0)], 2, retries=1, return_exceptions=True)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(results[1], 3)
+        with self.assertRaises(ValueError):
+            run_tasks([partial(flaky, 4, 1)] + [partial(flaky, 5 + i, 0) for i in range(10)], 1)
+        self.assertEqual(calls[5], 0)  # no tasks were started after the failure
+
+    def test_multirun(self) -> None:
+        values: list[int] = []
+        progress: list[int] = []
+        multirun([partial(values.append, i) for i in range(5)], 2, print_progress=progress.append)
+        self.assertEqual(sorted(values), list(range(5)))
+        self.assertEqual(progress, [1, 2, 3, 4, 5])
+
+
+class TestParser(unittest.TestCase):
+    def test_parse_entries(self) -> None:
+        html = (
+            "<div class='header'><a href='#'>menu</a><span title='x'>x</span></div>"
+            + "<div class='entry entry-content'><div><a href='#'><b>&aacute;</b>bak</a></div>"
+            + "<span title='samostalnik moškega spola'>m</span><br><a>other</a><span>no title</span></div>"
+            + "<div class='entry-content'><a>biti</a><span title='glagol'>gl.</span><div></div></div>"
+            + "<div class='entry-content'>no headword</div>"
+        )
+        self.assertEqual(parse_entries(html), [("ábak", ["samostalnik moškega spola"]), ("biti", ["glagol"])])
+        self.assertEqual(extract_entries(html.encode("utf-8")), [("ábak", True), ("biti", False)])
+
+    def test_same_as_extractors(self) -> None:
+        content = sskj_page(7)
+        soup = BeautifulSoup(content, features="html.parser")
+        entries = extract_entries(content)
+        self.assertEqual([word for word, _ in entries], extract_words(soup))
+        self.assertEqual([word for word, is_noun in entries if is_noun], extract_nouns(soup))
+
+
+class TestCollector(unittest.TestCase):
+    def setUp(self) -> None:
+        SSKJStandIn.requests = Counter()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SSKJStandIn)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/iskanje"
+        self.fetcher = PageFetcher(self.url, retries=2, backoff=0.0, pool_size=4)
+
+    def tearDown(self) -> None:
+        self.fetcher.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_sskj_page(self) -> None:
+        content = get_sskj_page(1, fetcher=self.fetcher)
+        self.assertEqual(extract_words(content), ["beseda1", "glagol1"])
+        self.assertEqual(extract_nouns(content), ["beseda1"])
+        get_sskj_page(FLAKY_PAGE, fetcher=self.fetcher)
+        self.assertEqual(SSKJStandIn.requests[FLAKY_PAGE], 2)
+        with self.assertRaises(requests.HTTPError):
+            get_sskj_page(MISSING_PAGE, fetcher=self.fetcher)
+        self.assertEqual(SSKJStandIn.requests[MISSING_PAGE], 1)
+
+    def test_get_all_words(self) -> None:
+        failed_pages: list[int] = []
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            words = get_all_words(None, 3, True, extract_nouns, fetcher=self.fetcher, failed_pages=failed_pages)
+        self.assertEqual(failed_pages, [MISSING_PAGE])
+        self.assertIn(f"Failed to collect page {MISSING_PAGE}", output.getvalue())
+        self.assertEqual(words, [f"beseda{page}" for page in range(1, PAGES + 1) if page != MISSING_PAGE])
+        self.assertEqual(SSKJStandIn.requests[1], 1)
+        with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(RuntimeError):
+            get_all_words(None, 3, False, extract_words, fetcher=self.fetcher)
+        self.assertEqual(len(get_all_words(2, 2, False, extract_words, fetcher=self.fetcher)), 4)
+
+    def test_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PageCache(directory)
+            self.assertIsNone(cache.get(self.url, sskj_params(1)))
+            fetcher = PageFetcher(self.url, backoff=0.0, cache=cache)
+            failed_pages: list[int] = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                words = get_all_words(None, 2, False, extract_words, fetcher=fetcher, failed_pages=failed_pages)
+            requests_count = sum(SSKJStandIn.requests.values())
+            cached = cache.get(self.url, sskj_params(2))
+            assert cached is not None
+            content, metadata = cached
+            self.assertEqual(content, sskj_page(2))
+            self.assertEqual(metadata["etag"], '"page2"')
+            # the order of params does not matter
+            self.assertIsNotNone(cache.get(self.url, dict(reversed(sskj_params(2).items()))))
+
+            # another extractor, only from the cache
+            offline = PageFetcher(self.url, cache=cache, offline=True)
+            offline_failed: list[int] = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                nouns = get_all_words(None, 2, False, extract_nouns, fetcher=offline, failed_pages=offline_failed)
+            self.assertEqual(sum(SSKJStandIn.requests.values()), requests_count)
+            self.assertEqual(offline_failed, failed_pages)
+            self.assertEqual(len(nouns), len(words) // 2)
+            with self.assertRaises(PageNotCached):
+                get_sskj_page(MISSING_PAGE, fetcher=offline)
+
+            # refresh with conditional requests, the server answers 304
+            refreshing = PageFetcher(self.url, cache=cache, refresh=True)
+            self.assertEqual(refreshing.get(sskj_params(2)), sskj_page(2))
+            self.assertEqual(SSKJStandIn.requests[2], 2)
+            cached = cache.get(self.url, sskj_params(2))
+            assert cached is not None
+            self.assertGreaterEqual(cached[1]["fetched"], metadata["fetched"])
+
+    def test_get_all_entries(self) -> None:
+        for parse_processes in (0, 2):
+            failed_pages: list[int] = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                entries = get_all_entries(
+                    None, 3, False, fetcher=self.fetcher, failed_pages=failed_pages, parse_processes=parse_processes
+                )
+            self.assertEqual(failed_pages, [MISSING_PAGE])
+            self.assertEqual([word for word, is_noun in entries.items() if is_noun], [f"beseda{p}" for p in (1, 2, 3, 5)])
+            self.assertEqual(len(entries), 8)
+            self.assertEqual(list(entries), sorted(entries))
+
+    def test_rate_limiter(self) -> None:
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        threads = [threading.Thread(target=limiter.wait) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 - 0.01)
+        RateLimiter(None).wait()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+from src.solver.corpus import Corpus, build_corpus, is_corpus
+from src.solver.game import get_shape_matrix
+from src.solver.hinter import HintedGame, make_hint
+
+from test.helpers import random_words
+
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "words.corpus")
+        self.words = random_words(150, 4, "abcčdš", 0) + random_words(100, 6, "abcčdš", 1) + ["Ščit", "abc", "Abc"]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_words(self) -> None:
+        self.assertEqual(build_corpus(self.words, self.path), len(self.words))
+        self.assertTrue(is_corpus(self.path))
+        with Corpus(self.path) as corpus:
+            self.assertEqual(corpus.words(), self.words)
+            self.assertEqual(corpus.words([2, 0]), [self.words[2], self.words[0]])
+            self.assertEqual(corpus.alphabet, "abcditčš")
+            for length in range(8):
+                expected = [word for word in self.words if len(word) == length]
+                self.assertEqual(corpus.words(corpus.length_ids(length).tolist()), expected)
+
+    def test_masks(self) -> None:
+        build_corpus(self.words, self.path)
+        with Corpus(self.path) as corpus:
+            lower = [word.lower() for word in self.words]
+            self.assertEqual(corpus.shape_matrix.tolist(), get_shape_matrix(lower, corpus.alphabet).tolist())
+            for pk, word in enumerate(lower):
+                letters = corpus.letters[corpus.letter_offsets[pk] : corpus.letter_offsets[pk + 1]]
+                self.assertEqual("".join(corpus.alphabet[i] for i in letters), word)
+                mask = int(corpus.letter_masks[pk])
+                self.assertEqual({c for i, c in enumerate(corpus.alphabet) if mask >> i & 1}, set(word))
+
+    def test_hint_groups(self) -> None:
+        build_corpus(self.words, self.path)
+        with Corpus(self.path) as corpus:
+            for limit in (None, 1, 120, 180):
+                words = self.words[:limit]
+                groups = corpus.hint_groups(limit)
+                self.assertEqual(list(groups.items()), list(HintedGame(words).groups.items()))
+            for word in self.words:
+                hint = make_hint(word)
+                expected = [other for other in self.words if make_hint(other) == hint]
+                self.assertEqual(corpus.words(corpus.hint_ids(hint).tolist()), expected)
+            self.assertEqual(len(corpus.hint_ids("x__")), 0)
+            self.assertEqual(len(corpus.length_ids(20)), 0)
+
+    def test_from_groups(self) -> None:
+        build_corpus(self.words, self.path)
+        with Corpus(self.path) as corpus:
+            game = HintedGame.from_groups(corpus.words(), corpus.hint_groups())
+        expected = HintedGame(self.words)
+        self.assertEqual(game.word_keys, expected.word_keys)
+        game.strategize()
+        expected.strategize()
+        self.assertEqual(game.json(), expected.json())
+
+    def test_invalid(self) -> None:
+        with open(self.path, "w", encoding="UTF-8") as file:
+            file.write("abc\nabd\n")
+        self.assertFalse(is_corpus(self.path))
+        with self.assertRaises(ValueError):
+            Corpus(self.path)
+        build_corpus([], self.path)
+        with Corpus(self.path) as corpus:
+            self.assertEqual(corpus.words(), [])
+            self.assertEqual(corpus.hint_groups(), {})
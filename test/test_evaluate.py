@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.solver.binary import StrategyFile, json_to_binary, write_binary
+from src.solver.evaluate import Evaluation, evaluate
+from src.solver.game import Strategy
+from src.solver.hinter import HintedGame
+
+from test.helpers import WORD_LISTS, random_words
+
+
+class TestEvaluate(unittest.TestCase):
+    def test_strategy(self) -> None:
+        for words in WORD_LISTS + [random_words(300, 5, "abcdefgh", 0)]:
+            strategy = Strategy(words)
+            evaluation = evaluate(strategy)
+            self.assertTrue(evaluation.consistent)
+            self.assertEqual(evaluation.stats()["max_errors"], strategy.max_errors)
+            played = dict(zip(strategy.words, strategy.play_many(strategy.words)))
+            for word, errors, turns in zip(evaluation.words, evaluation.errors.tolist(), evaluation.turns.tolist()):
+                self.assertEqual((errors, turns), played[word])
+            self.assertEqual(sum(evaluation.histogram().values()), len(set(strategy.words)))
+
+    def test_hinted_game_and_file(self) -> None:
+        game = HintedGame(random_words(200, 4, "abcdefg", 2) + random_words(100, 5, "abcdefg", 3))
+        game.strategize(print_progress=False)
+        evaluation = evaluate(game)
+        self.assertTrue(evaluation.consistent)
+        self.assertEqual(sorted(evaluation.words), sorted(game.words))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "strategy.bin")
+            write_binary(path, game)
+            with StrategyFile(path) as file:
+                self.assertEqual(evaluate(file).stats(), evaluation.stats())
+            self.assertEqual(evaluate(path).histogram(), evaluation.histogram())
+
+    def test_mixed_case_file(self) -> None:
+        strategy = Strategy(random_words(100, 5, "abcdefg", 4))
+        evaluation = evaluate(strategy)
+        data = strategy.json()
+        data["words"] = [word.capitalize() if i % 3 == 0 else word for i, word in enumerate(strategy.words)]
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "strategy.json")
+            path = os.path.join(directory, "strategy.bin")
+            with open(json_path, "w", encoding="UTF-8") as file:
+                json.dump(data, file)
+            json_to_binary(json_path, path)
+            self.assertEqual(evaluate(path).histogram(), evaluation.histogram())
+            self.assertTrue(evaluate(path).consistent)
+
+    def test_inconsistent(self) -> None:
+        strategy = Strategy(["abc", "abd", "xyz"])
+        data = strategy.json()
+        root = data["strategy"]
+        assert isinstance(root, list)
+        letters, children = root
+        assert isinstance(children, dict)
+        data["strategy"] = [letters, {shape: child for shape, child in children.items() if shape != "___"}]
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "strategy.json")
+            path = os.path.join(directory, "strategy.bin")
+            with open(json_path, "w", encoding="UTF-8") as file:
+                json.dump(data, file)
+            json_to_binary(json_path, path)
+            evaluation = evaluate(path)
+            self.assertEqual(evaluation.uncovered, ["xyz"])
+            self.assertFalse(evaluation.consistent)
+            data["strategy"] = [letters, {shape: "WON!" for shape in children}]
+            with open(json_path, "w", encoding="UTF-8") as file:
+                json.dump(data, file)
+            json_to_binary(json_path, path)
+            evaluation = evaluate(path)
+            self.assertFalse(evaluation.consistent)
+            self.assertIn("abc", evaluation.wrong_wins)
+            self.assertIn("won without being guessed", evaluation.summary())
+
+    def test_sort_key(self) -> None:
+        # the example from the README: the second strategy is better
+        first, second = Evaluation(), Evaluation()
+        for evaluation, errors in ((first, [0] * 96 + [2, 3, 4, 5]), (second, [0] + [1] * 96 + [2, 3, 4])):
+            evaluation.add([""] * len(errors), np.array(errors), np.zeros(len(errors), dtype=np.int32))
+        self.assertLess(second.sort_key(), first.sort_key())
+        self.assertEqual(evaluate(Strategy(["abc"])).sort_key(), (0, 1))
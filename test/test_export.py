@@ -0,0 +1,35 @@
+import io
+import json
+import unittest
+
+from src.solver.game import Strategy
+from src.solver.hinter import HintedGame
+from src.solver.export import iter_json, write_json
+
+from test.helpers import WORD_LISTS, random_words
+
+
+class TestExport(unittest.TestCase):
+    def assertSameJSON(self, value, fields) -> None:
+        for indent in (None, 0, 1, 2):
+            file = io.StringIO()
+            write_json(file, fields, indent=indent)
+            separators = (",", ":") if indent is None else None
+            self.assertEqual(file.getvalue(), json.dumps(value, indent=indent, separators=separators, ensure_ascii=False))
+
+    def test_values(self) -> None:
+        for value in ([], {}, "čaša", 3, [1, [2, []], {"a": {}, "b": [None, True]}], {"x": [["y"], "z"]}):
+            self.assertSameJSON(value, value)
+        self.assertEqual("".join(iter_json((1, 2), indent=None)), "[1,2]")
+
+    def test_strategy(self) -> None:
+        for words in WORD_LISTS + [random_words(200, 5, "abcčdefgh", 0)]:
+            strategy = Strategy(words)
+            self.assertSameJSON(strategy.json(), strategy.json_fields())
+        strategy = Strategy(random_words(500, 5, "abcdefgh", 1), fast=True)
+        self.assertSameJSON(strategy.json(), strategy.json_fields())
+
+    def test_hinted_game(self) -> None:
+        game = HintedGame(random_words(200, 4, "abcdefg", 2) + random_words(100, 5, "abcdefg", 3))
+        game.strategize(print_progress=False)
+        self.assertSameJSON(game.json(), game.json_fields())
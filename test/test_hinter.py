@@ -40,3 +40,21 @@ class TestHintedGame(unittest.TestCase):
         self.assertEqual(xstrat.start.json_or_won(), ["abcx", {"xbac": "WON!", "xcab": "WON!", "xabc": "WON!"}])
         astrat = game.get_strat_by_hint("a__")
         self.assertEqual(astrat.start.json_or_won(), ["abc", {"abc": "WON!"}])
+
+    def test_strategize_parallel(self) -> None:
+        words = ["xabc", "xbac", "xcab", "abc", "abd", "acd", "bcd", "bce", "bde", "xbcx", "xccx"]
+        game = HintedGame(words)
+        game.strategize(print_progress=False)
+        parallel_game = HintedGame(words)
+        parallel_game.strategize(print_progress=False, workers=2)
+        self.assertEqual(list(parallel_game.strategies), list(game.strategies))
+        self.assertEqual(parallel_game.json(), game.json())
+
+    def test_play(self) -> None:
+        words = ["xabc", "xbac", "xcab", "abc", "abd", "acd", "bcd", "bce", "bde", "xbcx", "xccx"]
+        game = HintedGame(words)
+        game.strategize(print_progress=False)
+        results = game.play_many(words)
+        for word, (errors, _) in zip(words, results):
+            self.assertLessEqual(errors, game.get_strat_by_hint(make_hint(word)).max_errors)
+        self.assertEqual(game.play("ABC")[0], 0)
@@ -0,0 +1,29 @@
+import unittest
+
+from src.solver.game import GameStateTree, Strategy
+from src.solver.bitset import BitsetGameStateTree
+from src.solver.parallel import letter_bound, solve_parallel
+
+from test.helpers import WORD_LISTS, random_words
+
+
+class TestSolveParallel(unittest.TestCase):
+    def test_letter_bound(self) -> None:
+        self.assertEqual(letter_bound(0, [9, 9, 9], 9), 9)
+        self.assertEqual(letter_bound(1, [3, 9, 9], 9), 3)
+        self.assertEqual(letter_bound(0, [9, 9, 3], 9), 4)
+        self.assertEqual(letter_bound(1, [5, 9, 3], 9), 4)
+
+    def test_same_as_sequential(self) -> None:
+        word_lists = WORD_LISTS + [random_words(30, 4, "abcdefg", seed) for seed in range(3)]
+        for tree_class in (GameStateTree, BitsetGameStateTree):
+            for words in word_lists:
+                alphabet = "".join(sorted(set("".join(words))))
+                tree = tree_class(words, alphabet)
+                parallel_tree = tree_class(words, alphabet)
+                self.assertEqual(solve_parallel(parallel_tree, 2), tree.solve_all())
+                self.assertEqual(parallel_tree.extract_strategy(), tree.extract_strategy())
+
+    def test_strategy(self) -> None:
+        words = random_words(30, 4, "abcdefg", 0)
+        self.assertEqual(Strategy(words, workers=2).json(), Strategy(words).json())
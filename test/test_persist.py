@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+
+from src.solver.game import GameStateTree, Strategy
+from src.solver.bitset import BitsetGameStateTree
+from src.solver.hinter import HintedGame
+from src.solver.parallel import solve_parallel
+from src.solver.persist import MemoStore, solve_checkpointed, tree_namespace
+
+from test.helpers import random_words
+
+
+class Crash(Exception):
+    pass
+
+
+class TestMemoStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "checkpoint.sqlite")
+        self.words = random_words(30, 4, "abcdefg", 0)
+        self.alphabet = "".join(sorted(set("".join(self.words))))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_namespace(self) -> None:
+        tree = GameStateTree(self.words, self.alphabet)
+        self.assertEqual(tree_namespace(tree), tree_namespace(BitsetGameStateTree(self.words, self.alphabet)))
+        self.assertNotEqual(tree_namespace(tree), tree_namespace(GameStateTree(self.words[1:], self.alphabet)))
+
+    def test_checkpoint_and_load(self) -> None:
+        tree = GameStateTree(self.words, self.alphabet)
+        tree.solve_all()
+        store = MemoStore(self.path, tree_namespace(tree))
+        store.checkpoint(tree)
+        store.checkpoint(tree)  # nothing new to write
+        loaded = GameStateTree(self.words, self.alphabet)
+        store.load(loaded)
+        store.close()
+        self.assertEqual(loaded.memo, tree.memo)
+        self.assertEqual(loaded.killed, tree.killed)
+        self.assertEqual(loaded.extract_strategy(), tree.extract_strategy())
+
+    def test_crash_in_finish(self) -> None:
+        tree = GameStateTree(self.words, self.alphabet)
+        tree.solve_all()
+        store = MemoStore(self.path, tree_namespace(tree))
+        store.checkpoint(tree)
+
+        def crashing_write(memo: list[tuple[int, int]], killed: list[tuple[int, int]]) -> None:
+            raise Crash()
+
+        store._write = crashing_write  # type: ignore[method-assign]
+        with self.assertRaises(Crash):
+            store.finish(tree)
+        store.close()
+        # the stored tables were not deleted
+        loaded = GameStateTree(self.words, self.alphabet)
+        store = MemoStore(self.path, tree_namespace(loaded))
+        store.load(loaded)
+        self.assertFalse(store.is_finished())
+        store.close()
+        self.assertEqual(loaded.memo, tree.memo)
+
+    def test_resume_after_crash(self) -> None:
+        expected = GameStateTree(self.words, self.alphabet)
+        expected.solve_all()
+
+        tree = GameStateTree(self.words, self.alphabet)
+        store = MemoStore(self.path, tree_namespace(tree), interval=0)
+        store.attach(tree)
+        calls = 0
+        checkpoint = store.checkpoint
+
+        def crashing_checkpoint(tree: GameStateTree) -> None:
+            nonlocal calls
+            checkpoint(tree)
+            calls += 1
+            if calls == 50:
+                raise Crash()
+
+        store.checkpoint = crashing_checkpoint  # type: ignore[method-assign]
+        with self.assertRaises(Crash):
+            tree.solve_all()
+        store.close()
+
+        resumed = GameStateTree(self.words, self.alphabet)
+        self.assertEqual(solve_checkpointed(resumed, self.path, resume=True), expected.solve_all())
+        self.assertEqual(resumed.extract_strategy(), expected.extract_strategy())
+        self.assertNotIn("solve", resumed.__dict__)
+
+    def test_parallel_workers_checkpoint(self) -> None:
+        expected = GameStateTree(self.words, self.alphabet)
+        expected.solve_all()
+        # workers store their tables, even if the run never gets to finish
+        solve_parallel(GameStateTree(self.words, self.alphabet), 2, checkpoint=self.path)
+        stored = GameStateTree(self.words, self.alphabet)
+        store = MemoStore(self.path, tree_namespace(stored))
+        store.load(stored)
+        self.assertFalse(store.is_finished())
+        store.close()
+        self.assertTrue(stored.memo)
+
+        resumed = GameStateTree(self.words, self.alphabet)
+        self.assertEqual(solve_checkpointed(resumed, self.path, resume=True, workers=2), expected.solve_all())
+        self.assertEqual(resumed.extract_strategy(), expected.extract_strategy())
+
+    def test_finished_is_not_solved(self) -> None:
+        tree = GameStateTree(self.words, self.alphabet)
+        result = solve_checkpointed(tree, self.path)
+        loaded = GameStateTree(self.words, self.alphabet)
+        store = MemoStore(self.path, tree_namespace(loaded))
+        self.assertTrue(store.is_finished())
+        store.close()
+        self.assertEqual(solve_checkpointed(loaded, self.path, resume=True), result)
+        # only the strategy was loaded, nothing was solved
+        self.assertEqual(loaded.killed, {})
+        self.assertEqual(len(loaded.memo), len(tree.extract_strategy()))
+        self.assertEqual(loaded.extract_strategy(), tree.extract_strategy())
+
+        # without resume the stored tables are discarded
+        solve_checkpointed(GameStateTree(self.words, self.alphabet), self.path)
+        self.assertEqual(Strategy(self.words, checkpoint=self.path, resume=True).json(), Strategy(self.words).json())
+
+    def test_hinted_game(self) -> None:
+        words = ["xabc", "xbac", "xcab", "abc", "abd", "acd", "bcd", "bce", "bde"]
+        game = HintedGame(words)
+        game.strategize(print_progress=False, checkpoint=self.path)
+        resumed = HintedGame(words)
+        resumed.strategize(print_progress=False, checkpoint=self.path, resume=True)
+        self.assertEqual(resumed.json(), game.json())
@@ -0,0 +1,57 @@
+import contextlib
+import io
+import random
+import unittest
+
+from src.collector.sanitize import (
+    ALPHABET,
+    Problems,
+    collation_key,
+    filter_words,
+    normalize,
+    sanitize_iter,
+    sorted_unique,
+)
+from src.collector.sskj_collector import sanitize
+
+
+def sorted_by_index(words: list[str]) -> list[str]:
+    """The order of sanitize before collation keys."""
+    return [word for _, word in sorted({(tuple(map(ALPHABET.index, word.lower())), word) for word in words})]
+
+
+class TestSanitize(unittest.TestCase):
+    def test_pipeline(self) -> None:
+        self.assertEqual(list(normalize(["ábak", "Éra", "miza"])), ["abak", "Era", "miza"])
+        problems = Problems()
+        words = ["miza", "a b", "w", "=", "čaša", "a1", "ä"]
+        self.assertEqual(list(filter_words(iter(words), problems)), ["miza", "čaša"])
+        self.assertEqual((problems.count, problems.sample), (2, ["=", "ä"]))
+        # only a sample of the removed words is kept
+        problems = Problems(sample_size=3)
+        self.assertEqual(list(filter_words((f"={i}" for i in range(1000)), problems)), [])
+        self.assertEqual((problems.count, problems.sample), (1000, ["=0", "=1", "=2"]))
+        self.assertEqual(str(problems), "Removing 1000 words with special characters: ['=0', '=1', '=2'], ...")
+
+    def test_order(self) -> None:
+        rng = random.Random(0)
+        letters = ALPHABET + ALPHABET.upper()
+        words = ["".join(rng.choice(letters) for _ in range(rng.randint(0, 6))) for _ in range(3000)]
+        words += words[:300]
+        expected = sorted_by_index(words)
+        self.assertEqual(list(sorted_unique(iter(words))), expected)
+        for max_in_memory in (1, 7, 1000):
+            self.assertEqual(list(sorted_unique(iter(words), max_in_memory)), expected)
+        self.assertLess(collation_key("cz"), collation_key("č"))
+        self.assertLess(collation_key("Abc"), collation_key("abc"))
+
+    def test_sanitize(self) -> None:
+        abc = "abcdefghijklmnoprsštuvzž"
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            words = sanitize((word for word in [abc, "=", abc.upper(), "Čaša", "čaša", "ábak", "a123", abc]), 2)
+        self.assertEqual(words, sorted_by_index([abc, abc.upper(), "Čaša", "čaša", "abak"]))
+        self.assertEqual(output.getvalue(), "Removing 1 words with special characters: ['=']\n")
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(list(sanitize_iter(["="])), [])
+        self.assertIn("['=']", output.getvalue())
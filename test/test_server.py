@@ -0,0 +1,67 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from src.solver.binary import StrategyFile, write_binary
+from src.solver.game import Strategy
+from src.solver.server import LatencyStats, StrategyServer
+
+from test.helpers import random_words
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "strategy.bin")
+        self.strategy = Strategy(random_words(100, 5, "abcdefgh", 5))
+        write_binary(self.path, self.strategy)
+        self.file = StrategyFile(self.path)
+        self.server = StrategyServer(self.file)
+
+    def tearDown(self) -> None:
+        self.file.close()
+        self.directory.cleanup()
+
+    def test_handle_line(self) -> None:
+        first = self.strategy.start.choice
+        self.assertEqual(json.loads(self.server.handle_line(b'{"pattern": "_____"}')), {"letters": first})
+        batch = json.loads(self.server.handle_line(b'[{"pattern": "_____", "wrong": ""}, {"wrong": "a"}, 3]'))
+        self.assertEqual(batch[0], {"letters": first})
+        self.assertIn("error", batch[1])
+        self.assertIn("error", batch[2])
+        self.assertIn("error", json.loads(self.server.handle_line(b"not json")))
+        self.assertIn("error", json.loads(self.server.handle_line(b'{"pattern": "_____", "wrong": "abcdefgh"}')))
+        malformed = b'[{"pattern": "_____", "hint": 3}, {"pattern": "_____", "wrong": ["a"]}]'
+        self.assertTrue(all("error" in answer for answer in json.loads(self.server.handle_line(malformed))))
+        metrics = json.loads(self.server.handle_line(b'{"metrics": true}'))
+        self.assertEqual((metrics["requests"], metrics["queries"], metrics["errors"]), (5, 8, 6))
+
+    def test_tcp(self) -> None:
+        async def client() -> list[bytes]:
+            tcp_server = await self.server.start(port=0)
+            port = tcp_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"pattern": "_____", "hint": 3}\n{"pattern": "_____"}\n\n[{"pattern": "_____"}]\n')
+            lines = [await reader.readline(), await reader.readline(), await reader.readline()]
+            writer.close()
+            tcp_server.close()
+            await tcp_server.wait_closed()
+            return lines
+
+        first = self.strategy.start.choice
+        lines = asyncio.run(client())
+        self.assertIn("error", json.loads(lines[0]))  # the connection is kept after a malformed query
+        self.assertEqual([json.loads(line) for line in lines[1:]], [{"letters": first}, [{"letters": first}]])
+
+    def test_latency_stats(self) -> None:
+        latency = LatencyStats(window=2)
+        self.assertEqual(latency.metrics()["p99_ms"], 0.0)
+        for seconds in (0.003, 0.001, 0.002):
+            latency.add(seconds)
+        metrics = latency.metrics()
+        self.assertEqual(metrics["requests"], 3)
+        self.assertAlmostEqual(metrics["p50_ms"], 2.0)
+        self.assertAlmostEqual(metrics["max_ms"], 3.0)
+        self.assertIn("3 requests", latency.summary())
@@ -1,6 +1,10 @@
 import unittest
 
-from src.solver.game import GameStateTree, get_tti, Strategy
+import numpy as np
+
+from src.solver.game import GameStateTree, get_tti, Strategy, get_shape_matrix, mask_to_positions
+
+from test.helpers import random_words, worst_errors
 
 
 class TestGameStateTree(unittest.TestCase):
@@ -14,6 +18,15 @@ class TestGameStateTree(unittest.TestCase):
         self.assertEqual(get_tti("abacaba", "bacd"), ((1, 5), (0, 2, 4, 6), (3,), ()))
         self.assertEqual(get_tti("", "bacde"), ((), (), (), (), ()))
 
+    def test_get_shape_matrix(self) -> None:
+        matrix = get_shape_matrix(["abacaba", "cab"], "abcd")
+        self.assertEqual(matrix.tolist(), [[0b1010101, 0b0100010, 0b0001000, 0], [0b010, 0b100, 0b001, 0]])
+        self.assertEqual(matrix.dtype, np.uint8)
+        self.assertEqual(get_shape_matrix(["a" * 9], "a").dtype, np.uint16)
+        self.assertEqual(get_shape_matrix([], "ab").shape, (0, 2))
+        self.assertEqual(mask_to_positions(0b1010101), (0, 2, 4, 6))
+        self.assertEqual(mask_to_positions(0), ())
+
     def test_init(self) -> None:
         tree = GameStateTree(["abc", "Aaa", "aCa"], "abcd")
         self.assertEqual(tree.original_words, ["abc", "Aaa", "aCa"])
@@ -23,6 +36,23 @@ class TestGameStateTree(unittest.TestCase):
         self.assertEqual(tree.pks, (0, 1, 2))
         self.assertEqual(tree.memo, dict())
 
+    def test_memo_encoding(self) -> None:
+        tree = GameStateTree(["abc", "bca", "cab"], "bacd")
+        self.assertEqual(tree.memo_key((2, 1), "ca"), 1 << 4 | 0b0110)
+        self.assertEqual(tree.memo_key((1, 2), "ac"), tree.memo_key((2, 1), "ca"))
+        self.assertEqual(tree.decode_key(tree.memo_key((1, 2), "ca")), ("ac", 1))
+        self.assertEqual(tree.decode_result(tree.encode_result((3, "db"))), (3, "bd"))
+        self.assertEqual(tree.decode_result(tree.encode_result((0, ""))), (0, ""))
+
+    def test_letter_statistics(self) -> None:
+        tree = GameStateTree(["abc", "Aaa", "aCa"], "bacd")
+        self.assertEqual(tree.letter_presence, [0b0111, 0b0010, 0b0110])
+        self.assertEqual(tree.letter_counts.tolist(), [[1, 1, 1, 0], [0, 3, 0, 0], [0, 2, 1, 0]])
+        self.assertEqual(tree.shared_letters((0, 1, 2), ""), ("a", False))
+        self.assertEqual(tree.shared_letters((0, 2), ""), ("ac", False))
+        self.assertEqual(tree.shared_letters((0, 2), "b"), ("ac", True))
+        self.assertEqual(tree.shared_letters((1,), "a"), ("", True))
+
     def test_group_words(self) -> None:
         tree = GameStateTree(["aba", "Aaa", "ACa"], "abcd")
         self.assertCountEqual(tree.group_words((0, 1, 2), [0, 1]), [(0,), (1,), (2,)])
@@ -31,6 +61,14 @@ class TestGameStateTree(unittest.TestCase):
         self.assertCountEqual(tree.group_words((0, 1, 2), [3]), [(0, 1, 2)])
         self.assertCountEqual(tree.group_words((0,), [3]), [(0,)])
 
+    def test_split_words(self) -> None:
+        tree = GameStateTree(["aba", "Aaa", "ACa", "bab"], "abcd")
+        self.assertEqual(
+            tree.split_words((0, 1, 2, 3), [0, 1, 3]),
+            [[(0, 2), (1,), (3,)], [(0,), (1, 2), (3,)], [(0, 1, 2, 3)]],
+        )
+        self.assertEqual(tree.split_words((1, 3), [2]), [[(1, 3)]])
+
     def test_solve_single_word(self) -> None:
         tree = GameStateTree(["abc"], "abcd")
         self.assertSolveEqual(tree.solve((0,), ""), (0, "abc"))
@@ -94,6 +132,22 @@ class TestGameStateTree(unittest.TestCase):
         tree.solve_all()
         tree.extract_strategy()
 
+    def test_greedy(self) -> None:
+        tree = GameStateTree(["aa", "bb", "cc", "dd"], "abcd")
+        self.assertEqual(tree.greedy_all(), (3, "a"))
+        self.assertEqual(tree.greedy_all(width=4), (3, "a"))
+
+        for words in [["baa", "bbb", "ccb", "ddb"], *(random_words(40, 4, "abcdefg", seed) for seed in range(3))]:
+            alphabet = "".join(sorted(set("".join(words))))
+            tree = GameStateTree(words, alphabet)
+            greedy, _ = tree.greedy_all()
+            self.assertGreaterEqual(greedy, tree.solve_all()[0])
+            self.assertGreaterEqual(greedy, tree.greedy_all(width=3)[0])
+            self.assertEqual(greedy, tree.greedy_all()[0])
+            strategy = Strategy(words, fast=True)
+            self.assertEqual(strategy.max_errors, greedy)
+            self.assertEqual(worst_errors(strategy.start), greedy)
+
 
 class TestChoice(unittest.TestCase):
     def test_init(self) -> None:
@@ -106,6 +160,46 @@ class TestChoice(unittest.TestCase):
         with self.assertRaises(LookupError):
             Strategy(tree)
 
+    def test_lazy_children(self) -> None:
+        words = random_words(200, 4, "abcdefg", 0)
+        strategy = Strategy(words)
+        self.assertFalse(hasattr(strategy.start, "__dict__"))
+        self.assertIsNone(strategy.start._children)
+        choice = strategy.start
+        while choice.choice:
+            choice = choice.move(words[0])
+        self.assertEqual(choice.possible_words(), [words[0]])
+        # only the choices on the path were expanded
+        self.assertEqual(sum(child._children is not None for child in strategy.start.children.values()), 1)
+        self.assertEqual(worst_errors(strategy.start), strategy.max_errors)
+
+    def test_play(self) -> None:
+        words = random_words(300, 5, "abcdefgh", 1) + ["ABCDE"]
+        strategy = Strategy(words)
+        results = strategy.play_many(words)
+        self.assertEqual(max(errors for errors, _ in results), strategy.max_errors)
+        for word, (errors, turns) in zip(words, results):
+            choice, played = strategy.start, 0
+            while choice.choice:
+                choice, played = choice.move(word), played + 1
+            self.assertEqual(choice.possible_words(), [word.lower()])
+            self.assertEqual(turns, played)
+        self.assertEqual(strategy.word_ids["abcde"], len(words) - 1)
+        with self.assertRaises(KeyError):
+            strategy.play("zzzzz")
+
+    def test_choice_cache(self) -> None:
+        words = random_words(200, 4, "abcdefg", 0)
+        expected = Strategy(words).json()
+        strategy = Strategy(words, choice_cache=3)
+        for word in words:
+            choice = strategy.start
+            while choice.choice:
+                choice = choice.move(word)
+            self.assertEqual(choice.possible_words(), [word])
+            self.assertLessEqual(len(strategy._expanded), 3)
+        self.assertEqual(strategy.json(), expected)
+
     def test_strategy(self) -> None:
         strat = Strategy(["abc", "bac", "cab"])
         self.assertEqual(str(strat.start), '["abc", {"bac": "WON!", "cab": "WON!", "abc": "WON!"}]')
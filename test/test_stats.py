@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from src.solver.game import BaseGameStateTree, GameStateTree, Strategy
+from src.solver.bitset import BitsetGameStateTree
+from src.solver.hinter import HintedGame
+from src.solver.stats import SolverStats
+
+from test.helpers import random_words
+
+
+class TestSolverStats(unittest.TestCase):
+    def setUp(self) -> None:
+        self.words = random_words(60, 4, "abcdefg", 0)
+        self.alphabet = "".join(sorted(set("".join(self.words))))
+
+    def test_counters(self) -> None:
+        tree_classes: list[type[BaseGameStateTree]] = [GameStateTree, BitsetGameStateTree]
+        for tree_class in tree_classes:
+            tree = tree_class(self.words, self.alphabet)
+            stats = SolverStats()
+            stats.attach(tree)
+            result = tree.solve_all()
+            stats.detach(tree)
+            self.assertNotIn("solve", tree.__dict__)
+            self.assertEqual(result, tree_class(self.words, self.alphabet).solve_all())
+            self.assertEqual(stats.calls, stats.memo_hits + stats.killed_hits + stats.nodes)
+            self.assertGreater(stats.nodes, 0)
+            self.assertGreater(stats.cuts, 0)
+            self.assertEqual(stats.prunes, tree.prunes)
+            self.assertEqual((stats.memo_size, stats.killed_size), (len(tree.memo), len(tree.killed)))
+            letters = {letter for letter, _ in tree.letter_options(tree.root_word_list())}
+            self.assertTrue(set(stats.root_letter_seconds).issubset(letters))
+            self.assertLessEqual(sum(stats.depth_seconds.values()), stats.seconds)
+            self.assertEqual(stats.stats()["memo_misses"], stats.calls - stats.memo_hits)
+
+    def test_strategy(self) -> None:
+        stats = SolverStats()
+        strategy = Strategy(self.words, stats=stats)
+        self.assertEqual(strategy.json(), Strategy(self.words).json())
+        self.assertGreater(stats.nodes, 0)
+        # other wrappers of solve keep the statistics attached
+        for time_budget, checkpoint in ((60, None), (None, "checkpoint.sqlite")):
+            with tempfile.TemporaryDirectory() as directory:
+                if checkpoint is not None:
+                    checkpoint = os.path.join(directory, checkpoint)
+                other_stats = SolverStats()
+                other = Strategy(self.words, stats=other_stats, time_budget=time_budget, checkpoint=checkpoint)
+                self.assertEqual(other.json(), strategy.json())
+                self.assertGreater(other_stats.nodes, 0)
+
+    def test_hinted_game(self) -> None:
+        words = random_words(200, 4, "abcdefg", 1)
+        stats = SolverStats()
+        HintedGame(words).strategize(print_progress=False, stats=stats)
+        parallel_stats = SolverStats()
+        HintedGame(words).strategize(print_progress=False, workers=2, stats=parallel_stats)
+        self.assertGreater(stats.nodes, 0)
+        for name in ("calls", "nodes", "memo_hits", "killed_hits", "cuts", "prunes", "memo_size"):
+            self.assertEqual(getattr(stats, name), getattr(parallel_stats, name))
+        self.assertEqual(set(stats.root_letter_seconds), set(parallel_stats.root_letter_seconds))
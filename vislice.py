@@ -1,12 +1,39 @@
 import argparse
 
-from src.collector.sskj_collector import get_all_words, sanitize, extract_nouns, extract_words
-from src.solver.game import Strategy
+from src.collector.sskj_collector import get_all_entries, sanitize, url
+from src.collector.fetch import PageFetcher
+from src.collector.cache import PageCache
+from src.collector.sanitize import MAX_IN_MEMORY, sanitize_iter
+from src.solver.game import BaseGameStateTree, GameStateTree, Strategy
+from src.solver.bitset import BitsetGameStateTree
 from src.solver.hinter import HintedGame
+from src.solver.stats import SolverStats
+from src.solver.bench import compare, run_benchmarks
+from src.solver.export import write_json
+from src.solver.binary import StrategyFile, json_to_binary
+from src.solver.server import serve
+from src.solver.evaluate import evaluate
+from src.solver.corpus import Corpus, build_corpus, is_corpus
 
 import json
+import sys
 import time
 
+engines: dict[str, type[BaseGameStateTree]] = {"tuple": GameStateTree, "bitset": BitsetGameStateTree}
+
+
+def report_stats(stats: SolverStats | None, show: bool, file) -> None:
+    """Ends the progress line and prints (with show) or stores (to file) the solver statistics."""
+    if stats is None:
+        return
+    print(file=sys.stderr)
+    if show:
+        print(stats.summary())
+    if file is not None:
+        json.dump(stats.stats(), file, indent=1)
+        file.close()
+
+
 parser = argparse.ArgumentParser(description="Script for this project.")
 subparsers = parser.add_subparsers(help="sub-command help", dest="action")
 
@@ -26,6 +53,44 @@ sskjcollect_parser.add_argument(
     default=100,
     help="maximum number of threads to use (default: 100)",
 )
+sskjcollect_parser.add_argument(
+    "--retries",
+    action="store",
+    type=int,
+    default=3,
+    help="number of retries of a failed page, with exponential backoff (default: 3)",
+)
+sskjcollect_parser.add_argument(
+    "--rate",
+    action="store",
+    type=float,
+    default=None,
+    help="maximum number of requests per second (default: no limit)",
+)
+sskjcollect_parser.add_argument(
+    "--cache",
+    action="store",
+    default="data/sskj_cache",
+    help="directory of downloaded pages, pages in it are not downloaded again (default: data/sskj_cache)",
+)
+sskjcollect_parser.add_argument(
+    "--nocache",
+    action="store_true",
+    default=False,
+    help="download all pages and do not store them",
+)
+sskjcollect_parser.add_argument(
+    "--refresh",
+    action="store_true",
+    default=False,
+    help="check cached pages for changes (conditional requests)",
+)
+sskjcollect_parser.add_argument(
+    "--offline",
+    action="store_true",
+    default=False,
+    help="use only cached pages, without the network",
+)
 sskjcollect_parser.add_argument(
     "--noprogress",
     action="store_true",
@@ -51,6 +116,53 @@ sskjcollect_parser.add_argument(
     default=False,
     help="collect only nouns",
 )
+sskjcollect_parser.add_argument(
+    "--nounsfile",
+    action="store",
+    type=argparse.FileType("w+", encoding="UTF-8"),
+    default=None,
+    help="also save nouns to this file, from the same pages (default: none)",
+)
+sskjcollect_parser.add_argument(
+    "--parsers",
+    action="store",
+    type=int,
+    default=0,
+    help="number of processes parsing pages (default: 0, pages are parsed by the threads fetching them)",
+)
+
+# sanitize
+sanitize_parser = subparsers.add_parser("sanitize", help="Sanitize and sort a word list (one word per line).")
+sanitize_parser.add_argument(
+    "input",
+    action="store",
+    help="file with words",
+)
+sanitize_parser.add_argument(
+    "output",
+    action="store",
+    help="file to save sanitized words to",
+)
+sanitize_parser.add_argument(
+    "--memory-words",
+    action="store",
+    type=int,
+    default=MAX_IN_MEMORY,
+    help=f"words sorted in memory, more are sorted in temporary files (default: {MAX_IN_MEMORY})",
+)
+
+# binary corpus
+buildcorpus_parser = subparsers.add_parser("buildcorpus", help="Convert a word list to an indexed binary corpus.")
+buildcorpus_parser.add_argument(
+    "input",
+    action="store",
+    help="file with words (e.g. data/nouns_si.txt)",
+)
+buildcorpus_parser.add_argument(
+    "output",
+    action="store",
+    help="corpus file to create, it can be used as the word list of getstrategy and hintstrat",
+)
 
 # getstrategy
 getstrategy_parser = subparsers.add_parser("getstrategy", help="Find strategy for a word list.")
@@ -64,7 +176,7 @@ getstrategy_parser.add_argument(
     "words",
     action="store",
     type=argparse.FileType("r", encoding="UTF-8"),
-    help="file with words to find strategy for",
+    help="file with words to find strategy for or a corpus file (see buildcorpus)",
 )
 getstrategy_parser.add_argument(
     "--output",
@@ -80,6 +192,66 @@ getstrategy_parser.add_argument(
     default=None,
     help="limit the number of words to find strategy for (default: all)",
 )
+getstrategy_parser.add_argument(
+    "--engine",
+    action="store",
+    choices=engines.keys(),
+    default="tuple",
+    help="solver engine: word lists as tuples or as bitsets (default: tuple)",
+)
+getstrategy_parser.add_argument(
+    "--workers",
+    action="store",
+    type=int,
+    default=1,
+    help="number of processes that evaluate the first letter in parallel (default: 1)",
+)
+getstrategy_parser.add_argument(
+    "--checkpoint",
+    action="store",
+    default=None,
+    help="SQLite database to store progress in, so the computation can be resumed (default: none)",
+)
+getstrategy_parser.add_argument(
+    "--resume",
+    action="store_true",
+    default=False,
+    help="continue from the last checkpoint in the --checkpoint database",
+)
+getstrategy_parser.add_argument(
+    "--fast",
+    action="store_true",
+    default=False,
+    help="use a fast greedy strategy instead of the best one (it may have more wrong guesses)",
+)
+getstrategy_parser.add_argument(
+    "--time-budget",
+    action="store",
+    type=float,
+    default=None,
+    help="stop searching after about this many seconds and use the best strategy found (default: no limit)",
+)
+
+getstrategy_parser.add_argument(
+    "--stats",
+    action="store_true",
+    default=False,
+    help="show a progress line while solving and print solver statistics at the end",
+)
+getstrategy_parser.add_argument(
+    "--stats-json",
+    action="store",
+    type=argparse.FileType("w+", encoding="UTF-8"),
+    default=None,
+    help="file to save solver statistics to as JSON (also shows the progress line)",
+)
+
+getstrategy_parser.add_argument(
+    "--compact",
+    action="store_true",
+    default=False,
+    help="save the strategy as compact JSON (without indentation)",
+)
 
 # getstrategy with hint
 hinted_parser = subparsers.add_parser("hintstrat", help="Find strategy for a word list with first letter as a hint.")
@@ -87,7 +259,7 @@ hinted_parser.add_argument(
     "words",
     action="store",
     type=argparse.FileType("r", encoding="UTF-8"),
-    help="file with words to find strategy for",
+    help="file with words to find strategy for or a corpus file (see buildcorpus)",
 )
 hinted_parser.add_argument(
     "--output",
@@ -103,6 +275,149 @@ hinted_parser.add_argument(
     default=None,
     help="limit the number of words to find strategy for (default: all)",
 )
+hinted_parser.add_argument(
+    "--engine",
+    action="store",
+    choices=engines.keys(),
+    default="tuple",
+    help="solver engine: word lists as tuples or as bitsets (default: tuple)",
+)
+hinted_parser.add_argument(
+    "--workers",
+    action="store",
+    type=int,
+    default=1,
+    help="number of processes that solve groups in parallel (default: 1)",
+)
+hinted_parser.add_argument(
+    "--checkpoint",
+    action="store",
+    default=None,
+    help="SQLite database to store progress in, so the computation can be resumed (default: none)",
+)
+hinted_parser.add_argument(
+    "--resume",
+    action="store_true",
+    default=False,
+    help="continue from the last checkpoint in the --checkpoint database",
+)
+hinted_parser.add_argument(
+    "--time-budget",
+    action="store",
+    type=float,
+    default=None,
+    help="stop searching after about this many seconds and use the best strategy found (default: no limit)",
+)
+
+hinted_parser.add_argument(
+    "--stats",
+    action="store_true",
+    default=False,
+    help="show a progress line while solving and print solver statistics at the end",
+)
+hinted_parser.add_argument(
+    "--stats-json",
+    action="store",
+    type=argparse.FileType("w+", encoding="UTF-8"),
+    default=None,
+    help="file to save solver statistics to as JSON (also shows the progress line)",
+)
+
+hinted_parser.add_argument(
+    "--compact",
+    action="store_true",
+    default=False,
+    help="save the strategy as compact JSON (without indentation)",
+)
+
+# benchmarks
+bench_parser = subparsers.add_parser("bench", help="Run solver benchmarks.")
+bench_parser.add_argument(
+    "--output",
+    action="store",
+    default="bench.json",
+    help="file to save results to as JSON (default: bench.json)",
+)
+bench_parser.add_argument(
+    "--baseline",
+    action="store",
+    default=None,
+    help="results of an earlier run (JSON) to compare with (default: none)",
+)
+bench_parser.add_argument(
+    "--repeat",
+    action="store",
+    type=int,
+    default=3,
+    help="number of runs of each benchmark, the fastest one counts (default: 3)",
+)
+bench_parser.add_argument(
+    "--only",
+    action="store",
+    default=None,
+    help="run only benchmarks with this in their name (default: all)",
+)
+bench_parser.add_argument(
+    "--quick",
+    action="store_true",
+    default=False,
+    help="use smaller word lists",
+)
+
+# binary strategy files
+tobinary_parser = subparsers.add_parser("tobinary", help="Convert a strategy (JSON) to a binary strategy file.")
+tobinary_parser.add_argument(
+    "input",
+    action="store",
+    help="strategy file of getstrategy or hintstrat (JSON)",
+)
+tobinary_parser.add_argument(
+    "output",
+    action="store",
+    help="binary strategy file to create",
+)
+
+# strategy evaluation
+evaluate_parser = subparsers.add_parser("evaluate", help="Play all words of a strategy and show the distribution of errors.")
+evaluate_parser.add_argument(
+    "strategy",
+    action="store",
+    help="strategy file of getstrategy or hintstrat (JSON) or a binary strategy file",
+)
+evaluate_parser.add_argument(
+    "--output",
+    action="store",
+    default=None,
+    help="file to save the results to as JSON (default: none)",
+)
+
+# strategy server
+serve_parser = subparsers.add_parser("serve", help="Serve next letters of a strategy over TCP (JSON lines).")
+serve_parser.add_argument(
+    "strategy",
+    action="store",
+    help="binary strategy file (see tobinary), a JSON strategy is converted when loaded",
+)
+serve_parser.add_argument(
+    "--host",
+    action="store",
+    default="127.0.0.1",
+    help="address to listen on (default: 127.0.0.1)",
+)
+serve_parser.add_argument(
+    "--port",
+    action="store",
+    type=int,
+    default=8765,
+    help="port to listen on (default: 8765)",
+)
+serve_parser.add_argument(
+    "--metrics-interval",
+    action="store",
+    type=float,
+    default=None,
+    help="print latency metrics every this many seconds (default: only at the end)",
+)
 
 # run all tests
 runtests_parser = subparsers.add_parser("test", help="Run all tests.")
@@ -114,70 +429,235 @@ runtests_parser.add_argument(
     help="file to save test results to (default: stdout)",
 )
 
-# The beautiful match-case statement that puts everything together
-match args := parser.parse_args():
-    case argparse.Namespace(
-        action="sskjcollect",
-        nounsonly=nounsonly,
-        raw=raw,
-        limit=limit,
-        threads=threads,
-        noprogress=noprogress,
-        file=file,
-    ):
-        progress = not noprogress
-        target = "nouns" if nounsonly else "words"
-        print(
-            f"Collecting {target} from SSKJ with raw={raw}, limit={limit},"
-            + f" threads={threads}, progress={progress}, file={file.name}..."
-        )
-
-        extractor = extract_nouns if nounsonly else extract_words
-        words = get_all_words(lim=limit, max_threads=threads, print_progress=progress, word_extractor=extractor)
-        if not raw:
-            words = sanitize(words)
-
-        file.write("\n".join(words))
-        file.close()
-        print(f"Stored {len(words)} words into {file.name}")
-    case argparse.Namespace(action="getstrategy", length=length, words=words, output=output, limit=limit):
-        print(f"Finding strategy for words in {words.name}...")
-        words = [str(line.strip()) for line in words.read().split()]  # split by whitespace
-        words = [word for word in words if len(word) == length]
-        if limit is not None:
-            words = words[:limit]
-
-        print(f"Found {len(words)} words to find strategy for. Computing strategy... (Might take a while.)")
-        time0 = time.time()
-        strategy = Strategy(words)
-        print(f"Strategy found. Maximal number of wrong guessess is {strategy.max_errors}. Saving to {output.name}...")
-        output.write(json.dumps(strategy.json(), indent=1, ensure_ascii=False))
-        print(f"Stored strategy for {len(words)} words into {output.name}. Took {time.time() - time0:.2f} seconds.")
-
-    case argparse.Namespace(action="hintstrat", words=words, output=output, limit=limit):
-        print(f"Finding strategy for words in {words.name}...")
-        words = [str(line.strip()) for line in words.read().split()]  # split by whitespace
-        if limit is not None:
-            words = words[:limit]
-
-        print(f"Found {len(words)} words to find strategy for. Computing strategy... (Might take a while.)")
-        time0 = time.time()
-        strategy = HintedGame(words)
-        strategy.strategize()
-        max_errors = max((strat.max_errors for strat in strategy.strategies.values()))
-        print(f"Strategy found. Maximal number of wrong guessess is {max_errors}. Saving to {output.name}...")
-        output.write(json.dumps(strategy.json(), indent=1, ensure_ascii=False))
-        print(f"Stored strategy for {len(words)} words into {output.name}. Took {time.time() - time0:.2f} seconds.")
-
-    case argparse.Namespace(action="test", out=out):
-        import unittest
-
-        runner = unittest.TextTestRunner(verbosity=2, stream=out)
-
-        print("Running tests in test/")
-        main_suite = unittest.TestLoader().discover("test")
-        runner.run(main_suite)
-
-    case _:
-        print(f"Unsupported command arguments: {vars(args)}")
-        parser.print_help()
+
+def main() -> None:
+    # The beautiful match-case statement that puts everything together
+    match args := parser.parse_args():
+        case argparse.Namespace(
+            action="sskjcollect",
+            nounsonly=nounsonly,
+            raw=raw,
+            limit=limit,
+            threads=threads,
+            retries=retries,
+            rate=rate,
+            cache=cache_directory,
+            nocache=nocache,
+            refresh=refresh,
+            offline=offline,
+            noprogress=noprogress,
+            file=file,
+            nounsfile=nounsfile,
+            parsers=parsers,
+        ):
+            if nocache and offline:
+                parser.error("--offline requires the cache")
+            if refresh and offline:
+                parser.error("--refresh requests pages, it cannot be used with --offline")
+            progress = not noprogress
+            target = "nouns" if nounsonly else "words"
+            print(
+                f"Collecting {target} from SSKJ with raw={raw}, limit={limit}, threads={threads}, retries={retries},"
+                + f" rate={rate}, cache={None if nocache else cache_directory}, refresh={refresh}, offline={offline},"
+                + f" parsers={parsers}, progress={progress}, file={file.name}..."
+            )
+
+            cache = None if nocache else PageCache(cache_directory)
+            fetcher = PageFetcher(
+                url, retries=retries, rate=rate, pool_size=threads, cache=cache, refresh=refresh, offline=offline
+            )
+            failed_pages: list[int] = []
+            entries = get_all_entries(
+                lim=limit,
+                max_threads=threads,
+                print_progress=progress,
+                fetcher=fetcher,
+                failed_pages=failed_pages,
+                parse_processes=parsers,
+            )
+            if failed_pages:
+                print(f"Failed to collect {len(failed_pages)} pages (their words are missing): {failed_pages}")
+            outputs = [(file, [word for word, is_noun in entries.items() if is_noun or not nounsonly])]
+            if nounsfile is not None:
+                outputs.append((nounsfile, [word for word, is_noun in entries.items() if is_noun]))
+            for output, words in outputs:
+                if not raw:
+                    words = sanitize(words)
+                output.write("\n".join(words))
+                output.close()
+                print(f"Stored {len(words)} words into {output.name}")
+        case argparse.Namespace(action="sanitize", input=input_path, output=output, memory_words=memory_words):
+            count = 0
+            with open(input_path, encoding="UTF-8") as source, open(output, "w", encoding="UTF-8") as target:
+                for word in sanitize_iter(filter(None, map(str.strip, source)), memory_words):
+                    target.write(("\n" if count else "") + word)
+                    count += 1
+            print(f"Stored {count} words into {output}")
+
+        case argparse.Namespace(action="buildcorpus", input=input_path, output=output):
+            time0 = time.time()
+            with open(input_path, encoding="UTF-8") as file:
+                count = build_corpus(file.read().split(), output)  # split by whitespace
+            print(f"Stored {count} words into {output}. Took {time.time() - time0:.2f} seconds.")
+
+        case argparse.Namespace(action="getstrategy" | "hintstrat", resume=True, checkpoint=None):
+            parser.error("--resume requires --checkpoint")
+
+        case argparse.Namespace(
+            action="getstrategy", fast=fast, time_budget=time_budget, workers=workers, checkpoint=checkpoint
+        ) if (fast or time_budget is not None) and (workers > 1 or checkpoint is not None):
+            parser.error("--fast and --time-budget can not be combined with --workers or --checkpoint")
+
+        case argparse.Namespace(action="hintstrat", time_budget=time_budget, checkpoint=checkpoint) if (
+            time_budget is not None and checkpoint is not None
+        ):
+            parser.error("--time-budget can not be combined with --checkpoint")
+
+        case argparse.Namespace(
+            action="getstrategy",
+            length=length,
+            words=words,
+            output=output,
+            limit=limit,
+            engine=engine,
+            workers=workers,
+            checkpoint=checkpoint,
+            resume=resume,
+            fast=fast,
+            time_budget=time_budget,
+            stats=show_stats,
+            stats_json=stats_json,
+            compact=compact,
+        ):
+            print(f"Finding strategy for words in {words.name}...")
+            if is_corpus(words.name):
+                words.close()
+                with Corpus(words.name) as corpus:  # only words of the length are read
+                    words = corpus.words(corpus.length_ids(length)[:limit].tolist())
+            else:
+                words = [str(line.strip()) for line in words.read().split()]  # split by whitespace
+                words = [word for word in words if len(word) == length]
+                if limit is not None:
+                    words = words[:limit]
+
+            print(f"Found {len(words)} words to find strategy for. Computing strategy... (Might take a while.)")
+            time0 = time.time()
+            stats = SolverStats(progress=True) if show_stats or stats_json is not None else None
+            strategy = Strategy(
+                words,
+                tree_class=engines[engine],
+                workers=workers,
+                checkpoint=checkpoint,
+                resume=resume,
+                fast=fast,
+                time_budget=time_budget,
+                stats=stats,
+            )
+            report_stats(stats, show_stats, stats_json)
+            if strategy.lower_bound < strategy.max_errors and time_budget is not None:
+                print(f"Time budget exceeded. The best strategy has at least {strategy.lower_bound} wrong guesses.")
+            print(f"Strategy found. Maximal number of wrong guessess is {strategy.max_errors}. Saving to {output.name}...")
+            write_json(output, strategy.json_fields(), indent=None if compact else 1)
+            print(f"Stored strategy for {len(words)} words into {output.name}. Took {time.time() - time0:.2f} seconds.")
+
+        case argparse.Namespace(
+            action="hintstrat",
+            words=words,
+            output=output,
+            limit=limit,
+            engine=engine,
+            workers=workers,
+            checkpoint=checkpoint,
+            resume=resume,
+            time_budget=time_budget,
+            stats=show_stats,
+            stats_json=stats_json,
+            compact=compact,
+        ):
+            print(f"Finding strategy for words in {words.name}...")
+            groups = None
+            if is_corpus(words.name):
+                words.close()
+                with Corpus(words.name) as corpus:  # groups are stored, hints are not computed again
+                    groups = corpus.hint_groups(limit)
+                    words = corpus.words()[:limit]
+            else:
+                words = [str(line.strip()) for line in words.read().split()]  # split by whitespace
+                if limit is not None:
+                    words = words[:limit]
+
+            print(f"Found {len(words)} words to find strategy for. Computing strategy... (Might take a while.)")
+            time0 = time.time()
+            stats = SolverStats(progress=True) if show_stats or stats_json is not None else None
+            strategy = HintedGame(words) if groups is None else HintedGame.from_groups(words, groups)
+            strategy.strategize(
+                tree_class=engines[engine],
+                workers=workers,
+                checkpoint=checkpoint,
+                resume=resume,
+                time_budget=time_budget,
+                stats=stats,
+            )
+            report_stats(stats, show_stats, stats_json)
+            max_errors = max((strat.max_errors for strat in strategy.strategies.values()))
+            lower_bound = max((strat.lower_bound for strat in strategy.strategies.values()))
+            # with time left, groups are searched until their best strategies are found
+            if time_budget is not None and any(strat.lower_bound < strat.max_errors for strat in strategy.strategies.values()):
+                print(f"Time budget exceeded. The best strategy has at least {lower_bound} wrong guesses.")
+            print(f"Strategy found. Maximal number of wrong guessess is {max_errors}. Saving to {output.name}...")
+            write_json(output, strategy.json_fields(), indent=None if compact else 1)
+            print(f"Stored strategy for {len(words)} words into {output.name}. Took {time.time() - time0:.2f} seconds.")
+
+        case argparse.Namespace(action="bench", output=output, baseline=baseline, repeat=repeat, only=only, quick=quick):
+            print(f"Running benchmarks (repeat={repeat}, quick={quick}, only={only})...")
+            results = run_benchmarks(repeat=repeat, quick=quick, only=only)
+            with open(output, "w", encoding="UTF-8") as file:
+                json.dump(results, file, indent=1, ensure_ascii=False)
+            print(f"Stored results of {len(results['cases'])} benchmarks into {output}.")
+            if baseline is not None:
+                with open(baseline, encoding="UTF-8") as file:
+                    print(f"Comparison with {baseline}:")
+                    print("\n".join(compare(results, json.load(file))))
+
+        case argparse.Namespace(action="tobinary", input=input_path, output=output):
+            time0 = time.time()
+            json_to_binary(input_path, output)
+            with StrategyFile(output) as strategy_file:
+                kind = "hinted strategies" if strategy_file.hinted else "strategy"
+                print(f"Stored {strategy_file.n_sections} {kind} into {output}. Took {time.time() - time0:.2f} seconds.")
+
+        case argparse.Namespace(action="evaluate", strategy=path, output=output):
+            time0 = time.time()
+            evaluation = evaluate(path)
+            print(evaluation.summary())
+            print(f"Evaluated in {time.time() - time0:.2f} seconds.")
+            if output is not None:
+                with open(output, "w", encoding="UTF-8") as file:
+                    json.dump(evaluation.stats(), file, indent=1, ensure_ascii=False)
+            if not evaluation.consistent:
+                sys.exit(1)
+
+        case argparse.Namespace(action="serve", strategy=path, host=host, port=port, metrics_interval=interval):
+            import asyncio
+
+            try:
+                asyncio.run(serve(path, host, port, interval))
+            except KeyboardInterrupt:
+                print("Server stopped.")
+
+        case argparse.Namespace(action="test", out=out):
+            import unittest
+
+            runner = unittest.TextTestRunner(verbosity=2, stream=out)
+
+            print("Running tests in test/")
+            main_suite = unittest.TestLoader().discover("test")
+            runner.run(main_suite)
+
+        case _:
+            print(f"Unsupported command arguments: {vars(args)}")
+            parser.print_help()
+
+
+if __name__ == "__main__":
+    main()